@@ -0,0 +1,61 @@
+# agents.py
+
+from characters import Kinematic, SteeringOutput
+
+# Registro de agentes: cada personaje tiene sus comportamientos creados una
+# sola vez y guardados por nombre. En cada tick solo se cambian sus objetivos
+# (re-target) en lugar de construir comportamientos nuevos, así los que tienen
+# estado (como la orientación de DynamicWander) lo conservan.
+
+
+class Agent:
+    def __init__(self, character: Kinematic):
+        self.character: Kinematic = character
+        self.behaviors: dict = {}
+
+    def bind(self, name: str, behavior):
+        # Asocia un comportamiento ya creado para este personaje
+        if getattr(behavior, 'character', self.character) is not self.character:
+            raise ValueError(
+                f"El comportamiento '{name}' pertenece a otro personaje")
+        self.behaviors[name] = behavior
+        return behavior
+
+    def get(self, name: str):
+        return self.behaviors[name]
+
+    def retarget(self, name: str, target, attribute: str = 'target'):
+        # Cambia el objetivo del comportamiento en el lugar (por ejemplo
+        # attribute='target_position' para Face)
+        setattr(self.behaviors[name], attribute, target)
+
+    def steer(self, name: str) -> SteeringOutput:
+        return self.behaviors[name].get_steering()
+
+
+class AgentRegistry:
+    def __init__(self):
+        self.agents: list[Agent] = []
+
+    def add(self, character: Kinematic) -> Agent:
+        agent = Agent(character)
+        self.agents.append(agent)
+        return agent
+
+    def bind_all(self, name: str, factory):
+        # Crea con factory(character) el comportamiento name de cada agente
+        for agent in self.agents:
+            agent.bind(name, factory(agent.character))
+
+    def retarget_all(self, name: str, target, attribute: str = 'target'):
+        for agent in self.agents:
+            agent.retarget(name, target, attribute)
+
+    def characters(self) -> list:
+        return [agent.character for agent in self.agents]
+
+    def __iter__(self):
+        return iter(self.agents)
+
+    def __len__(self) -> int:
+        return len(self.agents)
@@ -1,8 +1,12 @@
 # algorithms.py
 
-from characters import Kinematic, SteeringOutput, Static, KinematicSteeringOutput, map_to_range
+from characters import Kinematic, KinematicPopulation, SteeringOutput, Static, KinematicSteeringOutput, map_to_range
 from drawing import Path
+from distance_field import DistanceField
+from obstacles import ObstacleSet, WallSet
+from spatial import SpatialHashGrid
 import math
+import numpy as np
 import pygame
 import random
 
@@ -323,6 +327,10 @@ class Pursue(DynamicSeek):
     def __init__(self, character: Kinematic, target: Kinematic, max_acceleration: float, max_prediction: float):
         super().__init__(character, target, max_acceleration)
         self.max_prediction: float = max_prediction
+        # Objetivo predicho y DynamicSeek hacia él, reutilizados en cada llamada
+        self.predicted_target: Static = Static()
+        self.seek_behavior: DynamicSeek = DynamicSeek(
+            character, self.predicted_target, max_acceleration)
 
     def get_steering(self) -> SteeringOutput:
         # Calcular el vector a la posición objetivo
@@ -339,20 +347,23 @@ class Pursue(DynamicSeek):
             prediction = distance / speed
 
         # Calcular la posición objetivo predicha
-        predicted_target: Static = Static()
-        predicted_target.position = self.target.position + \
+        self.predicted_target.position = self.target.position + \
             self.target.velocity * prediction
 
-        # Crear un comportamiento DynamicSeek hacia la posición predicha
-        seek_behavior: DynamicSeek = DynamicSeek(
-            self.character, predicted_target, self.max_acceleration)
-        return seek_behavior.get_steering()
+        # Delegar a DynamicSeek hacia la posición predicha
+        self.seek_behavior.character = self.character
+        self.seek_behavior.max_acceleration = self.max_acceleration
+        return self.seek_behavior.get_steering()
 
 
 class Evade(DynamicFlee):
     def __init__(self, character: Kinematic, target: Kinematic, max_acceleration: float, max_prediction: float):
         super().__init__(character, target, max_acceleration)
         self.max_prediction: float = max_prediction
+        # Objetivo predicho y DynamicFlee desde él, reutilizados en cada llamada
+        self.predicted_target: Static = Static()
+        self.flee_behavior: DynamicFlee = DynamicFlee(
+            character, self.predicted_target, max_acceleration)
 
     def get_steering(self) -> SteeringOutput:
         # Calcular el vector a la posición objetivo
@@ -369,45 +380,32 @@ class Evade(DynamicFlee):
             prediction = distance / speed
 
         # Calcular la posición objetivo predicha
-        predicted_target: Static = Static()
-        predicted_target.position = self.target.position + \
+        self.predicted_target.position = self.target.position + \
             self.target.velocity * prediction
 
-        # Crear un comportamiento DynamicFlee hacia la posición predicha
-        flee_behavior: DynamicFlee = DynamicFlee(
-            self.character, predicted_target, self.max_acceleration)
-        return flee_behavior.get_steering()
+        # Delegar a DynamicFlee desde la posición predicha
+        self.flee_behavior.character = self.character
+        self.flee_behavior.max_acceleration = self.max_acceleration
+        return self.flee_behavior.get_steering()
 
 
-class LookWhereYouAreGoing:
+class LookWhereYouAreGoing(Align):
     def __init__(self, character: Kinematic, max_rotation: float, max_angular_acceleration: float, target_radius: float, slow_radius: float):
-        self.character = character
-        self.max_rotation = max_rotation
-        self.max_angular_acceleration = max_angular_acceleration
-        self.target_radius = target_radius
-        self.slow_radius = slow_radius
+        # Igual que Face, usamos un target propio cuya orientación calculamos en get_steering
+        super().__init__(character, Static(), max_rotation,
+                         max_angular_acceleration, target_radius, slow_radius)
 
     def get_steering(self) -> SteeringOutput:
         # Si no hay velocidad, no cambiamos la orientación
-        if self.character.velocity.length() == 0:
+        velocity = self.character.velocity
+        if velocity.length() == 0:
             return SteeringOutput()
 
         # Calcular orientación objetivo basada en la dirección de la velocidad
-        orientation = math.atan2(-self.character.velocity.y,
-                                 self.character.velocity.x)
-        target = Static()
-        target.orientation = orientation
-
-        # Usar Align para rotar hacia la orientación objetivo
-        behavior = Align(
-            self.character,
-            target,
-            max_rotation=self.max_rotation,
-            max_angular_acceleration=self.max_angular_acceleration,
-            target_radius=self.target_radius,
-            slow_radius=self.slow_radius
-        )
-        return behavior.get_steering()
+        self.target.orientation = math.atan2(-velocity.y, velocity.x)
+
+        # Delegar a Align para rotar hacia la orientación objetivo
+        return super().get_steering()
 
 
 class DynamicWander(Face):
@@ -454,50 +452,58 @@ class DynamicWander(Face):
 
 
 class PathFollowing:
-    def __init__(self, character: Kinematic, path: Path, path_offset: float, max_acceleration: float):
+    def __init__(self, character: Kinematic, path: Path, path_offset: float, max_acceleration: float, window: float = 100.0):
         self.character = character
         self.path = path
+        # Distancia (a lo largo del camino) por delante del punto más cercano
+        # hacia la que nos dirigimos
         self.path_offset = path_offset
         self.max_acceleration = max_acceleration
-        self.current_segment = 0
+        # Parámetro actual en el camino (None hasta la primera búsqueda) y
+        # cuánto se busca alrededor de él en cada llamada
+        self.current_param = None
+        self.window = window
+        # Target estático y DynamicSeek reutilizados en cada llamada
+        self.target = Static()
+        self.seek_behavior = DynamicSeek(character, self.target, max_acceleration)
 
     def get_steering(self) -> SteeringOutput:
-        if self.current_segment >= len(self.path.waypoints):
-            self.current_segment = 0  # Reiniciar al inicio de la ruta
+        # Buscar el parámetro actual cerca del anterior
+        self.current_param = self.path.get_param(
+            self.character.position, self.current_param, self.window)
 
-        target_point = self.path.waypoints[self.current_segment]
-
-        # Verificar si el personaje está cerca del punto objetivo
-        distance = (target_point - self.character.position).length()
-        if distance < self.path_offset:
-            # Mover al siguiente punto
-            self.current_segment += 1
-            if self.current_segment >= len(self.path.waypoints):
-                self.current_segment = 0
-            target_point = self.path.waypoints[self.current_segment]
-
-        # Crear un target estático en el punto objetivo
-        target = Static()
-        target.position = target_point
+        # Mover el target estático un poco más adelante en el camino
+        self.target.position = self.path.get_position(self.current_param + self.path_offset)
 
         # Utilizar DynamicSeek para moverse hacia el target
-        behavior = DynamicSeek(self.character, target, self.max_acceleration)
-        return behavior.get_steering()
+        self.seek_behavior.character = self.character
+        self.seek_behavior.max_acceleration = self.max_acceleration
+        return self.seek_behavior.get_steering()
 
 # algorithms.py (Agregar al final del archivo)
 
 
 class Separation:
-    def __init__(self, character: Kinematic, targets: list, threshold: float, decay_coefficient: float, max_acceleration: float):
+    def __init__(self, character: Kinematic, targets: list, threshold: float, decay_coefficient: float, max_acceleration: float, grid: SpatialHashGrid = None):
         self.character = character
         self.targets = targets  # Lista de Kinematic (otros personajes)
         self.threshold = threshold
         self.decay_coefficient = decay_coefficient
         self.max_acceleration = max_acceleration
+        # Rejilla opcional construida con las posiciones de targets (en el mismo orden)
+        self.grid = grid
 
     def get_steering(self) -> SteeringOutput:
         result = SteeringOutput()
-        for target in self.targets:
+
+        # Con rejilla solo revisamos a los personajes de las celdas vecinas
+        if self.grid is not None:
+            candidates = [self.targets[i]
+                          for i in self.grid.query(self.character.position, self.threshold)]
+        else:
+            candidates = self.targets
+
+        for target in candidates:
             if target is self.character:
                 continue
             direction = self.character.position - target.position
@@ -516,10 +522,12 @@ class Separation:
 
 
 class CollisionAvoidance:
-    def __init__(self, character: Kinematic, targets: list, max_acceleration: float):
+    def __init__(self, character: Kinematic, targets: list, max_acceleration: float, collision_radius: float = 50.0):
         self.character = character
         self.targets: list[Kinematic] = targets
         self.max_acceleration = max_acceleration
+        # Radio de colisión de cada personaje
+        self.collision_radius = collision_radius
 
     def get_steering(self) -> SteeringOutput:
         result = SteeringOutput()
@@ -548,10 +556,7 @@ class CollisionAvoidance:
             distance = relative_pos.length()
             min_separation = distance - relative_speed * time_to_collision
 
-            # Definir un umbral de colisión
-            collision_radius = 50.0  # Ajusta este valor según sea necesario
-
-            if min_separation > 2 * collision_radius:
+            if min_separation > 2 * self.collision_radius:
                 continue
 
             if 0 < time_to_collision < shortest_time:
@@ -566,7 +571,7 @@ class CollisionAvoidance:
             # No hay colisiones inminentes
             return result
 
-        if first_min_separation <= 0 or first_distance < 2 * collision_radius:
+        if first_min_separation <= 0 or first_distance < 2 * self.collision_radius:
             # Ya estamos en colisión, dirigirnos directamente lejos del target
             relative_pos = first_target.position - self.character.position
         else:
@@ -580,9 +585,10 @@ class CollisionAvoidance:
 
 
 class ObstacleAvoidance:
-    def __init__(self, character: Kinematic, obstacles: list, avoid_distance: float, lookahead: float, max_acceleration: float):
+    def __init__(self, character: Kinematic, obstacles, avoid_distance: float, lookahead: float, max_acceleration: float):
         self.character = character
-        self.obstacles = obstacles  # Lista de diccionarios con 'position' y 'radius'
+        # Lista de diccionarios con 'position' y 'radius', o un ObstacleSet
+        self.obstacles = obstacles
         self.avoid_distance = avoid_distance
         self.lookahead = lookahead
         self.max_acceleration = max_acceleration
@@ -590,37 +596,833 @@ class ObstacleAvoidance:
     def get_steering(self) -> SteeringOutput:
         result = SteeringOutput()
 
-        # Vector de la dirección del personaje
-        ray_vector = self.character.velocity.normalize() * self.lookahead
+        # Dirección del personaje (se normaliza una sola vez)
+        if self.character.velocity.length() == 0:
+            return result
+        ray_direction = self.character.velocity.normalize()
+
+        if isinstance(self.obstacles, ObstacleSet):
+            # Con el índice espacial solo se revisan los obstáculos cercanos al rayo
+            hit = self.obstacles.raycast_one(
+                self.character.position, ray_direction, self.lookahead)
+            if hit is None:
+                return result
+            obstacle, _, closest = hit
+            closest_point = pygame.math.Vector2(closest)
+            closest_position = pygame.math.Vector2(self.obstacles.centers[obstacle].tolist())
+        else:
+            closest_position = None
+            closest_distance = float('inf')
+            closest_point = None
+
+            for obstacle in self.obstacles:
+                # Vector al obstáculo
+                obstacle_vector = obstacle['position'] - self.character.position
+
+                # Proyección del obstáculo en el rayo
+                projection = obstacle_vector.dot(ray_direction)
+
+                if 0 < projection < self.lookahead:
+                    closest = self.character.position + ray_direction * projection
+                    distance = (obstacle['position'] - closest).length()
+                    if distance < obstacle['radius']:
+                        if projection < closest_distance:
+                            closest_distance = projection
+                            closest_position = obstacle['position']
+                            closest_point = closest
+
+            if closest_position is None:
+                # No hay colisión, seguir adelante
+                return result
+
+        # Calcular steering de evitación
+        avoidance = closest_point - closest_position
+        if avoidance.length() == 0:
+            # El rayo pasa por el centro: nos apartamos hacia un costado
+            avoidance = pygame.math.Vector2(-ray_direction.y, ray_direction.x)
+        result.linear = avoidance.normalize() * self.max_acceleration
+        result.angular = 0.0
+        return result
 
-        closest_obstacle = None
-        closest_distance = float('inf')
-        closest_point = None
 
-        for obstacle in self.obstacles:
-            # Vector al obstáculo
-            obstacle_vector = obstacle['position'] - self.character.position
+def whisker_directions(direction_x, direction_y, whisker_angle: float):
+    # Dirección del rayo central y de los dos bigotes laterales, girados
+    # whisker_angle hacia cada lado (funciona con escalares o con arreglos)
+    cos_angle = math.cos(whisker_angle)
+    sin_angle = math.sin(whisker_angle)
+    return [(direction_x, direction_y),
+            (direction_x * cos_angle - direction_y * sin_angle, direction_x * sin_angle + direction_y * cos_angle),
+            (direction_x * cos_angle + direction_y * sin_angle, -direction_x * sin_angle + direction_y * cos_angle)]
 
-            # Proyección del obstáculo en el rayo
-            projection = obstacle_vector.dot(ray_vector.normalize())
 
-            if 0 < projection < self.lookahead:
-                closest = self.character.position + ray_vector.normalize() * projection
-                distance = (obstacle['position'] - closest).length()
-                if distance < obstacle['radius']:
-                    if projection < closest_distance:
-                        closest_distance = projection
-                        closest_obstacle = obstacle
-                        closest_point = closest
+class WallAvoidance:
+    def __init__(self, character: Kinematic, walls: WallSet, avoid_distance: float, lookahead: float, max_acceleration: float, whisker_angle: float = math.pi / 6, whisker_length: float = None):
+        self.character = character
+        self.walls = walls
+        # Distancia a la que nos alejamos de la pared desde el punto de choque
+        self.avoid_distance = avoid_distance
+        # Largo del rayo central y de los bigotes laterales
+        self.lookahead = lookahead
+        self.whisker_angle = whisker_angle
+        self.whisker_length = whisker_length if whisker_length is not None else lookahead / 2
+        self.max_acceleration = max_acceleration
 
-        if closest_obstacle is not None:
-            # Calcular steering de evitación
-            result.linear = closest_point - closest_obstacle['position']
-            result.linear = result.linear.normalize() * self.max_acceleration
-            result.angular = 0.0
+    def get_steering(self) -> SteeringOutput:
+        result = SteeringOutput()
+        velocity = self.character.velocity
+        if velocity.length() == 0:
             return result
-        else:
-            # No hay colisión, seguir adelante
-            result.linear = pygame.math.Vector2(0, 0)
-            result.angular = 0.0
+        direction = velocity.normalize()
+
+        # Lanzar el rayo central y los bigotes y quedarnos con el choque más próximo
+        collision = None
+        lengths = (self.lookahead, self.whisker_length, self.whisker_length)
+        for ray, length in zip(whisker_directions(direction.x, direction.y, self.whisker_angle), lengths):
+            hit = self.walls.raycast_one(self.character.position, ray, length)
+            if hit is not None and (collision is None or hit[1] < collision[1]):
+                collision = hit
+        if collision is None:
             return result
+
+        # Buscar (como DynamicSeek) un punto alejado de la pared sobre su normal
+        _, _, point, normal = collision
+        target = pygame.math.Vector2(point) + pygame.math.Vector2(normal) * self.avoid_distance
+        result.linear = target - self.character.position
+        if result.linear.length() > 0:
+            result.linear = result.linear.normalize() * self.max_acceleration
+        return result
+
+
+class DistanceFieldAvoidance:
+    def __init__(self, character: Kinematic, field: DistanceField, avoid_distance: float, lookahead: float, max_acceleration: float):
+        self.character = character
+        self.field = field
+        # Si el punto adelantado queda a menos de avoid_distance de la
+        # geometría, nos alejamos siguiendo la normal del campo
+        self.avoid_distance = avoid_distance
+        self.lookahead = lookahead
+        self.max_acceleration = max_acceleration
+
+    def get_steering(self) -> SteeringOutput:
+        result = SteeringOutput()
+        velocity = self.character.velocity
+        probe = self.character.position
+        if velocity.length() > 0:
+            probe = probe + velocity.normalize() * self.lookahead
+
+        distance, normal = self.field.sample_one(probe)
+        if distance < self.avoid_distance:
+            result.linear = pygame.math.Vector2(normal) * self.max_acceleration
+        return result
+
+
+# Arbitraje de comportamientos: combinan la salida de varios comportamientos
+# dinámicos (los que devuelven SteeringOutput) en uno solo.
+
+
+class BlendedSteering:
+    def __init__(self, character: Kinematic, behaviors: list, max_acceleration: float, max_angular_acceleration: float = math.inf):
+        # behaviors es una lista de pares (comportamiento, peso)
+        self.character: Kinematic = character
+        self.behaviors: list = behaviors
+        self.max_acceleration: float = max_acceleration
+        self.max_angular_acceleration: float = max_angular_acceleration
+
+    def get_steering(self) -> SteeringOutput:
+        result = SteeringOutput()
+
+        # Suma ponderada de todos los comportamientos
+        for behavior, weight in self.behaviors:
+            steering = behavior.get_steering()
+            result.linear += steering.linear * weight
+            result.angular += steering.angular * weight
+
+        # Limitar las aceleraciones máximas
+        if result.linear.length() > self.max_acceleration:
+            result.linear = result.linear.normalize() * self.max_acceleration
+        result.angular = max(-self.max_angular_acceleration,
+                             min(result.angular, self.max_angular_acceleration))
+        return result
+
+
+class PrioritySteering:
+    def __init__(self, groups: list, epsilon: float = 0.01):
+        # groups es una lista de comportamientos (normalmente BlendedSteering)
+        # ordenados de mayor a menor prioridad
+        self.groups: list = groups
+        self.epsilon: float = epsilon
+
+    def get_steering(self) -> SteeringOutput:
+        steering = SteeringOutput()
+        for group in self.groups:
+            steering = group.get_steering()
+            # El primer grupo con una salida apreciable gana y los de menor
+            # prioridad ni siquiera se evalúan
+            if steering.linear.length() > self.epsilon or abs(steering.angular) > self.epsilon:
+                return steering
+        # Si ninguno superó epsilon devolvemos el del último grupo
+        return steering
+
+
+# Versiones por lotes: operan sobre arreglos de NumPy con un personaje por fila.
+# Las clases Batch* se asocian a una KinematicPopulation y su get_steering
+# devuelve (linear, angular) con formas (n, 2) y (n,) para los índices pedidos.
+
+
+def orientation_vectors(orientation: np.ndarray) -> np.ndarray:
+    # Vectores unitarios de cada orientación (el eje y de la pantalla apunta hacia abajo)
+    return np.stack((np.cos(orientation), -np.sin(orientation)), axis=-1)
+
+
+def align_kernel(orientation: np.ndarray, rotation: np.ndarray, target_orientation: np.ndarray,
+                 max_rotation, max_angular_acceleration, target_radius: float, slow_radius: float,
+                 time_to_target: float = 0.1) -> np.ndarray:
+    # Igual que Align.get_steering, devuelve la aceleración angular de cada personaje
+    rotation_diff = map_to_range(target_orientation - orientation)
+    rotation_size = np.abs(rotation_diff)
+
+    # Determinar la rotación objetivo (np.sign ajusta la dirección)
+    target_rotation = np.where(rotation_size > slow_radius, max_rotation,
+                               max_rotation * rotation_size / slow_radius)
+    target_rotation = target_rotation * np.sign(rotation_diff)
+
+    # Calcular y limitar la aceleración angular
+    angular = (target_rotation - rotation) / time_to_target
+    angular = np.clip(angular, -max_angular_acceleration, max_angular_acceleration)
+
+    # Dentro del radio de destino no rotamos
+    angular[rotation_size < target_radius] = 0.0
+    return angular
+
+
+def face_kernel(position: np.ndarray, orientation: np.ndarray, rotation: np.ndarray, target_position: np.ndarray,
+                max_rotation, max_angular_acceleration, target_radius: float, slow_radius: float,
+                time_to_target: float = 0.1) -> np.ndarray:
+    # Igual que Face.get_steering, devuelve la aceleración angular de cada personaje
+    direction = target_position - position
+    target_orientation = np.arctan2(-direction[:, 1], direction[:, 0])
+    angular = align_kernel(orientation, rotation, target_orientation, max_rotation,
+                           max_angular_acceleration, target_radius, slow_radius, time_to_target)
+
+    # Si el objetivo está sobre el personaje no hay a dónde mirar
+    angular[(direction[:, 0] == 0) & (direction[:, 1] == 0)] = 0.0
+    return angular
+
+
+def wander_kernel(position: np.ndarray, orientation: np.ndarray, rotation: np.ndarray,
+                  wander_orientation: np.ndarray, random_values: np.ndarray, wander_offset: float,
+                  wander_radius: float, wander_rate: float, max_acceleration, max_rotation,
+                  max_angular_acceleration, target_radius: float, slow_radius: float,
+                  time_to_target: float = 0.1):
+    # Igual que DynamicWander.get_steering para todos los personajes a la vez.
+    # random_values tiene un número en [-1, 1] por personaje y wander_orientation
+    # se actualiza en el lugar.
+    wander_orientation += random_values * wander_rate
+
+    # Calcular el centro del círculo de wander
+    character_orientation_vector = orientation_vectors(orientation)
+    circle_center = position + wander_offset * character_orientation_vector
+
+    # Calcular la posición del target en el círculo
+    target_orientation = wander_orientation + orientation
+    target_position = circle_center + wander_radius * orientation_vectors(target_orientation)
+
+    # Face nos da el steering angular
+    angular = face_kernel(position, orientation, rotation, target_position, max_rotation,
+                          max_angular_acceleration, target_radius, slow_radius, time_to_target)
+
+    # Aceleración lineal al máximo en la dirección de la orientación actual
+    linear = character_orientation_vector * np.reshape(max_acceleration, (-1, 1))
+    return linear, angular
+
+
+def seek_kernel(position: np.ndarray, target_position: np.ndarray, max_acceleration) -> np.ndarray:
+    # Igual que DynamicSeek.get_steering: aceleración máxima hacia el objetivo
+    direction = target_position - position
+    distance = np.hypot(direction[:, 0], direction[:, 1])
+    linear = np.zeros_like(direction)
+    moving = distance > 0
+    scale = np.broadcast_to(max_acceleration, distance.shape)[moving] / distance[moving]
+    linear[moving] = direction[moving] * scale[:, None]
+    return linear
+
+
+def arrive_kernel(position: np.ndarray, velocity: np.ndarray, target_position: np.ndarray, max_acceleration,
+                  max_speed, target_radius: float, slow_radius: float, time_to_target: float):
+    # Igual que DynamicArrive.get_steering. Devuelve (linear, arrived): los
+    # personajes con arrived deben detenerse (velocidad cero)
+    direction = target_position - position
+    distance = np.hypot(direction[:, 0], direction[:, 1])
+    arrived = distance < target_radius
+
+    # Dentro del radio lento reducimos la velocidad objetivo
+    max_speed = np.broadcast_to(max_speed, distance.shape)
+    target_speed = np.where(distance > slow_radius, max_speed, max_speed * distance / slow_radius)
+    target_velocity = np.zeros_like(direction)
+    moving = distance > 0
+    target_velocity[moving] = direction[moving] * (target_speed[moving] / distance[moving])[:, None]
+
+    # La aceleración intenta llegar a la velocidad objetivo
+    linear = clamp_length((target_velocity - velocity) / time_to_target, max_acceleration)
+    linear[arrived] = 0.0
+    return linear, arrived
+
+
+class BatchDynamicSeek:
+    def __init__(self, population: KinematicPopulation, target_position):
+        # target_position es un punto (2,) para todos o un arreglo (n, 2) con
+        # el objetivo de cada personaje; se puede reemplazar entre ticks
+        self.population: KinematicPopulation = population
+        self.target_position = target_position
+
+    def get_steering(self, indices=None):
+        population = self.population
+        if indices is None:
+            indices = slice(0, len(population))
+        position = population.position[indices]
+        linear = seek_kernel(position, batch_targets(self.target_position, indices),
+                             population.max_acceleration[indices])
+        return linear, np.zeros(len(position))
+
+
+class BatchDynamicArrive:
+    def __init__(self, population: KinematicPopulation, target_position, target_radius: float, slow_radius: float, time_to_target: float = 0.1):
+        # Las aceleraciones y velocidades máximas se toman de cada personaje
+        self.population: KinematicPopulation = population
+        self.target_position = target_position
+        self.target_radius: float = target_radius
+        self.slow_radius: float = slow_radius
+        self.time_to_target: float = time_to_target
+
+    def get_steering(self, indices=None):
+        population = self.population
+        if indices is None:
+            indices = slice(0, len(population))
+        linear, arrived = arrive_kernel(
+            population.position[indices], population.velocity[indices],
+            batch_targets(self.target_position, indices), population.max_acceleration[indices],
+            population.max_speed[indices], self.target_radius, self.slow_radius, self.time_to_target)
+        # Como DynamicArrive, los que llegaron se detienen
+        if arrived.any():
+            selected = np.arange(len(population))[indices]
+            population.velocity[selected[arrived]] = 0.0
+        return linear, np.zeros(len(linear))
+
+
+def batch_targets(target_position, indices) -> np.ndarray:
+    # Objetivo de los personajes indices: el mismo punto para todos o uno por personaje
+    target_position = np.asarray(target_position, dtype=float)
+    if target_position.ndim == 1:
+        return target_position
+    return target_position[indices]
+
+
+class BatchDynamicWander:
+    def __init__(self, population: KinematicPopulation, wander_offset: float, wander_radius: float, wander_rate: float, target_radius: float, slow_radius: float, time_to_target: float = 0.1, rng: np.random.Generator = None):
+        # Las aceleraciones y rotaciones máximas se toman de cada personaje
+        self.population: KinematicPopulation = population
+        self.wander_offset: float = wander_offset
+        self.wander_radius: float = wander_radius
+        self.wander_rate: float = wander_rate
+        self.target_radius: float = target_radius
+        self.slow_radius: float = slow_radius
+        self.time_to_target: float = time_to_target
+        self.rng: np.random.Generator = rng if rng is not None else np.random.default_rng()
+        # Orientación del wander de cada personaje
+        self.wander_orientation: np.ndarray = np.zeros(len(population))
+        # Números aleatorios de toda la población generados por prepare
+        self.random_values: np.ndarray = None
+
+    def _sync_size(self):
+        # La población puede crecer después de crear el comportamiento
+        missing = len(self.population) - len(self.wander_orientation)
+        if missing > 0:
+            self.wander_orientation = np.concatenate(
+                (self.wander_orientation, np.zeros(missing)))
+
+    def prepare(self, count: int = None):
+        # Lo llama SteeringExecutor antes de repartir range(count) entre
+        # hilos: los números aleatorios de todos se generan acá, de una vez y
+        # en el mismo orden que sin hilos, y cada bloque toma los suyos. Así
+        # los hilos no comparten el generador y con la misma semilla el
+        # resultado no depende de cuántos hilos haya. prepare(None) los descarta.
+        self._sync_size()
+        self.random_values = None if count is None else self.rng.uniform(-1.0, 1.0, count)
+
+    def get_steering(self, indices=None):
+        self._sync_size()
+        population = self.population
+        if indices is None:
+            indices = slice(0, len(population))
+
+        wander_orientation = self.wander_orientation[indices]
+        if self.random_values is not None:
+            random_values = self.random_values[indices]
+        else:
+            # Todos los números aleatorios se generan en un solo arreglo
+            random_values = self.rng.uniform(-1.0, 1.0, len(wander_orientation))
+        linear, angular = wander_kernel(
+            population.position[indices], population.orientation[indices], population.rotation[indices],
+            wander_orientation, random_values, self.wander_offset, self.wander_radius, self.wander_rate,
+            population.max_acceleration[indices], population.max_rotation[indices],
+            population.max_angular_acceleration[indices], self.target_radius, self.slow_radius,
+            self.time_to_target)
+        # Con índices avanzados wander_orientation es una copia
+        self.wander_orientation[indices] = wander_orientation
+        return linear, angular
+
+
+class BatchKinematicWander:
+    def __init__(self, population: KinematicPopulation, max_rotation: float, rng: np.random.Generator = None):
+        # Como KinematicWander: avanza a la velocidad máxima en la dirección de
+        # la orientación, que cambia al azar. En lugar de saltos de orientación
+        # devuelve una rotación aleatoria (rad/s) entre -max_rotation y
+        # max_rotation, así que el resultado (velocity (k, 2), rotation (k,))
+        # es para KinematicPopulation.update_kinematic
+        self.population: KinematicPopulation = population
+        self.max_rotation: float = max_rotation
+        self.rng: np.random.Generator = rng if rng is not None else np.random.default_rng()
+        # Rotaciones de toda la población generadas por prepare
+        self.random_rotation: np.ndarray = None
+
+    def prepare(self, count: int = None):
+        # Como BatchDynamicWander.prepare
+        self.random_rotation = (None if count is None else
+                                self.rng.uniform(-self.max_rotation, self.max_rotation, count))
+
+    def get_steering(self, indices=None):
+        population = self.population
+        if indices is None:
+            indices = slice(0, len(population))
+        orientation = population.orientation[indices]
+        velocity = np.column_stack((np.cos(orientation), -np.sin(orientation)))
+        velocity *= population.max_speed[indices][:, None]
+        if self.random_rotation is not None:
+            rotation = self.random_rotation[indices]
+        else:
+            rotation = self.rng.uniform(-self.max_rotation, self.max_rotation, len(orientation))
+        return velocity, rotation
+
+
+def separation_kernel(k: np.ndarray, delta: np.ndarray, distance: np.ndarray, count: int,
+                      decay_coefficient: float, max_acceleration) -> np.ndarray:
+    # Igual que Separation.get_steering a partir de los pares de vecinos de
+    # SpatialHashGrid.neighbor_pairs (delta va del personaje k a su vecino)
+    apart = distance > 0
+    k, delta, distance = k[apart], delta[apart], distance[apart]
+
+    # Calcular la fuerza de repulsión de cada vecino
+    pair_max = np.broadcast_to(max_acceleration, (count,))[k]
+    strength = np.minimum(decay_coefficient / (distance * distance), pair_max)
+    push = -delta * (strength / distance)[:, None]
+
+    # Sumar las fuerzas de cada personaje
+    linear = np.zeros((count, 2))
+    linear[:, 0] = np.bincount(k, weights=push[:, 0], minlength=count)
+    linear[:, 1] = np.bincount(k, weights=push[:, 1], minlength=count)
+
+    # Limitar la aceleración máxima
+    return clamp_length(linear, max_acceleration)
+
+
+def clamp_length(vectors: np.ndarray, max_length) -> np.ndarray:
+    # Limita la longitud de cada fila de vectors a max_length (en el lugar)
+    length = np.hypot(vectors[:, 0], vectors[:, 1])
+    max_length = np.broadcast_to(max_length, length.shape)
+    too_long = length > max_length
+    if too_long.any():
+        vectors[too_long] *= (max_length[too_long] / length[too_long])[:, None]
+    return vectors
+
+
+class BatchSeparation:
+    def __init__(self, population: KinematicPopulation, grid: SpatialHashGrid, threshold: float, decay_coefficient: float):
+        # La rejilla debe reconstruirse con population.position una vez por tick.
+        # En un mundo toroidal los vecinos al otro lado del borde también cuentan.
+        self.population: KinematicPopulation = population
+        self.grid: SpatialHashGrid = grid
+        self.threshold: float = threshold
+        self.decay_coefficient: float = decay_coefficient
+
+    def get_steering(self, indices=None):
+        population = self.population
+        if indices is None:
+            indices = slice(0, len(population))
+        max_acceleration = population.max_acceleration[indices]
+
+        k, _, delta, distance = self.grid.neighbor_pairs(self.threshold, indices)
+        linear = separation_kernel(k, delta, distance, len(max_acceleration),
+                                   self.decay_coefficient, max_acceleration)
+        return linear, np.zeros(len(max_acceleration))
+
+
+def collision_avoidance_kernel(k: np.ndarray, relative_pos: np.ndarray, relative_vel: np.ndarray,
+                               combined_radius: np.ndarray, count: int, max_acceleration,
+                               time_horizon: float = float('inf')) -> np.ndarray:
+    # Igual que CollisionAvoidance.get_steering para todos los pares candidatos
+    # a la vez. relative_pos y relative_vel van del personaje k a su vecino y
+    # combined_radius es la suma de los radios de colisión de ambos.
+    linear = np.zeros((count, 2))
+    relative_speed_sq = np.einsum('ij,ij->i', relative_vel, relative_vel)
+    moving = relative_speed_sq > 0
+    k, combined_radius = k[moving], combined_radius[moving]
+    relative_pos, relative_vel = relative_pos[moving], relative_vel[moving]
+    relative_speed_sq = relative_speed_sq[moving]
+
+    # Tiempo hasta el acercamiento máximo y separación mínima
+    time_to_collision = -np.einsum('ij,ij->i', relative_pos, relative_vel) / relative_speed_sq
+    distance = np.hypot(relative_pos[:, 0], relative_pos[:, 1])
+    min_separation = distance - np.sqrt(relative_speed_sq) * time_to_collision
+
+    # Solo nos importan las colisiones futuras dentro del horizonte de tiempo
+    threatening = ((min_separation <= combined_radius) & (time_to_collision > 0) &
+                   (time_to_collision < time_horizon))
+    if not threatening.any():
+        return linear
+    k, time_to_collision = k[threatening], time_to_collision[threatening]
+    relative_pos, relative_vel = relative_pos[threatening], relative_vel[threatening]
+    distance, min_separation = distance[threatening], min_separation[threatening]
+    combined_radius = combined_radius[threatening]
+
+    # Para cada personaje nos quedamos con la colisión más próxima
+    order = np.lexsort((time_to_collision, k))
+    first = order[np.unique(k[order], return_index=True)[1]]
+    k, time_to_collision = k[first], time_to_collision[first]
+
+    # Si ya estamos en colisión nos alejamos de la posición actual del
+    # vecino; si no, de su posición en el momento de la colisión
+    colliding = (min_separation[first] <= 0) | (distance[first] < combined_radius[first])
+    relative_pos = np.where(colliding[:, None], relative_pos[first],
+                            relative_pos[first] + relative_vel[first] * time_to_collision[:, None])
+
+    length = np.hypot(relative_pos[:, 0], relative_pos[:, 1])
+    valid = length > 0
+    k_max = np.broadcast_to(max_acceleration, (count,))[k[valid]]
+    linear[k[valid]] = -relative_pos[valid] / length[valid, None] * k_max[:, None]
+    return linear
+
+
+class BatchCollisionAvoidance:
+    def __init__(self, population: KinematicPopulation, grid: SpatialHashGrid, radius=50.0, time_horizon: float = 2.0,
+                 max_pairs: int = 1 << 17):
+        # La rejilla debe reconstruirse con population.position una vez por tick.
+        # radius puede ser un escalar o un arreglo con el radio de cada personaje.
+        # max_pairs: pares candidatos que se procesan a la vez (acota la memoria)
+        self.population: KinematicPopulation = population
+        self.grid: SpatialHashGrid = grid
+        self.radius = radius
+        self.time_horizon: float = time_horizon
+        self.max_pairs: int = max_pairs
+
+    def reach(self, radius: np.ndarray) -> np.ndarray:
+        # Lo que puede recorrer cada personaje antes del horizonte más su
+        # radio: dos personajes solo pueden chocar si ahora están a menos de
+        # la suma de sus alcances, (|v_i| + |v_j|) * horizonte + r_i + r_j
+        velocity = self.population.velocity
+        return np.hypot(velocity[:, 0], velocity[:, 1]) * self.time_horizon + radius
+
+    def chunk_size(self, radius: float) -> int:
+        # Personajes por bloque para que cada bloque tenga unos max_pairs
+        # candidatos, según la densidad media de la rejilla
+        grid = self.grid
+        area = (2 * radius + grid.cell_width) * (2 * radius + grid.cell_height)
+        candidates = len(grid.positions) * min(1.0, area / (grid.width * grid.height))
+        return max(1, int(self.max_pairs / max(candidates, 1.0)))
+
+    def get_steering(self, indices=None):
+        population = self.population
+        if indices is None:
+            indices = slice(0, len(population))
+        radius = np.broadcast_to(self.radius, (len(population),))
+        max_acceleration = population.max_acceleration[indices]
+        selected = np.arange(len(population))[indices]
+        count = len(selected)
+        linear = np.zeros((count, 2))
+        if count == 0:
+            return linear, np.zeros(count)
+
+        reach = self.reach(radius)
+        max_reach = reach.max()
+        # Por bloques de personajes con alcances parecidos: cada bloque busca
+        # con su propio radio y la memoria no crece con el cuadrado de n
+        by_reach = np.argsort(reach[selected], kind='stable')
+        size = self.chunk_size(2 * max_reach)
+        for start in range(0, count, size):
+            chunk = by_reach[start:start + size]
+            chunk_selected = selected[chunk]
+
+            # Fase amplia: solo los vecinos que podrían alcanzarnos
+            chunk_reach = reach[chunk_selected]
+            k, j = self.grid.query_pairs(chunk_reach[-1] + max_reach, chunk_selected)
+            relative_pos = self.grid.displacement(self.grid.positions[chunk_selected[k]], self.grid.positions[j])
+            bound = chunk_reach[k] + reach[j]
+            close = np.einsum('ij,ij->i', relative_pos, relative_pos) < bound * bound
+            k, j, relative_pos = k[close], j[close], relative_pos[close]
+            relative_vel = population.velocity[j] - population.velocity[chunk_selected[k]]
+
+            # Fase precisa: acercamiento máximo de todos los pares a la vez
+            linear[chunk] = collision_avoidance_kernel(
+                k, relative_pos, relative_vel, radius[chunk_selected[k]] + radius[j],
+                len(chunk), max_acceleration[chunk], self.time_horizon)
+        return linear, np.zeros(count)
+
+
+def prepare_behaviors(behaviors, count: int = None):
+    # prepare de los comportamientos compuestos: se reenvía a cada hijo que
+    # lo tiene (ver SteeringExecutor.get_steering) y los demás reciben un
+    # bloque vacío para que crezcan antes de repartir entre hilos
+    for behavior in behaviors:
+        prepare = getattr(behavior, 'prepare', None)
+        if prepare is not None:
+            prepare(count)
+        elif count is not None:
+            behavior.get_steering(slice(0, 0))
+
+
+class BatchBlendedSteering:
+    def __init__(self, population: KinematicPopulation, behaviors: list):
+        # behaviors es una lista de pares (comportamiento Batch*, peso). Las
+        # aceleraciones máximas se toman de cada personaje.
+        self.population: KinematicPopulation = population
+        self.behaviors: list = behaviors
+
+    def prepare(self, count: int = None):
+        prepare_behaviors([behavior for behavior, _ in self.behaviors], count)
+
+    def get_steering(self, indices=None):
+        population = self.population
+        if indices is None:
+            indices = slice(0, len(population))
+        max_acceleration = population.max_acceleration[indices]
+        count = len(max_acceleration)
+
+        # Suma ponderada de todos los comportamientos
+        linear = np.zeros((count, 2))
+        angular = np.zeros(count)
+        for behavior, weight in self.behaviors:
+            behavior_linear, behavior_angular = behavior.get_steering(indices)
+            linear += behavior_linear * weight
+            angular += behavior_angular * weight
+
+        # Limitar las aceleraciones máximas
+        max_angular_acceleration = population.max_angular_acceleration[indices]
+        np.clip(angular, -max_angular_acceleration, max_angular_acceleration, out=angular)
+        return clamp_length(linear, max_acceleration), angular
+
+
+class BatchPrioritySteering:
+    def __init__(self, population: KinematicPopulation, groups: list, epsilon: float = 0.01):
+        # groups son comportamientos Batch* (normalmente BatchBlendedSteering)
+        # ordenados de mayor a menor prioridad
+        self.population: KinematicPopulation = population
+        self.groups: list = groups
+        self.epsilon: float = epsilon
+
+    def prepare(self, count: int = None):
+        prepare_behaviors(self.groups, count)
+
+    def get_steering(self, indices=None):
+        population = self.population
+        if indices is None:
+            indices = slice(0, len(population))
+        selected = np.arange(len(population))[indices]
+        count = len(selected)
+        linear = np.zeros((count, 2))
+        angular = np.zeros(count)
+
+        # Posiciones (dentro del resultado) de los personajes que aún no
+        # tienen un grupo con salida apreciable
+        pending = np.arange(count)
+        for number, group in enumerate(self.groups):
+            if len(pending) == 0:
+                break
+            group_linear, group_angular = group.get_steering(selected[pending])
+            if number == len(self.groups) - 1:
+                # El último grupo se queda con todos los que faltan
+                decided = np.ones(len(pending), dtype=bool)
+            else:
+                magnitude = np.hypot(group_linear[:, 0], group_linear[:, 1])
+                decided = (magnitude > self.epsilon) | (np.abs(group_angular) > self.epsilon)
+            linear[pending[decided]] = group_linear[decided]
+            angular[pending[decided]] = group_angular[decided]
+            # Los grupos de menor prioridad solo se evalúan para el resto
+            pending = pending[~decided]
+        return linear, angular
+
+
+class BatchObstacleAvoidance:
+    def __init__(self, population: KinematicPopulation, obstacles: ObstacleSet, avoid_distance: float, lookahead: float):
+        # Lanza el rayo de cada personaje contra el índice de obstáculos en
+        # una sola consulta
+        self.population: KinematicPopulation = population
+        self.obstacles: ObstacleSet = obstacles
+        self.avoid_distance: float = avoid_distance
+        self.lookahead: float = lookahead
+
+    def get_steering(self, indices=None):
+        population = self.population
+        if indices is None:
+            indices = slice(0, len(population))
+        position = population.position[indices]
+        velocity = population.velocity[indices]
+        max_acceleration = population.max_acceleration[indices]
+        count = len(position)
+        linear = np.zeros((count, 2))
+
+        # Dirección de cada personaje (los que están quietos no lanzan rayo)
+        speed = np.hypot(velocity[:, 0], velocity[:, 1])
+        moving = speed > 0
+        direction = velocity[moving] / speed[moving, None]
+        hit, obstacle, _, closest = self.obstacles.raycast(
+            position[moving], direction, self.lookahead)
+        if not hit.any():
+            return linear, np.zeros(count)
+
+        # Nos alejamos del centro del obstáculo, perpendicular al rayo
+        avoidance = closest[hit] - self.obstacles.centers[obstacle[hit]]
+        length = np.hypot(avoidance[:, 0], avoidance[:, 1])
+        through_center = length == 0
+        avoidance[through_center] = direction[hit][through_center] @ np.array([[0.0, 1.0], [-1.0, 0.0]])
+        length[through_center] = 1.0
+        rows = np.nonzero(moving)[0][hit]
+        linear[rows] = avoidance / length[:, None] * max_acceleration[rows, None]
+        return linear, np.zeros(count)
+
+
+class BatchWallAvoidance:
+    def __init__(self, population: KinematicPopulation, walls: WallSet, avoid_distance: float, lookahead: float, whisker_angle: float = math.pi / 6, whisker_length: float = None):
+        # Lanza los tres rayos de cada personaje contra el índice de paredes
+        # en una sola consulta
+        self.population: KinematicPopulation = population
+        self.walls: WallSet = walls
+        self.avoid_distance: float = avoid_distance
+        self.lookahead: float = lookahead
+        self.whisker_angle: float = whisker_angle
+        self.whisker_length: float = whisker_length if whisker_length is not None else lookahead / 2
+
+    def get_steering(self, indices=None):
+        population = self.population
+        if indices is None:
+            indices = slice(0, len(population))
+        position = population.position[indices]
+        velocity = population.velocity[indices]
+        max_acceleration = population.max_acceleration[indices]
+        count = len(position)
+        linear = np.zeros((count, 2))
+
+        # Los personajes quietos no lanzan rayos
+        speed = np.hypot(velocity[:, 0], velocity[:, 1])
+        moving = np.nonzero(speed > 0)[0]
+        direction = velocity[moving] / speed[moving, None]
+        moving_count = len(moving)
+
+        # Rayos en bloques: primero todos los centrales y luego cada bigote
+        rays = np.concatenate([np.stack(ray, axis=1) for ray in
+                               whisker_directions(direction[:, 0], direction[:, 1], self.whisker_angle)])
+        lengths = np.repeat([self.lookahead, self.whisker_length, self.whisker_length], moving_count)
+        hit, _, distance, point, normal = self.walls.raycast(np.tile(position[moving], (3, 1)), rays, lengths)
+        if not hit.any():
+            return linear, np.zeros(count)
+
+        # Para cada personaje, el rayo con el choque más próximo
+        nearest = np.argmin(distance.reshape(3, moving_count), axis=0)
+        ray_index = nearest * moving_count + np.arange(moving_count)
+        collided = hit[ray_index]
+        ray_index = ray_index[collided]
+        rows = moving[collided]
+
+        # Buscar un punto alejado de la pared sobre su normal
+        target = point[ray_index] + normal[ray_index] * self.avoid_distance
+        seek = target - position[rows]
+        length = np.hypot(seek[:, 0], seek[:, 1])
+        valid = length > 0
+        linear[rows[valid]] = seek[valid] / length[valid, None] * max_acceleration[rows[valid], None]
+        return linear, np.zeros(count)
+
+
+class BatchDistanceFieldAvoidance:
+    def __init__(self, population: KinematicPopulation, field: DistanceField, avoid_distance: float, lookahead: float):
+        # Consulta el campo de distancia en el punto adelantado de cada personaje
+        self.population: KinematicPopulation = population
+        self.field: DistanceField = field
+        self.avoid_distance: float = avoid_distance
+        self.lookahead: float = lookahead
+
+    def get_steering(self, indices=None):
+        population = self.population
+        if indices is None:
+            indices = slice(0, len(population))
+        position = population.position[indices]
+        velocity = population.velocity[indices]
+        max_acceleration = population.max_acceleration[indices]
+
+        # Punto adelantado en la dirección de la velocidad (los quietos usan su posición)
+        speed = np.hypot(velocity[:, 0], velocity[:, 1])
+        moving = speed > 0
+        probe = position.copy()
+        probe[moving] += velocity[moving] * (self.lookahead / speed[moving])[:, None]
+
+        distance, normal = self.field.sample(probe)
+        near = distance < self.avoid_distance
+        linear = np.zeros((len(position), 2))
+        linear[near] = normal[near] * max_acceleration[near, None]
+        return linear, np.zeros(len(position))
+
+
+class BatchPathFollowing:
+    def __init__(self, population: KinematicPopulation, path: Path, path_offset: float, window: float = 100.0):
+        self.population: KinematicPopulation = population
+        self.path: Path = path
+        self.path_offset: float = path_offset
+        self.window: float = window
+        # Parámetro actual de cada personaje (NaN hasta la primera búsqueda)
+        self.current_param: np.ndarray = np.full(len(population), np.nan)
+
+    def _sync_size(self):
+        # La población puede crecer después de crear el comportamiento
+        missing = len(self.population) - len(self.current_param)
+        if missing > 0:
+            self.current_param = np.concatenate((self.current_param, np.full(missing, np.nan)))
+
+    def get_steering(self, indices=None):
+        self._sync_size()
+        population = self.population
+        if indices is None:
+            indices = slice(0, len(population))
+        position = population.position[indices]
+
+        # Parámetros actuales cerca de los anteriores, y targets más adelante
+        params = self.path.get_params(position, self.current_param[indices], self.window)
+        self.current_param[indices] = params
+        target = self.path.get_positions(params + self.path_offset)
+
+        # DynamicSeek hacia cada target
+        seek = target - position
+        length = np.hypot(seek[:, 0], seek[:, 1])
+        valid = length > 0
+        linear = np.zeros_like(seek)
+        max_acceleration = population.max_acceleration[indices]
+        linear[valid] = seek[valid] / length[valid, None] * max_acceleration[valid, None]
+        return linear, np.zeros(len(position))
+
+
+class BatchLookWhereYouAreGoing:
+    def __init__(self, population: KinematicPopulation, target_radius: float, slow_radius: float, time_to_target: float = 0.1):
+        # Igual que LookWhereYouAreGoing: Align hacia la dirección de la velocidad
+        self.population: KinematicPopulation = population
+        self.target_radius: float = target_radius
+        self.slow_radius: float = slow_radius
+        self.time_to_target: float = time_to_target
+
+    def get_steering(self, indices=None):
+        population = self.population
+        if indices is None:
+            indices = slice(0, len(population))
+        velocity = population.velocity[indices]
+        target_orientation = np.arctan2(-velocity[:, 1], velocity[:, 0])
+        angular = align_kernel(population.orientation[indices], population.rotation[indices], target_orientation,
+                               population.max_rotation[indices], population.max_angular_acceleration[indices],
+                               self.target_radius, self.slow_radius, self.time_to_target)
+        # Sin velocidad no hay a dónde mirar
+        angular[(velocity[:, 0] == 0) & (velocity[:, 1] == 0)] = 0.0
+        return np.zeros((len(angular), 2)), angular
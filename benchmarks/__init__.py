@@ -0,0 +1,4 @@
+# benchmarks/__init__.py
+
+# Mediciones de rendimiento de los comportamientos de steering y de los
+# escenarios completos. Se ejecutan con: python -m benchmarks
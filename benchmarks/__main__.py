@@ -0,0 +1,56 @@
+# benchmarks/__main__.py
+
+import argparse
+import sys
+from benchmarks import render_bench, runner, scenario_bench, steering_bench
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Mide el rendimiento de los comportamientos, los escenarios y el dibujo.")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000, 10000],
+                        help="Números de personajes a medir")
+    parser.add_argument("--group", choices=["steering", "scenario", "render", "all"], default="all",
+                        help="Qué grupo de mediciones ejecutar")
+    parser.add_argument("--only", nargs="+", default=None,
+                        help="Nombres de comportamientos o escenarios a medir")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Segundos mínimos de medición por caso")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json",
+                        help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--baseline", default=None,
+                        help="Archivo JSON con una línea base para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Empeoramiento permitido respecto a la línea base (0.2 = 20 %%)")
+    args = parser.parse_args()
+
+    results = []
+    groups = []
+    if args.group in ("steering", "all"):
+        groups.append(steering_bench.run(args.counts, args.only, args.min_time, args.seed))
+    if args.group in ("scenario", "all"):
+        groups.append(scenario_bench.run(args.counts, args.only, args.min_time, args.seed))
+    if args.group in ("render", "all"):
+        groups.append(render_bench.run(args.counts, args.only, args.min_time, args.seed))
+    for group in groups:
+        for result in group:
+            runner.report(result)
+            results.append(result)
+
+    runner.save(args.output, results)
+    print(f"Resultados guardados en {args.output}")
+
+    if args.baseline:
+        regressions = runner.compare(results, runner.load(args.baseline), args.tolerance)
+        for result, base, ratio in regressions:
+            print(f"REGRESIÓN {result['group']}/{result['name']} N={result['count']}: "
+                  f"{base['ns_per_agent_tick']:.0f} -> {result['ns_per_agent_tick']:.0f} ns (x{ratio:.2f})")
+        if regressions:
+            sys.exit(1)
+        print("Sin regresiones respecto a la línea base")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/render_bench.py
+
+import random
+import numpy as np
+import pygame
+from drawing import PacmanSpriteCache, draw_pacman
+from benchmarks.runner import measure
+from utils import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK
+
+# Dibujo de personajes en una Surface fuera de pantalla (sin ventana)
+
+
+def make_poses(count: int):
+    rng = np.random.default_rng(random.getrandbits(64))
+    position = rng.uniform(0, 1, (count, 2)) * (SCREEN_WIDTH, SCREEN_HEIGHT)
+    orientation = rng.uniform(-np.pi, np.pi, count)
+    return position, orientation
+
+
+def draw_pacman_factory(count: int):
+    # Polígono de cada personaje en cada cuadro, sin caché
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    position, orientation = make_poses(count)
+    position, orientation = position.tolist(), orientation.tolist()
+
+    def tick():
+        surface.fill(BLACK)
+        for i in range(count):
+            draw_pacman(surface, position[i], orientation[i])
+    return tick
+
+
+def sprite_blit_factory(count: int):
+    # Un blit por personaje con los sprites en caché
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    sprites = PacmanSpriteCache()
+    position, orientation = make_poses(count)
+
+    def tick():
+        surface.fill(BLACK)
+        for i in range(count):
+            sprites.draw(surface, position[i], orientation[i])
+    return tick
+
+
+def sprite_blits_factory(count: int):
+    # Todos los personajes en una sola llamada a Surface.blits
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    sprites = PacmanSpriteCache()
+    position, orientation = make_poses(count)
+
+    def tick():
+        surface.fill(BLACK)
+        sprites.draw_many(surface, position, orientation)
+    return tick
+
+
+# (nombre, fábrica)
+BENCHMARKS = [
+    ('draw_pacman', draw_pacman_factory),
+    ('PacmanSpriteCache.draw', sprite_blit_factory),
+    ('PacmanSpriteCache.draw_many', sprite_blits_factory),
+]
+
+
+def run(counts: list, names: list = None, min_time: float = 0.2, seed: int = 0):
+    for name, factory in BENCHMARKS:
+        if names and name not in names:
+            continue
+        for count in counts:
+            random.seed(seed)
+            result = {'group': 'render', 'name': name, 'count': count}
+            result.update(measure(factory(count), count, min_time))
+            yield result
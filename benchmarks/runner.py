@@ -0,0 +1,80 @@
+# benchmarks/runner.py
+
+import json
+import platform
+import sys
+import time
+import numpy as np
+import pygame
+
+# Utilidades comunes: medir, guardar resultados en JSON y comparar con una
+# línea base guardada previamente.
+
+
+def measure(tick, count: int, min_time: float = 0.2, max_ticks: int = 1000) -> dict:
+    # Ejecuta tick() hasta acumular min_time segundos (al menos un tick) y
+    # devuelve el tiempo por personaje y por tick en nanosegundos
+    tick()  # Calentamiento (cachés, asignaciones iniciales)
+    ticks = 0
+    elapsed = 0.0
+    while ticks < max_ticks and (ticks == 0 or elapsed < min_time):
+        start = time.perf_counter_ns()
+        tick()
+        elapsed += (time.perf_counter_ns() - start) / 1e9
+        ticks += 1
+    return {
+        'count': count,
+        'ticks': ticks,
+        'seconds': elapsed,
+        'ns_per_tick': elapsed * 1e9 / ticks,
+        'ns_per_agent_tick': elapsed * 1e9 / (ticks * count),
+    }
+
+
+def metadata() -> dict:
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+
+
+def save(path: str, results: list):
+    with open(path, 'w') as file:
+        json.dump({'meta': metadata(), 'results': results}, file, indent=2)
+
+
+def load(path: str) -> list:
+    with open(path) as file:
+        return json.load(file)['results']
+
+
+def _key(result: dict) -> tuple:
+    return result['group'], result['name'], result['count']
+
+
+def compare(results: list, baseline: list, tolerance: float = 0.2) -> list:
+    # Devuelve las mediciones que empeoraron más de tolerance (0.2 = 20 %)
+    # respecto a la línea base, como (resultado, resultado_base, proporción)
+    previous = {_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get(_key(result))
+        if base is None or 'ns_per_agent_tick' not in result or 'ns_per_agent_tick' not in base:
+            continue
+        ratio = result['ns_per_agent_tick'] / base['ns_per_agent_tick']
+        if ratio > 1 + tolerance:
+            regressions.append((result, base, ratio))
+    return regressions
+
+
+def report(result: dict, out=sys.stdout):
+    name = f"{result['group']}/{result['name']}"
+    if 'skipped' in result:
+        print(f"{name:<48} N={result['count']:<6} omitido ({result['skipped']})", file=out)
+    else:
+        print(f"{name:<48} N={result['count']:<6} {result['ns_per_agent_tick']:>12.0f} ns/personaje/tick"
+              f"  ({result['ticks']} ticks)", file=out)
@@ -0,0 +1,51 @@
+# benchmarks/scenario_bench.py
+
+import random
+import numpy as np
+from scenarios import SCENARIOS
+from headless import scripted_pointer
+from benchmarks.runner import measure
+from benchmarks.steering_bench import QUADRATIC_LIMIT
+
+# Ticks completos de cada escenario de main.py sin pantalla
+
+# Escenarios O(n²): en el mundo del tamaño de la pantalla casi todos los
+# personajes quedan al alcance de Collision Avoidance (radio 50, horizonte
+# 2 s). Por encima del límite se omiten.
+LIMITS = {'collision_avoidance': QUADRATIC_LIMIT}
+
+
+def scenario_agents(scenario) -> int:
+    # Número total de personajes simulados (Pursue and Evade tiene dos por count)
+    if hasattr(scenario, 'pursuers'):
+        return len(scenario.pursuers) + len(scenario.evaders)
+    return scenario.count
+
+
+def run(counts: list, names: list = None, min_time: float = 0.2, seed: int = 0,
+        delta_time: float = 1 / 60):
+    for name, scenario_class in SCENARIOS.items():
+        if names and name not in names:
+            continue
+        for count in counts:
+            limit = LIMITS.get(name)
+            if limit is not None and count > limit:
+                yield {'group': 'scenario', 'name': name, 'count': count, 'skipped': f"O(n²), límite {limit}"}
+                continue
+            random.seed(seed)
+            np.random.seed(seed)
+            scenario = scenario_class(count)
+            elapsed = [0.0]
+
+            def tick():
+                scenario.pointer = scripted_pointer(elapsed[0], scenario.width, scenario.height)
+                scenario.step(delta_time)
+                elapsed[0] += delta_time
+
+            result = {'group': 'scenario', 'name': name, 'count': count}
+            try:
+                result.update(measure(tick, scenario_agents(scenario), min_time))
+            finally:
+                scenario.close()
+            result['count'] = count
+            yield result
@@ -0,0 +1,343 @@
+# benchmarks/steering_bench.py
+
+import math
+import random
+import numpy as np
+import pygame
+from characters import Kinematic, KinematicPopulation, Static, SteeringOutput
+from algorithms import *
+from drawing import Path
+from distance_field import DistanceField
+from executor import SteeringExecutor
+from obstacles import ObstacleSet, WallSet
+from spatial import SpatialHashGrid
+from utils import SCREEN_WIDTH, SCREEN_HEIGHT
+from benchmarks.runner import measure
+
+# Cada fábrica recibe el número de personajes y devuelve una función que
+# ejecuta un tick (get_steering de todos los personajes una vez).
+
+# Los comportamientos que recorren a todos los demás personajes son O(n²),
+# igual que Collision Avoidance por lotes con los parámetros del escenario
+# (en la pantalla casi todos los pares son candidatos); por encima de este
+# número se omiten
+QUADRATIC_LIMIT = 1000
+
+
+def make_characters(count: int) -> list:
+    characters = []
+    for _ in range(count):
+        character = Kinematic()
+        character.position = pygame.math.Vector2(
+            random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT))
+        character.orientation = random.uniform(-math.pi, math.pi)
+        character.velocity = pygame.math.Vector2(
+            random.uniform(-100, 100), random.uniform(-100, 100))
+        character.rotation = random.uniform(-1, 1)
+        characters.append(character)
+    return characters
+
+
+def make_target() -> Kinematic:
+    target = Kinematic()
+    target.position = pygame.math.Vector2(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+    target.velocity = pygame.math.Vector2(50, 20)
+    target.orientation = 1.0
+    return target
+
+
+def make_obstacles(count: int = 50) -> list:
+    return [{'position': pygame.math.Vector2(random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT)),
+             'radius': 30} for _ in range(count)]
+
+
+def make_population(count: int) -> KinematicPopulation:
+    population = KinematicPopulation(count)
+    population.spawn(count,
+                     position=np.random.uniform(0, 1, (count, 2)) * (SCREEN_WIDTH, SCREEN_HEIGHT),
+                     orientation=np.random.uniform(-math.pi, math.pi, count),
+                     velocity=np.random.uniform(-100, 100, (count, 2)))
+    return population
+
+
+def behaviors_tick(behaviors: list):
+    def tick():
+        for behavior in behaviors:
+            behavior.get_steering()
+    return tick
+
+
+def per_character(build):
+    # Fábrica para comportamientos que se crean una vez por personaje
+    def factory(count: int):
+        target = make_target()
+        return behaviors_tick([build(character, target) for character in make_characters(count)])
+    return factory
+
+
+def circle_path() -> Path:
+    return Path([pygame.math.Vector2(SCREEN_WIDTH / 2 + 200 * math.cos(2 * math.pi * i / 36),
+                                     SCREEN_HEIGHT / 2 + 200 * math.sin(2 * math.pi * i / 36))
+                 for i in range(36)])
+
+
+# Número de vértices del camino denso (como los de los niveles reales)
+DENSE_PATH_POINTS = 20000
+
+
+def dense_path() -> Path:
+    angles = np.linspace(0, 2 * math.pi, DENSE_PATH_POINTS, endpoint=False)
+    return Path(np.stack((SCREEN_WIDTH / 2 + 300 * np.cos(angles) + 20 * np.cos(7 * angles),
+                          SCREEN_HEIGHT / 2 + 300 * np.sin(angles)), axis=1))
+
+
+def batch_path_following_factory(count: int):
+    behavior = BatchPathFollowing(make_population(count), dense_path(), 10.0, window=5.0)
+    return behavior.get_steering
+
+
+def separation_factory(count: int):
+    characters = make_characters(count)
+    return behaviors_tick([Separation(character, characters, 20.0, 1000.0, 100.0) for character in characters])
+
+
+def separation_grid_factory(count: int):
+    characters = make_characters(count)
+    grid = SpatialHashGrid(20.0, SCREEN_WIDTH, SCREEN_HEIGHT)
+    behaviors = [Separation(character, characters, 20.0, 1000.0, 100.0, grid=grid) for character in characters]
+
+    def tick():
+        grid.rebuild([(character.position.x, character.position.y) for character in characters])
+        for behavior in behaviors:
+            behavior.get_steering()
+    return tick
+
+
+def collision_avoidance_factory(count: int):
+    characters = make_characters(count)
+    return behaviors_tick([CollisionAvoidance(character, characters, 100.0) for character in characters])
+
+
+def obstacle_avoidance_factory(count: int):
+    obstacles = make_obstacles()
+    return behaviors_tick([ObstacleAvoidance(character, obstacles, 50.0, 50.0, 100.0)
+                           for character in make_characters(count)])
+
+
+# Mapa con muchos obstáculos fijos para las versiones con índice espacial
+INDEXED_OBSTACLES = 2000
+
+
+def make_obstacle_set(count: int = INDEXED_OBSTACLES) -> ObstacleSet:
+    return ObstacleSet(np.random.uniform(0, 1, (count, 2)) * (SCREEN_WIDTH, SCREEN_HEIGHT),
+                       np.random.uniform(2, 8, count), SCREEN_WIDTH, SCREEN_HEIGHT, cell_size=32.0)
+
+
+def obstacle_set_avoidance_factory(count: int):
+    obstacles = make_obstacle_set()
+    return behaviors_tick([ObstacleAvoidance(character, obstacles, 50.0, 50.0, 100.0)
+                           for character in make_characters(count)])
+
+
+def batch_obstacle_avoidance_factory(count: int):
+    behavior = BatchObstacleAvoidance(make_population(count), make_obstacle_set(), 50.0, 50.0)
+    return behavior.get_steering
+
+
+def make_wall_set(count: int = INDEXED_OBSTACLES) -> WallSet:
+    starts = np.random.uniform(0, 1, (count, 2)) * (SCREEN_WIDTH, SCREEN_HEIGHT)
+    return WallSet(starts, starts + np.random.uniform(-20, 20, (count, 2)),
+                   SCREEN_WIDTH, SCREEN_HEIGHT, cell_size=32.0)
+
+
+def wall_avoidance_factory(count: int):
+    walls = make_wall_set()
+    return behaviors_tick([WallAvoidance(character, walls, 30.0, 50.0, 100.0)
+                           for character in make_characters(count)])
+
+
+def batch_wall_avoidance_factory(count: int):
+    behavior = BatchWallAvoidance(make_population(count), make_wall_set(), 30.0, 50.0)
+    return behavior.get_steering
+
+
+def make_distance_field() -> DistanceField:
+    return DistanceField(SCREEN_WIDTH, SCREEN_HEIGHT, 4.0, make_obstacle_set(), make_wall_set(), solid_border=True)
+
+
+def distance_field_avoidance_factory(count: int):
+    field = make_distance_field()
+    return behaviors_tick([DistanceFieldAvoidance(character, field, 20.0, 50.0, 100.0)
+                           for character in make_characters(count)])
+
+
+def batch_distance_field_avoidance_factory(count: int):
+    behavior = BatchDistanceFieldAvoidance(make_population(count), make_distance_field(), 20.0, 50.0)
+    return behavior.get_steering
+
+
+def kinematic_update_factory(count: int):
+    characters = make_characters(count)
+    steering = SteeringOutput()
+    steering.linear = pygame.math.Vector2(10, 5)
+    steering.angular = 0.5
+
+    def tick():
+        for character in characters:
+            character.update(steering, 1 / 60)
+    return tick
+
+
+def population_update_factory(count: int):
+    population = make_population(count)
+    linear = np.full((count, 2), 10.0)
+    angular = np.full(count, 0.5)
+    return lambda: population.update(linear, angular, 1 / 60)
+
+
+def batch_wander(count: int) -> BatchDynamicWander:
+    return BatchDynamicWander(make_population(count), 100.0, 80.0, math.pi / 4, 0.01, math.pi / 4)
+
+
+def batch_separation_factory(count: int):
+    population = make_population(count)
+    grid = SpatialHashGrid(20.0, SCREEN_WIDTH, SCREEN_HEIGHT)
+    behavior = BatchSeparation(population, grid, 20.0, 1000.0)
+
+    def tick():
+        grid.rebuild(population.position)
+        behavior.get_steering()
+    return tick
+
+
+def batch_collision_avoidance_factory(count: int):
+    # Con los parámetros del escenario collision_avoidance
+    population = make_population(count)
+    grid = SpatialHashGrid(100.0, SCREEN_WIDTH, SCREEN_HEIGHT)
+    behavior = BatchCollisionAvoidance(population, grid, radius=50.0, time_horizon=2.0)
+
+    def tick():
+        grid.rebuild(population.position)
+        behavior.get_steering()
+    return tick
+
+
+def blended_factory(count: int):
+    characters = make_characters(count)
+    target = make_target()
+    return behaviors_tick([BlendedSteering(character, [
+        (DynamicSeek(character, target, 100.0), 1.0),
+        (VelocityMatching(character, target, 100.0, 0.1), 0.5),
+    ], 100.0) for character in characters])
+
+
+def batch_priority_factory(count: int):
+    # Collision Avoidance tiene prioridad; Dynamic Wander solo se evalúa
+    # para los personajes sin colisiones próximas
+    population = make_population(count)
+    grid = SpatialHashGrid(100.0, SCREEN_WIDTH, SCREEN_HEIGHT)
+    behavior = BatchPrioritySteering(population, [
+        BatchCollisionAvoidance(population, grid, radius=10.0, time_horizon=0.5),
+        BatchDynamicWander(population, 100.0, 80.0, math.pi / 4, 0.01, math.pi / 4),
+    ])
+
+    def tick():
+        grid.rebuild(population.position)
+        behavior.get_steering()
+    return tick
+
+
+def batch_seek(count: int) -> BatchDynamicSeek:
+    return BatchDynamicSeek(make_population(count), (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2))
+
+
+def batch_arrive(count: int) -> BatchDynamicArrive:
+    return BatchDynamicArrive(make_population(count), (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2), 40.0, 250.0)
+
+
+def batch(build):
+    # Fábrica que mide get_steering de un comportamiento por lotes
+    return lambda count: build(count).get_steering
+
+
+def threaded(build):
+    # Como batch, pero evaluando el comportamiento por bloques en varios hilos
+    def factory(count: int):
+        behavior = build(count)
+        executor = SteeringExecutor(chunk_size=1024)
+        return lambda: executor.get_steering(behavior)
+    return factory
+
+
+def threaded_separation_factory(count: int):
+    population = make_population(count)
+    grid = SpatialHashGrid(20.0, SCREEN_WIDTH, SCREEN_HEIGHT)
+    behavior = BatchSeparation(population, grid, 20.0, 1000.0)
+    executor = SteeringExecutor(chunk_size=1024)
+
+    def tick():
+        grid.rebuild(population.position)
+        executor.get_steering(behavior)
+    return tick
+
+
+# (nombre, fábrica, número máximo de personajes o None)
+BENCHMARKS = [
+    ('KinematicSeek', per_character(lambda c, t: KinematicSeek(c, t, 200.0)), None),
+    ('KinematicFlee', per_character(lambda c, t: KinematicFlee(c, t, 200.0)), None),
+    ('KinematicArrive', per_character(lambda c, t: KinematicArrive(c, t, 200.0, 50.0, 0.25)), None),
+    ('KinematicWander', per_character(lambda c, t: KinematicWander(c, 150.0, 0.1)), None),
+    ('DynamicSeek', per_character(lambda c, t: DynamicSeek(c, t, 100.0)), None),
+    ('DynamicFlee', per_character(lambda c, t: DynamicFlee(c, t, 100.0)), None),
+    ('DynamicArrive', per_character(lambda c, t: DynamicArrive(c, t, 100.0, 200.0, 40.0, 250.0, 0.1)), None),
+    ('Align', per_character(lambda c, t: Align(c, t, math.pi, math.pi, 0.01, math.pi / 3)), None),
+    ('VelocityMatching', per_character(lambda c, t: VelocityMatching(c, t, 100.0, 0.1)), None),
+    ('Face', per_character(lambda c, t: Face(c, t.position, math.pi, math.pi, 0.01, math.pi / 4)), None),
+    ('Pursue', per_character(lambda c, t: Pursue(c, t, 100.0, 2.0)), None),
+    ('Evade', per_character(lambda c, t: Evade(c, t, 100.0, 2.0)), None),
+    ('LookWhereYouAreGoing', per_character(lambda c, t: LookWhereYouAreGoing(c, math.pi, math.pi, 0.01, math.pi / 4)), None),
+    ('DynamicWander', per_character(lambda c, t: DynamicWander(
+        c, 100.0, 80.0, math.pi / 4, 100.0, math.pi, math.pi, 0.01, math.pi / 4)), None),
+    ('PathFollowing', per_character(lambda c, t, path=circle_path(): PathFollowing(c, path, 10.0, 100.0)), None),
+    ('PathFollowing+dense', per_character(lambda c, t, path=dense_path(): PathFollowing(c, path, 10.0, 100.0, window=5.0)), None),
+    ('BatchPathFollowing', batch_path_following_factory, None),
+    ('Separation', separation_factory, QUADRATIC_LIMIT),
+    ('Separation+grid', separation_grid_factory, None),
+    ('CollisionAvoidance', collision_avoidance_factory, QUADRATIC_LIMIT),
+    ('ObstacleAvoidance', obstacle_avoidance_factory, None),
+    ('ObstacleAvoidance+index', obstacle_set_avoidance_factory, None),
+    ('BatchObstacleAvoidance', batch_obstacle_avoidance_factory, None),
+    ('WallAvoidance', wall_avoidance_factory, None),
+    ('BatchWallAvoidance', batch_wall_avoidance_factory, None),
+    ('DistanceFieldAvoidance', distance_field_avoidance_factory, None),
+    ('BatchDistanceFieldAvoidance', batch_distance_field_avoidance_factory, None),
+    ('Kinematic.update', kinematic_update_factory, None),
+    ('KinematicPopulation.update', population_update_factory, None),
+    ('BatchDynamicWander', batch(batch_wander), None),
+    ('BatchSeparation', batch_separation_factory, None),
+    ('BatchCollisionAvoidance', batch_collision_avoidance_factory, QUADRATIC_LIMIT),
+    ('BlendedSteering', blended_factory, None),
+    ('BatchDynamicSeek', batch(batch_seek), None),
+    ('BatchDynamicArrive', batch(batch_arrive), None),
+    ('BatchDynamicSeek+threads', threaded(batch_seek), None),
+    ('BatchDynamicArrive+threads', threaded(batch_arrive), None),
+    ('BatchDynamicWander+threads', threaded(batch_wander), None),
+    ('BatchSeparation+threads', threaded_separation_factory, None),
+    ('BatchPrioritySteering', batch_priority_factory, None),
+]
+
+
+def run(counts: list, names: list = None, min_time: float = 0.2, seed: int = 0) -> list:
+    results = []
+    for name, factory, max_count in BENCHMARKS:
+        if names and name not in names:
+            continue
+        for count in counts:
+            result = {'group': 'steering', 'name': name, 'count': count}
+            if max_count is not None and count > max_count:
+                result['skipped'] = f"O(n²), límite {max_count}"
+            else:
+                random.seed(seed)
+                np.random.seed(seed)
+                result.update(measure(factory(count), count, min_time))
+            yield result
@@ -0,0 +1,129 @@
+# camera.py
+
+import numpy as np
+import pygame
+
+# Separación entre coordenadas del mundo y de la pantalla. La simulación
+# trabaja siempre en coordenadas del mundo (que puede ser mucho más grande
+# que la ventana); la cámara decide qué parte se ve y con qué zoom, y solo
+# se dibujan los personajes dentro de esa parte.
+
+# Factor de zoom por cada paso de la rueda del mouse
+ZOOM_STEP = 1.25
+
+
+class Camera:
+    def __init__(self, view_width: float, view_height: float, world_width: float, world_height: float,
+                 zoom: float = 1.0, max_zoom: float = 8.0):
+        self.view_width: float = view_width
+        self.view_height: float = view_height
+        self.world_width: float = world_width
+        self.world_height: float = world_height
+        # El zoom mínimo muestra el mundo entero (o 1 si el mundo entra en la ventana)
+        self.min_zoom: float = min(1.0, view_width / world_width, view_height / world_height)
+        self.max_zoom: float = max_zoom
+        # Píxeles de pantalla por unidad del mundo
+        self.zoom: float = min(max(zoom, self.min_zoom), max_zoom)
+        # Punto del mundo que queda en el centro de la ventana
+        self.center: np.ndarray = np.array([world_width / 2, world_height / 2])
+        self.clamp()
+
+    @property
+    def key(self) -> tuple:
+        # Cambia cada vez que se mueve la cámara (para las capas en caché)
+        return (float(self.center[0]), float(self.center[1]), self.zoom)
+
+    def clamp(self):
+        # No deja ver fuera del mundo; en un eje donde el mundo entra entero
+        # en la ventana, lo centra
+        for axis, view, world in ((0, self.view_width, self.world_width),
+                                  (1, self.view_height, self.world_height)):
+            half = view / (2 * self.zoom)
+            if 2 * half >= world:
+                self.center[axis] = world / 2
+            else:
+                self.center[axis] = min(max(self.center[axis], half), world - half)
+
+    def to_screen(self, points) -> np.ndarray:
+        # Puntos (n, 2) del mundo a píxeles de la ventana
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        return (points - self.center) * self.zoom + (self.view_width / 2, self.view_height / 2)
+
+    def to_screen_point(self, point) -> tuple:
+        return ((point[0] - self.center[0]) * self.zoom + self.view_width / 2,
+                (point[1] - self.center[1]) * self.zoom + self.view_height / 2)
+
+    def to_world(self, point) -> pygame.math.Vector2:
+        # Un punto de la ventana (por ejemplo el mouse) a coordenadas del mundo
+        return pygame.math.Vector2((point[0] - self.view_width / 2) / self.zoom + self.center[0],
+                                   (point[1] - self.view_height / 2) / self.zoom + self.center[1])
+
+    def visible_rect(self, margin: float = 0.0) -> tuple:
+        # (min_x, min_y, max_x, max_y) de la parte visible del mundo, agrandada
+        # en margin unidades del mundo
+        half_x = self.view_width / (2 * self.zoom) + margin
+        half_y = self.view_height / (2 * self.zoom) + margin
+        return (self.center[0] - half_x, self.center[1] - half_y,
+                self.center[0] + half_x, self.center[1] + half_y)
+
+    def visible_mask(self, positions: np.ndarray, margin: float = 0.0) -> np.ndarray:
+        min_x, min_y, max_x, max_y = self.visible_rect(margin)
+        return ((positions[:, 0] >= min_x) & (positions[:, 0] <= max_x) &
+                (positions[:, 1] >= min_y) & (positions[:, 1] <= max_y))
+
+    def pan(self, dx: float, dy: float):
+        # Mueve la vista dx, dy píxeles de pantalla (arrastrar a la derecha
+        # muestra lo que está a la izquierda)
+        self.center -= (dx / self.zoom, dy / self.zoom)
+        self.clamp()
+
+    def zoom_at(self, factor: float, screen_point):
+        # Cambia el zoom dejando fijo el punto del mundo bajo screen_point
+        anchor = self.to_world(screen_point)
+        self.zoom = min(max(self.zoom * factor, self.min_zoom), self.max_zoom)
+        self.center = np.array([anchor.x - (screen_point[0] - self.view_width / 2) / self.zoom,
+                                anchor.y - (screen_point[1] - self.view_height / 2) / self.zoom])
+        self.clamp()
+
+    def fit(self):
+        # Muestra el mundo entero
+        self.zoom = self.min_zoom
+        self.clamp()
+
+    def sprite_radius(self, radius: float) -> int:
+        # Radio en píxeles de un sprite; se redondea para que la caché de
+        # sprites no guarde una versión por cada zoom intermedio
+        return max(1, round(radius * self.zoom))
+
+    def length(self, length: float) -> float:
+        return length * self.zoom
+
+
+class CameraController:
+    # Controles de la cámara: rueda del mouse para el zoom (centrado en el
+    # cursor), arrastrar con el botón derecho o central para mover la vista
+    # y la tecla F para ver el mundo entero
+    def __init__(self, camera: Camera):
+        self.camera: Camera = camera
+        self.dragging: bool = False
+
+    def handle(self, event) -> bool:
+        # Devuelve True si el evento era para la cámara
+        if event.type == pygame.MOUSEWHEEL and event.y:
+            self.camera.zoom_at(ZOOM_STEP ** event.y, pygame.mouse.get_pos())
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (2, 3):
+            self.dragging = True
+        elif event.type == pygame.MOUSEBUTTONUP and event.button in (2, 3):
+            self.dragging = False
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            self.camera.pan(*event.rel)
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_f:
+            self.camera.fit()
+        else:
+            return False
+        return True
+
+
+def view_size(world_width: float, world_height: float, max_width: float, max_height: float) -> tuple:
+    # Tamaño de ventana para un mundo: el del mundo si entra, si no el máximo
+    return (int(min(world_width, max_width)), int(min(world_height, max_height)))
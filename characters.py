@@ -1,8 +1,12 @@
 # characters.py
 
 import math
+import numpy as np
 import pygame
 
+# Intervalo de tiempo al que se refiere el coeficiente de drag (un cuadro a 60 FPS)
+DRAG_TIME_STEP = 1 / 60
+
 
 class SteeringOutput:
     def __init__(self):
@@ -41,12 +45,14 @@ class Kinematic:
 
         self.max_acceleration = 100.0  # Aceleración máxima
         self.max_angular_acceleration = math.pi  # Aceleración angular máxima
-        # Coeficiente de fricción para la velocidad
+        # Coeficiente de fricción: fracción de la velocidad que se conserva
+        # cada DRAG_TIME_STEP segundos
         self.drag = 0.98
 
     def update(self, steering: SteeringOutput, time: float):
-        # Aplicar drag a la velocidad
-        self.velocity *= self.drag
+        # Aplicar drag a la velocidad (proporcional al tiempo transcurrido,
+        # así no depende de la frecuencia de actualización)
+        self.velocity *= self.drag ** (time / DRAG_TIME_STEP)
 
         # Actualizar posición y orientación
         self.position += self.velocity * time
@@ -86,3 +92,225 @@ class Kinematic:
 def map_to_range(angle: float) -> float:
     angle = (angle + math.pi) % (2 * math.pi) - math.pi
     return angle
+
+
+class KinematicPopulation:
+    # Estado de muchos personajes guardado como arreglos contiguos de NumPy
+    # (estructura de arreglos). Cada fila i corresponde a un personaje.
+    def __init__(self, capacity: int = 16):
+        capacity = max(1, capacity)
+        self.size: int = 0
+
+        self._position = np.zeros((capacity, 2))
+        self._velocity = np.zeros((capacity, 2))
+        self._orientation = np.zeros(capacity)
+        self._rotation = np.zeros(capacity)
+
+        self._max_speed = np.zeros(capacity)
+        self._max_rotation = np.zeros(capacity)
+        self._max_acceleration = np.zeros(capacity)
+        self._max_angular_acceleration = np.zeros(capacity)
+        self._drag = np.zeros(capacity)
+
+    # Vistas sobre la parte activa de cada arreglo (escribir en ellas
+    # modifica la población)
+    @property
+    def position(self) -> np.ndarray:
+        return self._position[:self.size]
+
+    @property
+    def velocity(self) -> np.ndarray:
+        return self._velocity[:self.size]
+
+    @property
+    def orientation(self) -> np.ndarray:
+        return self._orientation[:self.size]
+
+    @property
+    def rotation(self) -> np.ndarray:
+        return self._rotation[:self.size]
+
+    @property
+    def max_speed(self) -> np.ndarray:
+        return self._max_speed[:self.size]
+
+    @property
+    def max_rotation(self) -> np.ndarray:
+        return self._max_rotation[:self.size]
+
+    @property
+    def max_acceleration(self) -> np.ndarray:
+        return self._max_acceleration[:self.size]
+
+    @property
+    def max_angular_acceleration(self) -> np.ndarray:
+        return self._max_angular_acceleration[:self.size]
+
+    @property
+    def drag(self) -> np.ndarray:
+        return self._drag[:self.size]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _reserve(self, capacity: int):
+        if capacity <= len(self._orientation):
+            return
+        # Duplicamos la capacidad para que agregar personajes sea amortizado O(1)
+        capacity = max(capacity, 2 * len(self._orientation))
+        for name in ('_position', '_velocity', '_orientation', '_rotation', '_max_speed', '_max_rotation',
+                     '_max_acceleration', '_max_angular_acceleration', '_drag'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:])
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def clear(self):
+        # Quita a todos los personajes sin soltar la memoria reservada
+        self.size = 0
+
+    def spawn(self, count: int, position=None, orientation=0.0, velocity=None, max_speed: float = 200.0,
+              max_rotation: float = math.pi, max_acceleration: float = 100.0,
+              max_angular_acceleration: float = math.pi, drag: float = 0.98) -> range:
+        # Agrega count personajes con los mismos valores por defecto que Kinematic.
+        # Cada parámetro puede ser un escalar o un arreglo con un valor por personaje.
+        start = self.size
+        self._reserve(start + count)
+        self.size = start + count
+        new = slice(start, self.size)
+
+        self._position[new] = position if position is not None else 0.0
+        self._velocity[new] = velocity if velocity is not None else 0.0
+        self._orientation[new] = orientation
+        self._rotation[new] = 0.0
+        self._max_speed[new] = max_speed
+        self._max_rotation[new] = max_rotation
+        self._max_acceleration[new] = max_acceleration
+        self._max_angular_acceleration[new] = max_angular_acceleration
+        self._drag[new] = drag
+        return range(start, self.size)
+
+    def add(self, character: Kinematic) -> int:
+        # Copia un Kinematic existente a la población y devuelve su índice
+        index = self.spawn(1, position=(character.position.x, character.position.y),
+                           orientation=character.orientation,
+                           velocity=(character.velocity.x, character.velocity.y),
+                           max_speed=character.max_speed, max_rotation=character.max_rotation,
+                           max_acceleration=character.max_acceleration,
+                           max_angular_acceleration=character.max_angular_acceleration,
+                           drag=character.drag)[0]
+        self._rotation[index] = character.rotation
+        return index
+
+    def view(self, index: int) -> "KinematicView":
+        return KinematicView(self, index)
+
+    def views(self) -> list:
+        return [KinematicView(self, i) for i in range(self.size)]
+
+    def update(self, linear: np.ndarray, angular: np.ndarray, time: float, indices=None):
+        # Igual que Kinematic.update, pero para toda la población a la vez.
+        # linear tiene forma (n, 2) y angular forma (n,). Con indices solo se
+        # actualizan esos personajes (linear y angular son solo de ellos).
+        if indices is None:
+            indices = slice(0, self.size)
+        position = self._position[indices]
+        velocity = self._velocity[indices]
+        orientation = self._orientation[indices]
+        rotation = self._rotation[indices]
+
+        # Aplicar drag a la velocidad
+        velocity *= (self._drag[indices] ** (time / DRAG_TIME_STEP))[:, None]
+
+        # Actualizar posición y orientación
+        position += velocity * time
+        orientation += rotation * time
+        orientation[:] = map_to_range(orientation)
+
+        # Actualizar velocidad y rotación
+        velocity += linear * time
+        rotation += angular * time
+
+        # Limitar la velocidad máxima
+        clamp_speed(velocity, self._max_speed[indices])
+
+        # Limitar la rotación máxima
+        max_rotation = self._max_rotation[indices]
+        np.clip(rotation, -max_rotation, max_rotation, out=rotation)
+
+        if not isinstance(indices, slice):
+            # Con índices avanzados los arreglos de arriba son copias
+            self._position[indices] = position
+            self._velocity[indices] = velocity
+            self._orientation[indices] = orientation
+            self._rotation[indices] = rotation
+
+    def update_kinematic(self, velocity: np.ndarray, rotation: np.ndarray, time: float, indices=None):
+        # Igual que Kinematic.update_kinematic para toda la población (o solo indices)
+        if indices is None:
+            indices = slice(0, self.size)
+        self._position[indices] += velocity * time
+        self._orientation[indices] = map_to_range(self._orientation[indices] + rotation * time)
+
+        self._velocity[indices] = velocity
+        self._rotation[indices] = rotation
+
+    def wrap(self, width: float, height: float):
+        # Mantener a los personajes dentro de un mundo toroidal
+        position = self.position
+        np.mod(position, (width, height), out=position)
+
+
+def clamp_speed(velocity: np.ndarray, max_speed: np.ndarray):
+    # Limita la rapidez de cada fila de velocity a max_speed (en el lugar)
+    speed = np.hypot(velocity[:, 0], velocity[:, 1])
+    too_fast = speed > max_speed
+    if too_fast.any():
+        velocity[too_fast] *= (max_speed[too_fast] / speed[too_fast])[:, None]
+
+
+def _view_scalar(name: str) -> property:
+    # Propiedad que lee y escribe un valor escalar de la población
+    def getter(self) -> float:
+        return float(getattr(self.population, name)[self.index])
+
+    def setter(self, value: float):
+        getattr(self.population, name)[self.index] = value
+
+    return property(getter, setter)
+
+
+class KinematicView(Kinematic):
+    # Vista ligera de un personaje dentro de una KinematicPopulation. Tiene la
+    # misma interfaz que Kinematic, así que los comportamientos existentes
+    # funcionan sin cambios. Los vectores que devuelve son copias: para
+    # modificar la población hay que asignarlos (character.position = ...).
+    def __init__(self, population: KinematicPopulation, index: int):
+        # No llamamos a Kinematic.__init__: el estado vive en la población
+        self.population: KinematicPopulation = population
+        self.index: int = index
+
+    @property
+    def position(self) -> pygame.math.Vector2:
+        return pygame.math.Vector2(*self.population._position[self.index])
+
+    @position.setter
+    def position(self, value):
+        self.population._position[self.index] = (value[0], value[1])
+
+    @property
+    def velocity(self) -> pygame.math.Vector2:
+        return pygame.math.Vector2(*self.population._velocity[self.index])
+
+    @velocity.setter
+    def velocity(self, value):
+        self.population._velocity[self.index] = (value[0], value[1])
+
+    orientation = _view_scalar('_orientation')
+    rotation = _view_scalar('_rotation')
+    max_speed = _view_scalar('_max_speed')
+    max_rotation = _view_scalar('_max_rotation')
+    max_acceleration = _view_scalar('_max_acceleration')
+    max_angular_acceleration = _view_scalar('_max_angular_acceleration')
+    drag = _view_scalar('_drag')
+
@@ -0,0 +1,213 @@
+# distance_field.py
+
+import math
+import numpy as np
+from obstacles import ObstacleSet, WallSet
+
+# Campo de distancia con signo de la geometría fija del nivel. Se rasteriza
+# una rejilla de ocupación con los obstáculos y las paredes, y al cargar el
+# nivel se calcula para cada celda la distancia a la superficie más cercana
+# (negativa dentro de los obstáculos) y su gradiente. Después cualquier
+# personaje puede consultar distancia y normal en tiempo constante.
+
+
+def lower_envelope_transform(f: np.ndarray) -> np.ndarray:
+    # Transformada de distancia 1D de Felzenszwalb y Huttenlocher en cada fila
+    # de f: d(x) = mín sobre x' de (x - x')² + f(x'). Se arma la envolvente
+    # inferior de las parábolas con vértice en (x', f(x')) y después se lee;
+    # el bucle recorre las columnas una vez y trabaja con todas las filas a
+    # la vez, así que el costo es lineal en el número de celdas.
+    rows, cols = f.shape
+    if cols == 1:
+        return f.copy()
+    row = np.arange(rows)
+    # Vértices de la envolvente de cada fila (v), dónde empieza cada parábola
+    # (z) y cuántas hay menos una (k)
+    vertex = np.zeros((rows, cols), dtype=np.intp)
+    start = np.empty((rows, cols + 1))
+    start[:, 0] = -np.inf
+    start[:, 1] = np.inf
+    last = np.zeros(rows, dtype=np.intp)
+    for q in range(1, cols):
+        value = f[:, q] + q * q
+        while True:
+            v = vertex[row, last]
+            # Intersección de la parábola de q con la última de la envolvente
+            crossing = (value - (f[row, v] + v * v)) / (2 * (q - v))
+            covered = crossing <= start[row, last]
+            if not covered.any():
+                break
+            last[covered] -= 1
+        last += 1
+        vertex[row, last] = q
+        start[row, last] = crossing
+        start[row, last + 1] = np.inf
+
+    result = np.empty((rows, cols))
+    current = np.zeros(rows, dtype=np.intp)
+    for q in range(cols):
+        while True:
+            passed = start[row, current + 1] < q
+            if not passed.any():
+                break
+            current[passed] += 1
+        v = vertex[row, current]
+        result[:, q] = (q - v) ** 2 + f[row, v]
+    return result
+
+
+def distance_to_occupied(occupied: np.ndarray) -> np.ndarray:
+    # Distancia euclidiana exacta (en celdas) de cada celda a la celda ocupada
+    # más cercana. Primero por columnas y luego por filas con la transformada
+    # de lower_envelope_transform.
+    rows, cols = occupied.shape
+    if not occupied.any():
+        return np.full(occupied.shape, np.inf)
+    if cols > rows:
+        # El bucle de lower_envelope_transform recorre las columnas: mejor
+        # que sean el lado corto
+        return distance_to_occupied(occupied.T).T
+
+    # Distancia vertical a la celda ocupada más cercana de la misma columna
+    # (en una columna sin celdas ocupadas queda un valor enorme pero finito)
+    index = np.arange(rows)[:, None]
+    above = np.maximum.accumulate(np.where(occupied, index, -rows * cols), axis=0)
+    below = np.minimum.accumulate(np.where(occupied, index, 2 * rows * cols)[::-1], axis=0)[::-1]
+    vertical = np.minimum(index - above, below - index).astype(float)
+    return np.sqrt(lower_envelope_transform(vertical * vertical))
+
+
+class DistanceField:
+    def __init__(self, width: float, height: float, resolution: float = 4.0,
+                 obstacles: ObstacleSet = None, walls: WallSet = None, solid_border: bool = False):
+        # resolution es el lado de cada celda en píxeles. Con solid_border lo
+        # que queda fuera de [0, width] x [0, height] cuenta como ocupado.
+        self.width: float = width
+        self.height: float = height
+        self.resolution: float = resolution
+        self.cols: int = max(1, math.ceil(width / resolution))
+        self.rows: int = max(1, math.ceil(height / resolution))
+
+        self.occupied: np.ndarray = np.zeros((self.rows, self.cols), dtype=bool)
+        if obstacles is not None:
+            self._rasterize_circles(obstacles.centers, obstacles.radii)
+        if walls is not None:
+            self._rasterize_segments(walls.starts, walls.ends)
+
+        # Con borde sólido agregamos un marco de celdas ocupadas alrededor
+        occupied = self.occupied
+        if solid_border:
+            occupied = np.pad(occupied, 1, constant_values=True)
+        # Fuera de los obstáculos la distancia es positiva y dentro negativa;
+        # la superficie queda a media celda de los centros ocupados
+        outside = distance_to_occupied(occupied)
+        inside = distance_to_occupied(~occupied)
+        distance = np.where(occupied, 0.5 - inside, outside - 0.5) * resolution
+        if solid_border:
+            distance = distance[1:-1, 1:-1]
+        # Sin geometría la distancia es infinita; la acotamos al tamaño del mundo
+        diagonal = math.hypot(width, height)
+        self.distance: np.ndarray = np.clip(distance, -diagonal, diagonal)
+
+        # Gradiente (apunta hacia donde la distancia crece, o sea, lejos de
+        # la superficie más cercana)
+        if self.rows > 1 and self.cols > 1:
+            gradient_y, gradient_x = np.gradient(self.distance, resolution)
+        else:
+            gradient_y = gradient_x = np.zeros_like(self.distance)
+        self.gradient_x: np.ndarray = gradient_x
+        self.gradient_y: np.ndarray = gradient_y
+
+    def _cell_centers(self, x0: int, y0: int, x1: int, y1: int):
+        # Centros de las celdas [x0, x1) x [y0, y1) en píxeles
+        x = (np.arange(x0, x1) + 0.5) * self.resolution
+        y = (np.arange(y0, y1) + 0.5) * self.resolution
+        return x[None, :], y[:, None]
+
+    def _box(self, min_x: float, min_y: float, max_x: float, max_y: float):
+        # Rango de celdas que cubre una caja, recortado a la rejilla
+        x0 = min(max(math.floor(min_x / self.resolution), 0), self.cols)
+        y0 = min(max(math.floor(min_y / self.resolution), 0), self.rows)
+        x1 = min(max(math.floor(max_x / self.resolution) + 1, 0), self.cols)
+        y1 = min(max(math.floor(max_y / self.resolution) + 1, 0), self.rows)
+        return x0, y0, x1, y1
+
+    def _rasterize_circles(self, centers: np.ndarray, radii: np.ndarray):
+        # Ocupa las celdas cuyo centro cae dentro de algún círculo
+        for (center_x, center_y), radius in zip(centers.tolist(), radii.tolist()):
+            x0, y0, x1, y1 = self._box(center_x - radius, center_y - radius,
+                                       center_x + radius, center_y + radius)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            x, y = self._cell_centers(x0, y0, x1, y1)
+            self.occupied[y0:y1, x0:x1] |= (x - center_x) ** 2 + (y - center_y) ** 2 <= radius * radius
+
+    def _rasterize_segments(self, starts: np.ndarray, ends: np.ndarray):
+        # Ocupa las celdas cuyo centro está a menos de media diagonal de algún
+        # segmento, así una pared inclinada no deja huecos entre celdas
+        thickness = self.resolution * math.sqrt(2) / 2
+        for (start_x, start_y), (end_x, end_y) in zip(starts.tolist(), ends.tolist()):
+            x0, y0, x1, y1 = self._box(min(start_x, end_x) - thickness, min(start_y, end_y) - thickness,
+                                       max(start_x, end_x) + thickness, max(start_y, end_y) + thickness)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            x, y = self._cell_centers(x0, y0, x1, y1)
+            edge_x, edge_y = end_x - start_x, end_y - start_y
+            length_sq = edge_x * edge_x + edge_y * edge_y
+            if length_sq > 0:
+                u = np.clip(((x - start_x) * edge_x + (y - start_y) * edge_y) / length_sq, 0, 1)
+            else:
+                u = np.zeros(np.broadcast_shapes(x.shape, y.shape))
+            offset_x = x - (start_x + u * edge_x)
+            offset_y = y - (start_y + u * edge_y)
+            self.occupied[y0:y1, x0:x1] |= offset_x ** 2 + offset_y ** 2 <= thickness * thickness
+
+    def _bilinear(self, positions: np.ndarray):
+        # Índices de las cuatro celdas vecinas y pesos de interpolación
+        fx = np.clip(positions[:, 0] / self.resolution - 0.5, 0, self.cols - 1)
+        fy = np.clip(positions[:, 1] / self.resolution - 0.5, 0, self.rows - 1)
+        x0 = np.minimum(fx.astype(np.intp), self.cols - 1)
+        y0 = np.minimum(fy.astype(np.intp), self.rows - 1)
+        x1 = np.minimum(x0 + 1, self.cols - 1)
+        y1 = np.minimum(y0 + 1, self.rows - 1)
+        return x0, y0, x1, y1, fx - x0, fy - y0
+
+    @staticmethod
+    def _interpolate(grid: np.ndarray, x0, y0, x1, y1, tx, ty):
+        top = grid[y0, x0] * (1 - tx) + grid[y0, x1] * tx
+        bottom = grid[y1, x0] * (1 - tx) + grid[y1, x1] * tx
+        return top * (1 - ty) + bottom * ty
+
+    def sample(self, positions: np.ndarray):
+        # Distancia con signo y normal unitaria (lejos de la superficie) en
+        # cada posición (forma (n, 2)), interpolando entre celdas
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        cells = self._bilinear(positions)
+        distance = self._interpolate(self.distance, *cells)
+        normal = np.stack((self._interpolate(self.gradient_x, *cells),
+                           self._interpolate(self.gradient_y, *cells)), axis=1)
+        length = np.hypot(normal[:, 0], normal[:, 1])
+        nonzero = length > 0
+        normal[nonzero] /= length[nonzero, None]
+        return distance, normal
+
+    def sample_one(self, position):
+        # Igual que sample para una sola posición, sin crear arreglos.
+        # Devuelve (distance, (normal_x, normal_y)).
+        fx = min(max(position[0] / self.resolution - 0.5, 0.0), self.cols - 1)
+        fy = min(max(position[1] / self.resolution - 0.5, 0.0), self.rows - 1)
+        x0 = min(int(fx), self.cols - 1)
+        y0 = min(int(fy), self.rows - 1)
+        x1 = min(x0 + 1, self.cols - 1)
+        y1 = min(y0 + 1, self.rows - 1)
+        tx, ty = fx - x0, fy - y0
+        values = []
+        for grid in (self.distance, self.gradient_x, self.gradient_y):
+            top = grid[y0, x0] * (1 - tx) + grid[y0, x1] * tx
+            bottom = grid[y1, x0] * (1 - tx) + grid[y1, x1] * tx
+            values.append(float(top * (1 - ty) + bottom * ty))
+        distance, normal_x, normal_y = values
+        length = math.hypot(normal_x, normal_y)
+        if length > 0:
+            normal_x, normal_y = normal_x / length, normal_y / length
+        return distance, (normal_x, normal_y)
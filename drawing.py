@@ -1,7 +1,10 @@
 # drawing.py
 
+import bisect
 import pygame
 import math
+import numpy as np
+from collections import OrderedDict
 from utils import YELLOW
 
 
@@ -24,20 +27,144 @@ def draw_pacman(surface, position, orientation, radius=20, color=YELLOW):
     # Lista de puntos para el polígono (boca) de Pac-Man
     points = []
 
+    # La posición puede ser un Vector2 o cualquier par (x, y)
+    center_x, center_y = position[0], position[1]
+
     # Generar puntos a lo largo del arco del cuerpo de Pac-Man
     for i in range(num_points + 1):
         angle = start_angle + i * angle_step
-        x = position.x + radius * math.cos(angle)
-        y = position.y - radius * math.sin(angle)
+        x = center_x + radius * math.cos(angle)
+        y = center_y - radius * math.sin(angle)
         points.append((x, y))
 
     # Añadir el centro para cerrar el polígono
-    points.append((position.x, position.y))
+    points.append((center_x, center_y))
 
     # Dibujar el cuerpo de Pac-Man con la boca en forma de arco
     pygame.draw.polygon(surface, color, points)
 
 
+class PacmanSpriteCache:
+    # Guarda cada forma de Pac-Man ya dibujada en una Surface para copiarla
+    # con blit en lugar de recalcular el polígono en cada cuadro. La
+    # orientación se redondea a angular_resolution direcciones. Cada par
+    # (radio, color) tiene una tabla con una entrada por dirección que se
+    # dibuja la primera vez que se usa; se guardan como máximo max_tables
+    # tablas (se descartan las menos usadas).
+    def __init__(self, angular_resolution: int = 64, max_tables: int = 64):
+        self.angular_resolution: int = angular_resolution
+        self.max_tables: int = max_tables
+        self.tables: OrderedDict = OrderedDict()
+
+    def quantize(self, orientation: float) -> int:
+        step = 2 * math.pi / self.angular_resolution
+        return round(orientation / step) % self.angular_resolution
+
+    def sprite_table(self, radius, color) -> list:
+        # Sprites de todas las direcciones para un radio y un color (None
+        # en las direcciones que todavía no se dibujaron)
+        key = (radius, tuple(color))
+        table = self.tables.get(key)
+        if table is not None:
+            self.tables.move_to_end(key)
+            return table
+        table = self.tables[key] = [None] * self.angular_resolution
+        if len(self.tables) > self.max_tables:
+            self.tables.popitem(last=False)
+        return table
+
+    def _render(self, table: list, radius, color, direction: int) -> pygame.Surface:
+        # Dibujar el sprite una sola vez, centrado en una superficie transparente
+        size = 2 * math.ceil(radius) + 2
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        draw_pacman(sprite, (size / 2, size / 2), direction * 2 * math.pi / self.angular_resolution, radius, color)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+        table[direction] = sprite
+        return sprite
+
+    def get(self, radius, color, orientation: float) -> pygame.Surface:
+        table = self.sprite_table(radius, color)
+        direction = self.quantize(orientation)
+        sprite = table[direction]
+        if sprite is None:
+            sprite = self._render(table, radius, color, direction)
+        return sprite
+
+    def draw(self, surface, position, orientation: float, radius=20, color=YELLOW):
+        # Mismo uso que draw_pacman
+        sprite = self.get(radius, color, orientation)
+        half = sprite.get_width() / 2
+        surface.blit(sprite, (position[0] - half, position[1] - half))
+
+    def blit_sequence(self, positions, orientations, radius=20, colors=None) -> list:
+        # Pares (sprite, esquina) de muchos personajes para Surface.blits.
+        # colors es una lista con el color de cada personaje (None = amarillo).
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        step = 2 * math.pi / self.angular_resolution
+        directions = (np.round(np.asarray(orientations, dtype=float) / step).astype(np.intp)
+                      % self.angular_resolution).tolist()
+        corners = (positions - (math.ceil(radius) + 1)).tolist()
+        if colors is None:
+            table = self.sprite_table(radius, YELLOW)
+            for direction in set(directions):
+                if table[direction] is None:
+                    self._render(table, radius, YELLOW, direction)
+            return list(zip(map(table.__getitem__, directions), corners))
+        tables = {}
+        sprites = []
+        for color, direction in zip(colors, directions):
+            table = tables.get(color)
+            if table is None:
+                table = tables[color] = self.sprite_table(radius, color)
+            sprite = table[direction]
+            if sprite is None:
+                sprite = self._render(table, radius, color, direction)
+            sprites.append(sprite)
+        return list(zip(sprites, corners))
+
+    def draw_many(self, surface, positions, orientations, radius=20, colors=None) -> list:
+        # Dibuja a todos los personajes con una sola llamada a Surface.blits
+        # y devuelve el rectángulo de cada uno
+        return surface.blits(self.blit_sequence(positions, orientations, radius, colors))
+
+
+# Caché compartida por todos los escenarios
+pacman_sprites = PacmanSpriteCache()
+
+
+class DirtyRects:
+    # Dibujo por rectángulos sucios: en lugar de copiar el fondo y presentar
+    # toda la pantalla en cada cuadro, el fondo se restaura solo donde se
+    # dibujó en el cuadro anterior y pygame.display.update recibe solo esos
+    # rectángulos y los nuevos. Con muchos rectángulos (escenas densas) sale
+    # más barato el cuadro completo y se vuelve a flip.
+    def __init__(self, max_rects: int = 400):
+        self.max_rects: int = max_rects
+        self.previous: list = []
+        # El primer cuadro (o después de invalidate) se dibuja completo
+        self.full: bool = True
+
+    def invalidate(self):
+        self.full = True
+
+    def restore(self, screen, background: pygame.Surface):
+        # Borra lo dibujado en el cuadro anterior
+        if self.full or len(self.previous) > self.max_rects:
+            screen.blit(background, (0, 0))
+        else:
+            screen.blits([(background, rect, rect) for rect in self.previous], doreturn=False)
+
+    def present(self, rects: list):
+        # rects son los rectángulos dibujados en este cuadro
+        if self.full or len(self.previous) + len(rects) > self.max_rects:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.previous + rects)
+        self.previous = rects
+        self.full = False
+
+
 class Button:
     def __init__(self, text, pos, font, bg="black", feedback=""):
         self.x, self.y = pos
@@ -70,6 +197,173 @@ class Button:
 
 
 class Path:
-    def __init__(self, waypoints):
-        # Lista de puntos que forman el camino
-        self.waypoints: pygame.math.Vector2 = waypoints
+    # Hasta cuántos segmentos por consulta get_param los recorre en Python
+    SCALAR_SEGMENTS = 256
+
+    def __init__(self, waypoints, closed: bool = True):
+        # Puntos que forman el camino en un arreglo de forma (m, 2). Si closed
+        # es True el último punto se une con el primero.
+        self.points: np.ndarray = np.array([(point[0], point[1]) for point in waypoints], dtype=float)
+        self.closed: bool = closed
+
+        # Segmentos del camino y longitud acumulada hasta el inicio de cada
+        # uno; el parámetro de un punto es la distancia recorrida desde el inicio
+        ends = np.roll(self.points, -1, axis=0) if closed else self.points[1:]
+        self.starts: np.ndarray = self.points[:len(ends)]
+        self.edges: np.ndarray = ends - self.starts
+        self.segment_lengths: np.ndarray = np.hypot(self.edges[:, 0], self.edges[:, 1])
+        self.cumulative: np.ndarray = np.concatenate(([0.0], np.cumsum(self.segment_lengths)))
+        self.length: float = float(self.cumulative[-1])
+        self._waypoints: list = None
+        # Copias como listas de Python para las consultas de un solo personaje
+        self._cumulative_list: list = self.cumulative.tolist()
+        self._start_list: list = self.starts.tolist()
+        self._edge_list: list = self.edges.tolist()
+        self._length_list: list = self.segment_lengths.tolist()
+
+    @property
+    def waypoints(self) -> list:
+        # Los puntos como Vector2 (se crean la primera vez que se piden)
+        if self._waypoints is None:
+            self._waypoints = [pygame.math.Vector2(x, y) for x, y in self.points.tolist()]
+        return self._waypoints
+
+    def _normalize_params(self, params: np.ndarray) -> np.ndarray:
+        # En un camino cerrado el parámetro da la vuelta; en uno abierto se limita
+        if self.closed and self.length > 0:
+            return np.mod(params, self.length)
+        return np.clip(params, 0.0, self.length)
+
+    def _segments_of(self, params: np.ndarray) -> np.ndarray:
+        # Segmento que contiene cada parámetro (búsqueda binaria)
+        segment = np.searchsorted(self.cumulative, params, side='right') - 1
+        return np.clip(segment, 0, len(self.edges) - 1)
+
+    def get_positions(self, params) -> np.ndarray:
+        # Posición sobre el camino (forma (n, 2)) para cada parámetro
+        params = self._normalize_params(np.asarray(params, dtype=float).reshape(-1))
+        segment = self._segments_of(params)
+        lengths = self.segment_lengths[segment]
+        along = np.divide(params - self.cumulative[segment], lengths,
+                          out=np.zeros_like(params), where=lengths > 0)
+        return self.starts[segment] + self.edges[segment] * along[:, None]
+
+    def _normalize_param(self, param: float) -> float:
+        if self.closed and self.length > 0:
+            return param % self.length
+        return min(max(param, 0.0), self.length)
+
+    def _segment_of(self, param: float) -> int:
+        # Versión escalar de _segments_of con bisect
+        segment = bisect.bisect_right(self._cumulative_list, param) - 1
+        return min(max(segment, 0), len(self._length_list) - 1)
+
+    def get_position(self, param: float) -> pygame.math.Vector2:
+        param = self._normalize_param(param)
+        segment = self._segment_of(param)
+        length = self._length_list[segment]
+        along = (param - self._cumulative_list[segment]) / length if length > 0 else 0.0
+        start_x, start_y = self._start_list[segment]
+        edge_x, edge_y = self._edge_list[segment]
+        return pygame.math.Vector2(start_x + edge_x * along, start_y + edge_y * along)
+
+    def get_params(self, positions, last_params=None, window: float = 100.0) -> np.ndarray:
+        # Parámetro del punto del camino más cercano a cada posición. Con
+        # last_params solo se buscan los segmentos a menos de window (a lo
+        # largo del camino) del parámetro anterior de cada personaje; donde
+        # last_params es None o NaN se busca en todo el camino.
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        count = len(positions)
+        segment_count = len(self.edges)
+        if last_params is None:
+            last_params = np.full(count, np.nan)
+        last_params = np.broadcast_to(np.asarray(last_params, dtype=float), (count,))
+
+        # Rango de segmentos [first, last] de cada consulta (índices sin dar
+        # la vuelta, así un camino cerrado puede pasar por el final)
+        known = ~np.isnan(last_params)
+        first = np.zeros(count, dtype=np.intp)
+        last = np.full(count, segment_count - 1, dtype=np.intp)
+        if known.any():
+            center = last_params[known]
+            first[known] = self._range_end(center - window)
+            last[known] = self._range_end(center + window)
+            if self.closed:
+                # Si la ventana cubre todo el camino, lo recorremos una sola vez
+                whole = 2 * window >= self.length
+                first[known & whole] = 0
+                last[known & whole] = segment_count - 1
+            else:
+                first = np.maximum(first, 0)
+                last = np.minimum(last, segment_count - 1)
+
+        # Expandimos cada consulta en la lista de segmentos de su ventana
+        span = last - first + 1
+        k = np.repeat(np.arange(count), span)
+        segment = np.repeat(first - (np.cumsum(span) - span), span) + np.arange(span.sum())
+        segment %= segment_count
+
+        # Proyección de cada posición sobre cada uno de sus segmentos
+        edges = self.edges[segment]
+        lengths_sq = self.segment_lengths[segment] ** 2
+        offset = positions[k] - self.starts[segment]
+        along = np.divide(np.einsum('ij,ij->i', offset, edges), lengths_sq,
+                          out=np.zeros(len(segment)), where=lengths_sq > 0)
+        np.clip(along, 0.0, 1.0, out=along)
+        closest = offset - edges * along[:, None]
+        distance_sq = np.einsum('ij,ij->i', closest, closest)
+
+        # Para cada consulta nos quedamos con el segmento más cercano (los
+        # segmentos de cada consulta son contiguos, así que basta con reduceat)
+        group_start = np.cumsum(span) - span
+        nearest = np.minimum.reduceat(distance_sq, group_start)
+        candidates = np.flatnonzero(distance_sq == np.repeat(nearest, span))
+        best = candidates[np.searchsorted(candidates, group_start)]
+        params = self.cumulative[segment[best]] + along[best] * self.segment_lengths[segment[best]]
+        return self._normalize_params(params)
+
+    def _range_end(self, params: np.ndarray) -> np.ndarray:
+        # Como _segments_of pero sin normalizar: en un camino cerrado, los
+        # parámetros fuera de [0, length) dan índices fuera de [0, m)
+        if self.closed and self.length > 0:
+            turns = np.floor(params / self.length)
+            return self._segments_of(params - turns * self.length) + turns.astype(np.intp) * len(self.edges)
+        return self._segments_of(np.clip(params, 0.0, self.length))
+
+    def get_param(self, position, last_param: float = None, window: float = 100.0) -> float:
+        # Versión de get_params para un solo personaje. Si la ventana abarca
+        # pocos segmentos los recorremos en Python, que es más barato que
+        # crear arreglos para una sola consulta.
+        segment_count = len(self._length_list)
+        if last_param is None or (self.closed and 2 * window >= self.length):
+            return float(self.get_params(position, last_param, window)[0])
+        if self.closed and self.length > 0:
+            turns = math.floor((last_param - window) / self.length)
+            first = self._segment_of(last_param - window - turns * self.length) + turns * segment_count
+            turns = math.floor((last_param + window) / self.length)
+            last = self._segment_of(last_param + window - turns * self.length) + turns * segment_count
+        else:
+            first = self._segment_of(min(max(last_param - window, 0.0), self.length))
+            last = self._segment_of(min(max(last_param + window, 0.0), self.length))
+        if last - first >= self.SCALAR_SEGMENTS:
+            return float(self.get_params(position, last_param, window)[0])
+
+        position_x, position_y = position[0], position[1]
+        best_distance_sq = math.inf
+        best_param = 0.0
+        for segment in range(first, last + 1):
+            segment %= segment_count
+            start_x, start_y = self._start_list[segment]
+            edge_x, edge_y = self._edge_list[segment]
+            length = self._length_list[segment]
+            offset_x = position_x - start_x
+            offset_y = position_y - start_y
+            along = (offset_x * edge_x + offset_y * edge_y) / (length * length) if length > 0 else 0.0
+            along = min(max(along, 0.0), 1.0)
+            closest_x = offset_x - edge_x * along
+            closest_y = offset_y - edge_y * along
+            distance_sq = closest_x * closest_x + closest_y * closest_y
+            if distance_sq < best_distance_sq:
+                best_distance_sq = distance_sq
+                best_param = self._cumulative_list[segment] + along * length
+        return self._normalize_param(best_param)
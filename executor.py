@@ -0,0 +1,79 @@
+# executor.py
+
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# Evalúa comportamientos por lotes (las clases Batch* de algorithms.py)
+# repartiendo la población en bloques entre varios hilos. Las operaciones
+# grandes de NumPy sueltan el GIL, así que los bloques corren en paralelo sin
+# tener que copiar el estado a otros procesos. Con poblaciones pequeñas el
+# costo de repartir el trabajo supera la ganancia y se evalúa en el mismo hilo.
+
+
+class SteeringExecutor:
+    def __init__(self, workers: int = None, chunk_size: int = 4096, inline_threshold: int = None):
+        # workers: número de hilos (por defecto uno por núcleo)
+        # chunk_size: personajes por bloque
+        # inline_threshold: con esta cantidad de personajes o menos no se usan
+        # los hilos (por defecto 2 * chunk_size)
+        self.workers: int = workers if workers is not None else os.cpu_count() or 1
+        self.chunk_size: int = max(1, chunk_size)
+        self.inline_threshold: int = inline_threshold if inline_threshold is not None else 2 * self.chunk_size
+        self.pool: ThreadPoolExecutor = None
+
+    def chunks(self, count: int) -> list:
+        # Bloques contiguos (slices) que cubren range(count)
+        return [slice(start, min(start + self.chunk_size, count))
+                for start in range(0, count, self.chunk_size)]
+
+    def inline(self, count: int) -> bool:
+        return self.workers <= 1 or count <= self.inline_threshold
+
+    def map(self, function, count: int) -> list:
+        # Llama a function(chunk) para cada bloque de range(count) y devuelve
+        # los resultados en orden. Los bloques son disjuntos, así que function
+        # puede escribir en los arreglos por personaje sin bloqueos.
+        if self.inline(count):
+            return [function(slice(0, count))]
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="steering")
+        return list(self.pool.map(function, self.chunks(count)))
+
+    def get_steering(self, behavior, count: int = None):
+        # Igual que behavior.get_steering() para toda la población, por bloques
+        if count is None:
+            count = len(behavior.population)
+        # Los comportamientos con números aleatorios (como BatchDynamicWander,
+        # también dentro de BatchBlendedSteering y BatchPrioritySteering) los
+        # generan en prepare para toda la población antes de repartir, porque
+        # un np.random.Generator no se puede compartir entre hilos. Se hace
+        # también sin hilos, así el resultado es el mismo con cualquier
+        # número de hilos. Los que no tienen prepare reciben un bloque vacío
+        # primero para que crezcan antes de repartir.
+        prepare = getattr(behavior, 'prepare', None)
+        if prepare is not None:
+            prepare(count)
+        elif not self.inline(count):
+            behavior.get_steering(slice(0, 0))
+        try:
+            results = self.map(behavior.get_steering, count)
+        finally:
+            if prepare is not None:
+                prepare(None)
+        if len(results) == 1:
+            return results[0]
+        linear = np.concatenate([linear for linear, _ in results])
+        angular = np.concatenate([angular for _, angular in results])
+        return linear, angular
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,135 @@
+# headless.py
+
+import argparse
+import math
+import os
+import random
+import time
+import pygame
+from profiler import profiler
+from recorder import TrajectoryRecorder
+from scenarios import SCENARIOS, Scenario
+from scenes import DataScenario, is_scene_file, load_scene_data
+from utils import SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Ejecuta los escenarios sin ventana ni reloj: cada tick avanza la simulación
+# tan rápido como permita la CPU. El mouse se reemplaza por un punto que
+# recorre una elipse alrededor del centro del mundo.
+
+
+def scripted_pointer(elapsed: float, width: float = SCREEN_WIDTH,
+                     height: float = SCREEN_HEIGHT) -> pygame.math.Vector2:
+    # Posición del "mouse" después de elapsed segundos simulados
+    angle = 0.5 * elapsed
+    return pygame.math.Vector2(width / 2 + width / 3 * math.cos(angle),
+                               height / 2 + height / 3 * math.sin(angle))
+
+
+def run_headless(scenario: Scenario, ticks: int, delta_time: float = 1 / 60,
+                 recorder: TrajectoryRecorder = None) -> float:
+    # Avanza ticks pasos del escenario y devuelve el tiempo real empleado (s).
+    # Con recorder se graba el estado al inicio de cada tick.
+    start = time.perf_counter()
+    for tick in range(ticks):
+        profiler.begin_frame()
+        scenario.pointer = scripted_pointer(tick * delta_time, scenario.width, scenario.height)
+        if recorder is not None:
+            recorder.record(*scenario.state())
+        with profiler.phase('simulation'):
+            scenario.step(delta_time)
+        profiler.end_frame()
+    return time.perf_counter() - start
+
+
+def output_path(path: str, name: str, several: bool) -> str:
+    # Con varios escenarios cada uno escribe en path con su nombre agregado
+    if not several:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}-{name}{extension}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ejecuta los escenarios sin pantalla.")
+    parser.add_argument("scenarios", nargs="*",
+                        help="Escenarios a ejecutar (por defecto todos): " + ", ".join(SCENARIOS)
+                        + ", o archivos de escena .json/.toml")
+    parser.add_argument("--ticks", type=int, default=600,
+                        help="Número de pasos de simulación")
+    parser.add_argument("--dt", type=float, default=1 / 60,
+                        help="Duración de cada paso en segundos")
+    parser.add_argument("--count", type=int, default=None,
+                        help="Número de personajes (por defecto el del escenario)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Semilla para hacer la ejecución reproducible")
+    parser.add_argument("--profile", action="store_true",
+                        help="Mide cada fase y muestra sus percentiles por tick")
+    parser.add_argument("--trace", default=None, metavar="PATH",
+                        help="Guarda una traza de Chrome (JSON) de los últimos ticks (implica --profile)")
+    parser.add_argument("--record", default=None, metavar="PATH",
+                        help="Graba las trayectorias en un archivo .npy")
+    parser.add_argument("--record-buffer", type=int, default=1024, metavar="TICKS",
+                        help="Ticks que caben en el búfer de la grabación; sin pantalla los ticks "
+                             "se generan mucho más rápido que en tiempo real")
+    parser.add_argument("--ai-budget", type=float, default=None, metavar="MS",
+                        help="Presupuesto de IA por tick en las escenas de archivo (reemplaza ai_budget_ms)")
+    args = parser.parse_args()
+    for name in args.scenarios:
+        if name not in SCENARIOS and not (is_scene_file(name) and os.path.exists(name)):
+            parser.error(f"escenario desconocido: {name}")
+
+    for name in args.scenarios or list(SCENARIOS):
+        if args.seed is not None:
+            random.seed(args.seed)
+        if name in SCENARIOS:
+            scenario_class = SCENARIOS[name]
+            scenario = scenario_class() if args.count is None else scenario_class(args.count)
+        else:
+            # Archivo de escena (.json o .toml); la semilla de la línea de
+            # comandos reemplaza la del archivo
+            data = load_scene_data(name)
+            if args.seed is not None:
+                data.pop('seed', None)
+            if args.ai_budget is not None:
+                data['ai_budget_ms'] = args.ai_budget
+            scenario = DataScenario(data, args.count)
+            name = os.path.splitext(os.path.basename(name))[0]
+
+        if args.profile or args.trace:
+            profiler.reset()
+            profiler.enable()
+        several = len(args.scenarios) != 1
+        recorder = None
+        if args.record:
+            recorder = TrajectoryRecorder(output_path(args.record, name, several), capacity=args.record_buffer,
+                                          metadata=scenario.recording_metadata(args.dt), agents=scenario.max_agents())
+        try:
+            elapsed = run_headless(scenario, args.ticks, args.dt, recorder)
+        finally:
+            if recorder is not None:
+                recorder.close(scenario.recording_metadata(args.dt))
+            scenario.close()
+            profiler.disable()
+        print(f"{name}: {args.ticks} ticks en {elapsed:.3f} s "
+              f"({args.ticks / elapsed:.0f} ticks/s, x{args.ticks * args.dt / elapsed:.1f} tiempo real)")
+        if args.profile or args.trace:
+            for phase, (p50, p95, p99) in profiler.summary().items():
+                print(f"  {phase:<40} p50 {p50:7.3f} ms  p95 {p95:7.3f} ms  p99 {p99:7.3f} ms")
+        if args.trace:
+            path = output_path(args.trace, name, several)
+            profiler.export_chrome_trace(path)
+            print(f"  traza guardada en {path}")
+        scheduler = getattr(scenario, 'scheduler', None)
+        if scheduler is not None and scheduler.behaviors:
+            for behavior, rate, computed, overdue, starved in scheduler.summary():
+                print(f"  {behavior:<28} {'cada tick' if rate is None else f'{rate:g} Hz':>10}  "
+                      f"último tick: {computed} evaluados, {overdue} atrasados; "
+                      f"{starved} ticks sin presupuesto")
+        if recorder is not None:
+            print(f"  {recorder.flushed} ticks grabados en {recorder.path}"
+                  + (f" ({recorder.dropped} descartados)" if recorder.dropped else ""))
+
+
+if __name__ == "__main__":
+    main()
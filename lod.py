@@ -0,0 +1,166 @@
+# lod.py
+
+import numpy as np
+from characters import KinematicPopulation
+
+# Nivel de detalle de la simulación según la distancia a lo que importa (el
+# jugador, el centro de la cámara):
+#
+#   NEAR: todos los comportamientos en cada tick.
+#   MID:  los comportamientos se evalúan cada mid_interval ticks y entre
+#         medio se mantiene el último steering. Los turnos se reparten por
+#         índice, así en cada tick se evalúa la misma fracción de personajes.
+#   FAR:  solo un movimiento cinemático barato (BatchKinematicWander).
+#
+# Para que los cambios de nivel no se noten: hay una banda de histéresis
+# alrededor de cada radio (no se cambia de nivel por moverse unos píxeles),
+# quien se acerca evalúa sus comportamientos en ese mismo tick en lugar de
+# esperar su turno, y al alejarse la velocidad pasa a la del modo cinemático
+# de a poco (blend_time segundos).
+
+NEAR, MID, FAR = 0, 1, 2
+
+
+class SimulationLOD:
+    def __init__(self, population: KinematicPopulation, far_behavior, near_radius: float = 600.0,
+                 far_radius: float = 1500.0, mid_interval: int = 4, hysteresis: float = 50.0,
+                 blend_time: float = 0.5, world_size: tuple = None):
+        # far_behavior devuelve (velocity, rotation) para update_kinematic.
+        # world_size (ancho, alto) si el mundo es toroidal: las distancias
+        # se miden por el camino más corto.
+        if not 0 <= near_radius <= far_radius:
+            raise ValueError("Se necesita 0 <= near_radius <= far_radius")
+        self.population: KinematicPopulation = population
+        self.far_behavior = far_behavior
+        self.near_radius: float = near_radius
+        self.far_radius: float = far_radius
+        self.mid_interval: int = max(1, int(mid_interval))
+        self.hysteresis: float = hysteresis
+        self.blend_time: float = blend_time
+        self.world_size: tuple = world_size
+        # Nivel de cada personaje (-1: todavía sin clasificar)
+        self.tier: np.ndarray = np.zeros(0, dtype=np.int8)
+        # Último steering de cada personaje, el que se mantiene en MID
+        self.linear: np.ndarray = np.zeros((0, 2))
+        self.angular: np.ndarray = np.zeros(0)
+        # Personajes que necesitan steering nuevo aunque no sea su turno
+        self.stale: np.ndarray = np.zeros(0, dtype=bool)
+        # Índices de los personajes simulados (NEAR y MID) y de los FAR,
+        # según la última clasificación
+        self.simulated: np.ndarray = np.zeros(0, dtype=np.intp)
+        self.far: np.ndarray = np.zeros(0, dtype=np.intp)
+        self.ticks: int = 0
+        # Arreglos auxiliares que se reutilizan en cada tick
+        self._distance: np.ndarray = np.zeros(0)
+        self._squared: np.ndarray = np.zeros(0)
+        self._delta: np.ndarray = np.zeros((0, 2))
+        self._wrapped: np.ndarray = np.zeros((0, 2))
+        self._nearer: np.ndarray = np.zeros(0, dtype=np.int8)
+        self._farther: np.ndarray = np.zeros(0, dtype=np.int8)
+        self._crossed: np.ndarray = np.zeros(0, dtype=bool)
+
+    def _sync_size(self):
+        # La población puede crecer después de crear el LOD
+        missing = len(self.population) - len(self.tier)
+        if missing > 0:
+            self.tier = np.concatenate((self.tier, np.full(missing, -1, dtype=np.int8)))
+            self.linear = np.concatenate((self.linear, np.zeros((missing, 2))))
+            self.angular = np.concatenate((self.angular, np.zeros(missing)))
+            self.stale = np.concatenate((self.stale, np.ones(missing, dtype=bool)))
+        count = len(self.tier)
+        if len(self._distance) != count:
+            self._distance = np.zeros(count)
+            self._squared = np.zeros(count)
+            self._delta = np.zeros((count, 2))
+            self._wrapped = np.zeros((count, 2))
+            self._nearer = np.zeros(count, dtype=np.int8)
+            self._farther = np.zeros(count, dtype=np.int8)
+            self._crossed = np.zeros(count, dtype=bool)
+
+    def _tiers_at(self, distance: np.ndarray, offset: float = 0.0, out: np.ndarray = None) -> np.ndarray:
+        # Nivel que corresponde a distance + offset
+        if out is None:
+            out = np.zeros(len(distance), dtype=np.int8)
+        crossed = self._crossed[:len(distance)]
+        np.greater_equal(distance, self.near_radius - offset, out=crossed)
+        np.copyto(out, crossed, casting='unsafe')
+        np.greater_equal(distance, self.far_radius - offset, out=crossed)
+        out += crossed
+        return out
+
+    def distances(self, focus) -> np.ndarray:
+        # Distancia de cada personaje al punto de interés más cercano. El
+        # resultado es un arreglo interno que se reescribe en el tick siguiente.
+        self._sync_size()
+        position = self.population.position
+        distance, squared, delta, wrapped = self._distance, self._squared, self._delta, self._wrapped
+        distance.fill(np.inf)
+        size = None if self.world_size is None else np.asarray(self.world_size, dtype=float)
+        for point in np.asarray(focus, dtype=float).reshape(-1, 2):
+            np.subtract(position, point, out=delta)
+            if size is not None:
+                np.divide(delta, size, out=wrapped)
+                np.round(wrapped, out=wrapped)
+                wrapped *= size
+                delta -= wrapped
+            np.einsum('ij,ij->i', delta, delta, out=squared)
+            np.minimum(distance, squared, out=distance)
+        return np.sqrt(distance, out=distance)
+
+    def classify(self, focus):
+        # Actualiza el nivel de cada personaje; solo cambia de nivel quien
+        # cruzó el radio por más de hysteresis
+        distance = self.distances(focus)
+        nearer = self._tiers_at(distance, -self.hysteresis, self._nearer)
+        farther = self._tiers_at(distance, self.hysteresis, self._farther)
+        tier = np.clip(self.tier, nearer, farther).astype(np.int8)
+        new = self.tier < 0
+        if new.any():
+            tier[new] = self._tiers_at(distance[new])
+        # Quien se acerca tiene un steering viejo (o ninguno)
+        self.stale |= tier < self.tier
+        self.tier = tier
+        far = tier == FAR
+        self.far = np.flatnonzero(far)
+        self.simulated = np.flatnonzero(~far)
+
+    def due(self) -> np.ndarray:
+        # Índices de los personajes que evalúan sus comportamientos en este tick
+        tier = self.tier
+        turn = (np.arange(len(tier)) + self.ticks) % self.mid_interval == 0
+        return np.flatnonzero((tier == NEAR) | ((tier == MID) & (turn | self.stale)))
+
+    def step(self, steer, delta_time: float, focus):
+        # steer(indices) devuelve (linear, angular) de esos personajes con
+        # todos sus comportamientos; focus son los puntos de interés (m, 2)
+        self.classify(focus)
+        self.advance(steer, delta_time)
+
+    def advance(self, steer, delta_time: float):
+        # Como step con la clasificación ya hecha (por ejemplo para
+        # reconstruir la rejilla solo con los simulados entre medio)
+        population = self.population
+
+        due = self.due()
+        if len(due):
+            self.linear[due], self.angular[due] = steer(due)
+            self.stale[due] = False
+
+        dynamic = self.simulated
+        if len(dynamic):
+            population.update(self.linear[dynamic], self.angular[dynamic], delta_time, dynamic)
+
+        far = self.far
+        if len(far):
+            velocity, rotation = self.far_behavior.get_steering(far)
+            # La velocidad pasa de a poco a la del modo cinemático
+            if self.blend_time > 0:
+                current = population.velocity[far]
+                velocity = current + (velocity - current) * min(1.0, delta_time / self.blend_time)
+            population.update_kinematic(velocity, rotation, delta_time, far)
+        self.ticks += 1
+
+    def counts(self) -> tuple:
+        # Personajes en cada nivel (NEAR, MID, FAR)
+        tier = self.tier[self.tier >= 0]
+        return tuple(np.bincount(tier, minlength=3).tolist())
@@ -0,0 +1,207 @@
+# obstacles.py
+
+import numpy as np
+from spatial import StaticGrid
+
+# Obstáculos fijos del mapa (círculos y paredes) guardados en arreglos de NumPy, con un índice
+# espacial que se construye una sola vez. Las consultas reciben un rayo por
+# personaje y se resuelven todas a la vez.
+
+
+class ObstacleSet:
+    def __init__(self, centers, radii, width: float, height: float, cell_size: float = 64.0):
+        # centers tiene forma (m, 2) y radii forma (m,) o es un escalar
+        self.centers: np.ndarray = np.array(centers, dtype=float).reshape(-1, 2)
+        self.radii: np.ndarray = np.array(
+            np.broadcast_to(radii, (len(self.centers),)), dtype=float)
+        self.grid: StaticGrid = StaticGrid(cell_size, width, height)
+        self.grid.build(self.centers - self.radii[:, None], self.centers + self.radii[:, None])
+        # Copias como listas de Python para las consultas de un solo rayo
+        self._center_list: list = self.centers.tolist()
+        self._radius_list: list = self.radii.tolist()
+
+    @classmethod
+    def from_dicts(cls, obstacles: list, width: float, height: float, cell_size: float = 64.0):
+        # Convierte la lista de diccionarios con 'position' y 'radius' que usa ObstacleAvoidance
+        centers = [(obstacle['position'][0], obstacle['position'][1]) for obstacle in obstacles]
+        radii = [obstacle['radius'] for obstacle in obstacles]
+        return cls(centers, radii, width, height, cell_size)
+
+    def __len__(self) -> int:
+        return len(self.centers)
+
+    def raycast(self, origins: np.ndarray, directions: np.ndarray, lengths):
+        # Para cada rayo (origen, dirección unitaria, longitud) busca el
+        # obstáculo cuyo centro se proyecta primero sobre el rayo a menos de
+        # su radio, igual que ObstacleAvoidance. Devuelve (hit, obstacle,
+        # projection, closest): si hubo choque, el índice del obstáculo, la
+        # distancia a lo largo del rayo y el punto del rayo más cercano a su centro.
+        origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+        directions = np.asarray(directions, dtype=float).reshape(-1, 2)
+        count = len(origins)
+        lengths = np.broadcast_to(lengths, (count,))
+        hit = np.zeros(count, dtype=bool)
+        obstacle = np.full(count, -1, dtype=np.intp)
+        projection = np.full(count, np.inf)
+        closest = np.zeros((count, 2))
+
+        # Fase amplia: obstáculos en las celdas que toca la caja de cada rayo
+        ends = origins + directions * lengths[:, None]
+        k, j = self.grid.query_boxes(np.minimum(origins, ends), np.maximum(origins, ends))
+        if len(k) == 0:
+            return hit, obstacle, projection, closest
+
+        # Fase precisa: proyección de cada centro sobre su rayo
+        obstacle_vector = self.centers[j] - origins[k]
+        pair_projection = np.einsum('ij,ij->i', obstacle_vector, directions[k])
+        pair_closest = origins[k] + directions[k] * pair_projection[:, None]
+        offset = self.centers[j] - pair_closest
+        inside = ((pair_projection > 0) & (pair_projection < lengths[k]) &
+                  (np.einsum('ij,ij->i', offset, offset) < self.radii[j] ** 2))
+        if not inside.any():
+            return hit, obstacle, projection, closest
+        k, j = k[inside], j[inside]
+        pair_projection, pair_closest = pair_projection[inside], pair_closest[inside]
+
+        # Para cada rayo nos quedamos con el obstáculo más próximo
+        order = np.lexsort((pair_projection, k))
+        first = order[np.unique(k[order], return_index=True)[1]]
+        rays = k[first]
+        hit[rays] = True
+        obstacle[rays] = j[first]
+        projection[rays] = pair_projection[first]
+        closest[rays] = pair_closest[first]
+        return hit, obstacle, projection, closest
+
+    def raycast_one(self, origin, direction, length: float):
+        # Igual que raycast para un solo rayo, sin NumPy (para pocos
+        # candidatos es mucho más barato). Devuelve (obstacle, projection,
+        # closest) o None si no hay choque.
+        origin_x, origin_y = origin[0], origin[1]
+        direction_x, direction_y = direction[0], direction[1]
+        end_x = origin_x + direction_x * length
+        end_y = origin_y + direction_y * length
+        candidates = self.grid.query_box(min(origin_x, end_x), min(origin_y, end_y),
+                                         max(origin_x, end_x), max(origin_y, end_y))
+        best = None
+        best_projection = length
+        for j in candidates:
+            center_x, center_y = self._center_list[j]
+            projection = (center_x - origin_x) * direction_x + (center_y - origin_y) * direction_y
+            if 0 < projection < best_projection:
+                closest_x = origin_x + direction_x * projection
+                closest_y = origin_y + direction_y * projection
+                radius = self._radius_list[j]
+                if (center_x - closest_x) ** 2 + (center_y - closest_y) ** 2 < radius * radius:
+                    best = (j, projection, (closest_x, closest_y))
+                    best_projection = projection
+        return best
+
+
+class WallSet:
+    def __init__(self, starts, ends, width: float, height: float, cell_size: float = 64.0):
+        # Paredes como segmentos de starts[i] a ends[i] (formas (m, 2))
+        self.starts: np.ndarray = np.array(starts, dtype=float).reshape(-1, 2)
+        self.ends: np.ndarray = np.array(ends, dtype=float).reshape(-1, 2)
+        self.edges: np.ndarray = self.ends - self.starts
+        # Normal unitaria de cada pared (se orienta hacia el rayo al consultar)
+        length = np.hypot(self.edges[:, 0], self.edges[:, 1])
+        self.normals: np.ndarray = np.stack((-self.edges[:, 1], self.edges[:, 0]), axis=1) / length[:, None]
+        self.grid: StaticGrid = StaticGrid(cell_size, width, height)
+        self.grid.build(np.minimum(self.starts, self.ends), np.maximum(self.starts, self.ends))
+        # Copias como listas de Python para las consultas de un solo rayo
+        self._start_list: list = self.starts.tolist()
+        self._edge_list: list = self.edges.tolist()
+        self._normal_list: list = self.normals.tolist()
+
+    @classmethod
+    def from_points(cls, points: list, width: float, height: float, closed: bool = True, cell_size: float = 64.0):
+        # Paredes que unen puntos consecutivos (y el último con el primero si closed)
+        points = np.array(points, dtype=float).reshape(-1, 2)
+        ends = np.roll(points, -1, axis=0)
+        if not closed:
+            points, ends = points[:-1], ends[:-1]
+        return cls(points, ends, width, height, cell_size)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def raycast(self, origins: np.ndarray, directions: np.ndarray, lengths):
+        # Para cada rayo (origen, dirección, longitud) busca la primera pared
+        # que cruza. Devuelve (hit, wall, distance, point, normal): si hubo
+        # choque, el índice de la pared, la distancia a lo largo del rayo (en
+        # unidades de direction), el punto de choque y la normal de la pared
+        # del lado desde el que llega el rayo.
+        origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+        directions = np.asarray(directions, dtype=float).reshape(-1, 2)
+        count = len(origins)
+        lengths = np.broadcast_to(lengths, (count,))
+        hit = np.zeros(count, dtype=bool)
+        wall = np.full(count, -1, dtype=np.intp)
+        distance = np.full(count, np.inf)
+        point = np.zeros((count, 2))
+        normal = np.zeros((count, 2))
+
+        # Fase amplia: paredes en las celdas que toca la caja de cada rayo
+        ends = origins + directions * lengths[:, None]
+        k, j = self.grid.query_boxes(np.minimum(origins, ends), np.maximum(origins, ends))
+        if len(k) == 0:
+            return hit, wall, distance, point, normal
+
+        # Fase precisa: intersección rayo/segmento de todos los pares a la vez.
+        # origin + t * direction = start + u * edge con t en [0, length] y u en [0, 1]
+        ray = directions[k]
+        edge = self.edges[j]
+        offset = self.starts[j] - origins[k]
+        denominator = ray[:, 0] * edge[:, 1] - ray[:, 1] * edge[:, 0]
+        parallel = denominator == 0
+        denominator[parallel] = 1.0
+        t = (offset[:, 0] * edge[:, 1] - offset[:, 1] * edge[:, 0]) / denominator
+        u = (offset[:, 0] * ray[:, 1] - offset[:, 1] * ray[:, 0]) / denominator
+        crossing = ~parallel & (t >= 0) & (t <= lengths[k]) & (u >= 0) & (u <= 1)
+        if not crossing.any():
+            return hit, wall, distance, point, normal
+        k, j, t = k[crossing], j[crossing], t[crossing]
+
+        # Para cada rayo nos quedamos con la pared más próxima
+        order = np.lexsort((t, k))
+        first = order[np.unique(k[order], return_index=True)[1]]
+        rays = k[first]
+        hit[rays] = True
+        wall[rays] = j[first]
+        distance[rays] = t[first]
+        point[rays] = origins[rays] + directions[rays] * t[first, None]
+        wall_normal = self.normals[j[first]]
+        facing = np.einsum('ij,ij->i', wall_normal, directions[rays]) > 0
+        wall_normal[facing] *= -1
+        normal[rays] = wall_normal
+        return hit, wall, distance, point, normal
+
+    def raycast_one(self, origin, direction, length: float):
+        # Igual que raycast para un solo rayo, sin NumPy. Devuelve (wall,
+        # distance, point, normal) o None si no hay choque.
+        origin_x, origin_y = origin[0], origin[1]
+        direction_x, direction_y = direction[0], direction[1]
+        end_x = origin_x + direction_x * length
+        end_y = origin_y + direction_y * length
+        candidates = self.grid.query_box(min(origin_x, end_x), min(origin_y, end_y),
+                                         max(origin_x, end_x), max(origin_y, end_y))
+        best = None
+        best_distance = length
+        for j in candidates:
+            start_x, start_y = self._start_list[j]
+            edge_x, edge_y = self._edge_list[j]
+            denominator = direction_x * edge_y - direction_y * edge_x
+            if denominator == 0:
+                continue
+            offset_x = start_x - origin_x
+            offset_y = start_y - origin_y
+            t = (offset_x * edge_y - offset_y * edge_x) / denominator
+            u = (offset_x * direction_y - offset_y * direction_x) / denominator
+            if 0 <= t <= best_distance and 0 <= u <= 1:
+                normal_x, normal_y = self._normal_list[j]
+                if normal_x * direction_x + normal_y * direction_y > 0:
+                    normal_x, normal_y = -normal_x, -normal_y
+                best = (j, t, (origin_x + direction_x * t, origin_y + direction_y * t), (normal_x, normal_y))
+                best_distance = t
+        return best
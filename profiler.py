@@ -0,0 +1,229 @@
+# profiler.py
+
+import collections
+import functools
+import json
+import os
+import threading
+import time
+import numpy as np
+import pygame
+
+# Medición del tiempo de cada fase de un cuadro (entrada, steering por clase
+# de comportamiento, integración, dibujo y presentación). Los tiempos de cada
+# cuadro se guardan en una ventana móvil para calcular percentiles y los
+# últimos intervalos se pueden exportar en el formato de eventos de Chrome
+# (chrome://tracing o https://ui.perfetto.dev).
+#
+# Mientras está apagado no hay nada instalado: phase() devuelve un contexto
+# vacío y los métodos get_steering/update son los originales. Al encenderlo
+# se envuelven esos métodos para medir cada llamada.
+
+# Fases del cuadro en el orden en que se muestran en el HUD
+FRAME_PHASES = ('frame', 'input', 'simulation', 'integration', 'render', 'present')
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+
+def default_hooks() -> list:
+    # Métodos que se miden al encender el perfilador: (clase, método, fase).
+    # Los tiempos son inclusivos: un comportamiento que usa otro (Pursue usa
+    # Seek) incluye el tiempo del segundo.
+    import algorithms
+    import characters
+    hooks = [(characters.Kinematic, 'update', 'integration'),
+             (characters.Kinematic, 'update_kinematic', 'integration'),
+             (characters.KinematicPopulation, 'update', 'integration'),
+             (characters.KinematicPopulation, 'update_kinematic', 'integration')]
+    for value in vars(algorithms).values():
+        if isinstance(value, type) and 'get_steering' in vars(value):
+            hooks.append((value, 'get_steering', f'steering/{value.__name__}'))
+    return hooks
+
+
+class Profiler:
+    def __init__(self, window: int = 240, max_events: int = 200_000):
+        # window: cuadros que se usan para los percentiles
+        # max_events: intervalos que se conservan para la traza (los más recientes)
+        self.enabled: bool = False
+        self.window: int = window
+        self.samples: dict = {}
+        self.events: collections.deque = collections.deque(maxlen=max_events)
+        self.origin: int = time.perf_counter_ns()
+        self.frame_start: int = None
+        # Intervalos del cuadro actual; list.append es seguro entre hilos
+        self._pending: list = []
+        self._installed: list = []
+
+    def enable(self, hooks: list = None):
+        if self.enabled:
+            return
+        for cls, method, name in hooks if hooks is not None else default_hooks():
+            original = vars(cls)[method]
+            setattr(cls, method, self._timed(original, name))
+            self._installed.append((cls, method, original))
+        self.enabled = True
+
+    def disable(self):
+        # Restaura los métodos originales (en orden inverso por si alguno se
+        # envolvió dos veces)
+        for cls, method, original in reversed(self._installed):
+            setattr(cls, method, original)
+        self._installed = []
+        self._pending = []
+        self.frame_start = None
+        self.enabled = False
+
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    def reset(self):
+        self.samples = {}
+        self.events.clear()
+        self._pending = []
+
+    def _timed(self, function, name: str):
+        record = self.record
+        clock = time.perf_counter_ns
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, start, clock())
+
+        return wrapper
+
+    def phase(self, name: str):
+        # with profiler.phase('render'): ...
+        if not self.enabled:
+            return NULL_PHASE
+        return _Phase(self, name)
+
+    def record(self, name: str, start: int, end: int):
+        # Intervalo en nanosegundos de perf_counter_ns
+        self._pending.append((name, start, end, threading.get_ident()))
+
+    def begin_frame(self):
+        if self.enabled:
+            self.frame_start = time.perf_counter_ns()
+
+    def end_frame(self):
+        # Suma lo medido en el cuadro por fase y lo agrega a las ventanas.
+        # Las fases conocidas que no corrieron en este cuadro cuentan como 0,
+        # así los percentiles reflejan el costo por cuadro.
+        if not self.enabled or self.frame_start is None:
+            # Cuadro incompleto (se encendió a la mitad): se descarta
+            self._pending = []
+            return
+        self.record('frame', self.frame_start, time.perf_counter_ns())
+        self.frame_start = None
+        pending, self._pending = self._pending, []
+        totals = dict.fromkeys(self.samples, 0.0)
+        for name, start, end, thread in pending:
+            totals[name] = totals.get(name, 0.0) + (end - start) / 1e6
+        for name, total in totals.items():
+            if name not in self.samples:
+                self.samples[name] = collections.deque(maxlen=self.window)
+            self.samples[name].append(total)
+        self.events.extend(pending)
+
+    def percentiles(self, name: str, q=(50, 95, 99)) -> tuple:
+        # Percentiles (en ms por cuadro) de la fase en la ventana móvil
+        samples = self.samples.get(name)
+        if not samples:
+            return tuple(0.0 for _ in q)
+        return tuple(np.percentile(np.fromiter(samples, float, len(samples)), q).tolist())
+
+    def summary(self, q=(50, 95, 99)) -> dict:
+        # Fase -> percentiles, con las fases del cuadro primero
+        names = [name for name in FRAME_PHASES if name in self.samples]
+        names += sorted(name for name in self.samples if name not in FRAME_PHASES)
+        return {name: self.percentiles(name, q) for name in names}
+
+    def trace_events(self) -> list:
+        # Eventos completos ('X') con tiempos en microsegundos
+        pid = os.getpid()
+        threads = {}
+        events = []
+        for name, start, end, thread in self.events:
+            tid = threads.setdefault(thread, len(threads))
+            events.append({'name': name, 'cat': name.split('/')[0], 'ph': 'X',
+                           'ts': (start - self.origin) / 1000, 'dur': (end - start) / 1000,
+                           'pid': pid, 'tid': tid})
+        for thread, tid in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': 'main' if thread == threading.main_thread().ident
+                                    else f'worker {tid}'}})
+        return events
+
+    def export_chrome_trace(self, path: str):
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, file)
+
+
+class ProfilerHUD:
+    # Tabla con los percentiles de cada fase dibujada sobre la escena. El
+    # texto se vuelve a generar cada refresh cuadros, no en todos.
+    def __init__(self, profiler: "Profiler", position=(10, 10), refresh: int = 15):
+        self.profiler: Profiler = profiler
+        self.position = position
+        self.refresh: int = refresh
+        self.font: pygame.font.Font = None
+        self.surface: pygame.Surface = None
+        self.frames: int = 0
+
+    def _render(self) -> pygame.Surface:
+        if self.font is None:
+            self.font = pygame.font.SysFont('monospace', 14)
+        lines = [f"{'fase (ms)':<34}{'p50':>7}{'p95':>7}{'p99':>7}"]
+        for name, values in self.profiler.summary().items():
+            lines.append(f"{name[:34]:<34}" + "".join(f"{value:>7.2f}" for value in values))
+        rendered = [self.font.render(line, True, (255, 255, 255)) for line in lines]
+        height = self.font.get_linesize()
+        surface = pygame.Surface((max(text.get_width() for text in rendered) + 12,
+                                  height * len(rendered) + 12), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 180))
+        for row, text in enumerate(rendered):
+            surface.blit(text, (6, 6 + row * height))
+        return surface
+
+    def draw(self, screen: pygame.Surface) -> pygame.Rect:
+        if self.surface is None or self.frames % self.refresh == 0:
+            self.surface = self._render()
+        self.frames += 1
+        return screen.blit(self.surface, self.position)
+
+
+# Perfilador compartido por el bucle principal y los escenarios
+profiler = Profiler()
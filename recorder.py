@@ -0,0 +1,156 @@
+# recorder.py
+
+import json
+import threading
+import numpy as np
+
+# Grabación de trayectorias: en cada tick se copian posición, orientación y
+# velocidad de todos los personajes a un búfer circular float32 reservado de
+# antemano, y un hilo aparte lo va agregando al final de un archivo .npy. El
+# bucle principal nunca espera al disco: si el búfer se llena (el disco no da
+# abasto) el tick se descarta y se cuenta en dropped.
+#
+# El archivo es un .npy normal con forma (ticks, agentes, 5) y columnas
+# x, y, orientation, vx, vy; la cabecera se reescribe con el número de ticks
+# después de cada escritura, así el archivo se puede abrir (por ejemplo con
+# np.load(path, mmap_mode='r')) aunque la grabación no haya terminado. Los
+# datos del escenario (paso de tiempo, colores, ...) van en path + '.json'.
+#
+# Si el escenario agrega personajes mientras se graba (las oleadas de una
+# escena), el recorder se crea con agents igual a la cantidad final: cada tick
+# ocupa siempre esas filas y las de los personajes que todavía no aparecieron
+# quedan en NaN.
+
+FIELDS = ('x', 'y', 'orientation', 'vx', 'vy')
+# Tamaño fijo de la cabecera .npy, para poder reescribirla en el lugar
+HEADER_SIZE = 256
+
+
+def npy_header(shape: tuple, dtype=np.float32) -> bytes:
+    # Cabecera .npy (versión 1.0) rellenada con espacios hasta HEADER_SIZE bytes
+    description = repr({'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                        'fortran_order': False, 'shape': tuple(shape)})
+    prefix = b'\x93NUMPY\x01\x00'
+    length = HEADER_SIZE - len(prefix) - 2
+    text = description.encode('latin1').ljust(length - 1) + b'\n'
+    if len(text) > length:
+        raise ValueError(f"Cabecera demasiado grande para la forma {shape}")
+    return prefix + length.to_bytes(2, 'little') + text
+
+
+def read_metadata(path: str) -> dict:
+    # Datos guardados junto a la grabación ({} si no hay)
+    try:
+        with open(path + '.json') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+class TrajectoryRecorder:
+    def __init__(self, path: str, capacity: int = 120, metadata: dict = None, agents: int = None):
+        # capacity: ticks que caben en el búfer mientras el hilo escribe
+        # agents: filas por tick (por defecto los personajes del primer tick)
+        self.path: str = path
+        self.capacity: int = max(1, capacity)
+        self.metadata: dict = dict(metadata or {})
+        self.agents: int = agents
+        self.buffer: np.ndarray = None
+        # Ticks entregados a record (written) y ya escritos en disco (flushed).
+        # Solo el hilo principal cambia written y solo el escritor flushed.
+        self.written: int = 0
+        self.flushed: int = 0
+        self.dropped: int = 0
+        self.file = open(path, 'wb')
+        self._wake: threading.Event = threading.Event()
+        self._stop: bool = False
+        self._error: BaseException = None
+        self._thread: threading.Thread = None
+
+    def record(self, position: np.ndarray, orientation: np.ndarray, velocity: np.ndarray) -> bool:
+        # Copia el estado de un tick al búfer. Devuelve False si se descartó.
+        count = len(orientation)
+        if self.buffer is None:
+            self._start(self.agents if self.agents is not None else count)
+        if count > self.agents:
+            raise ValueError(
+                f"La grabación es de {self.agents} personajes y llegaron {count}")
+        if self._error is not None:
+            raise RuntimeError("Falló la escritura de la grabación") from self._error
+        if self.written - self.flushed >= self.capacity:
+            self.dropped += 1
+            return False
+        row = self.buffer[self.written % self.capacity]
+        row[:count, 0:2] = position
+        row[:count, 2] = orientation
+        row[:count, 3:5] = velocity
+        # Personajes que todavía no aparecieron
+        row[count:] = np.nan
+        self.written += 1
+        self._wake.set()
+        return True
+
+    def _start(self, agents: int):
+        self.agents = agents
+        self.buffer = np.zeros((self.capacity, agents, len(FIELDS)), dtype=np.float32)
+        self.file.write(npy_header((0, agents, len(FIELDS))))
+        self._thread = threading.Thread(target=self._run, name="trajectory-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                self._wake.wait(0.1)
+                self._wake.clear()
+                stop = self._stop
+                self._flush()
+                if stop:
+                    break
+        except BaseException as error:
+            self._error = error
+
+    def _flush(self):
+        # Escribe lo pendiente (en uno o dos tramos si da la vuelta al búfer)
+        # y actualiza la cabecera
+        written = self.written
+        if written == self.flushed:
+            return
+        while self.flushed < written:
+            start = self.flushed % self.capacity
+            count = min(written - self.flushed, self.capacity - start)
+            if self.agents:
+                self.file.write(memoryview(self.buffer[start:start + count]).cast('B'))
+            self.flushed += count
+        position = self.file.tell()
+        self.file.seek(0)
+        self.file.write(npy_header((self.flushed, self.agents, len(FIELDS))))
+        self.file.seek(position)
+        self.file.flush()
+
+    def close(self, metadata: dict = None):
+        # Espera a que se escriba todo, cierra el archivo y guarda los datos;
+        # metadata actualiza los del principio (por ejemplo los colores de
+        # los personajes que aparecieron durante la grabación)
+        if self.file.closed:
+            return
+        if self._thread is not None:
+            self._stop = True
+            self._wake.set()
+            self._thread.join()
+        else:
+            # Nunca llegó un tick: grabación vacía
+            self.file.write(npy_header((0, 0, len(FIELDS))))
+        self.file.close()
+        self.metadata.update(metadata or {})
+        self.metadata.update({'ticks': self.flushed, 'agents': self.agents or 0,
+                              'fields': list(FIELDS), 'dropped': self.dropped})
+        with open(self.path + '.json', 'w') as file:
+            json.dump(self.metadata, file)
+        if self._error is not None:
+            raise RuntimeError("Falló la escritura de la grabación") from self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,197 @@
+# replay.py
+
+import argparse
+import math
+import sys
+import numpy as np
+import pygame
+from camera import Camera, CameraController, view_size
+from drawing import pacman_sprites
+from recorder import read_metadata
+from scenarios import SPRITE_RADIUS, interpolate_poses
+from utils import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK, WHITE, YELLOW
+
+# Reproduce una grabación de recorder.py. El archivo se abre con np.memmap
+# (np.load con mmap_mode), así que no se carga en memoria: cada cuadro lee
+# solo las filas de los dos ticks que dibuja y saltar a cualquier tick cuesta
+# lo mismo sin importar el largo de la grabación.
+
+# Velocidades de reproducción permitidas (en valor absoluto)
+MIN_SPEED = 1 / 16
+MAX_SPEED = 64.0
+# Alto de la barra de tiempo en la parte inferior de la ventana
+TIMELINE_HEIGHT = 24
+
+
+class TrajectoryPlayer:
+    def __init__(self, path: str):
+        self.path: str = path
+        # Forma (ticks, personajes, 5): x, y, orientation, vx, vy
+        self.frames: np.ndarray = np.load(path, mmap_mode='r')
+        self.metadata: dict = read_metadata(path)
+        self.delta_time: float = self.metadata.get('dt', 1 / 60)
+        # Tick actual (con fracción, para interpolar entre ticks)
+        self.cursor: float = 0.0
+        # Ticks de la grabación por tick de simulación; negativa hacia atrás
+        self.speed: float = 1.0
+        self.paused: bool = False
+
+    @property
+    def ticks(self) -> int:
+        return len(self.frames)
+
+    @property
+    def agents(self) -> int:
+        return self.frames.shape[1]
+
+    def seek(self, tick: float):
+        self.cursor = min(max(tick, 0.0), max(self.ticks - 1, 0))
+
+    def advance(self, frame_time: float):
+        # Avanza (o retrocede) según la velocidad; se detiene en los extremos
+        if self.paused or self.ticks == 0:
+            return
+        self.seek(self.cursor + self.speed * frame_time / self.delta_time)
+        if (self.speed > 0 and self.cursor >= self.ticks - 1) or (self.speed < 0 and self.cursor <= 0):
+            self.paused = True
+
+    def reverse(self):
+        self.speed = -self.speed
+        self.paused = False
+
+    def scale_speed(self, factor: float):
+        magnitude = min(max(abs(self.speed) * factor, MIN_SPEED), MAX_SPEED)
+        self.speed = math.copysign(magnitude, self.speed)
+
+    def pose(self):
+        # Posiciones (n, 2) y orientaciones (n,) en el cursor actual
+        if self.ticks == 0:
+            return np.zeros((0, 2)), np.zeros(0)
+        first = int(self.cursor)
+        alpha = self.cursor - first
+        current = np.asarray(self.frames[first], dtype=float)
+        if alpha == 0.0 or first + 1 >= self.ticks:
+            return current[:, 0:2], current[:, 2]
+        following = np.asarray(self.frames[first + 1], dtype=float)
+        world_size = (self.metadata.get('width', SCREEN_WIDTH), self.metadata.get('height', SCREEN_HEIGHT))
+        return interpolate_poses(current[:, 0:2], current[:, 2], following[:, 0:2], following[:, 2], alpha,
+                                 world_size)
+
+    def colors(self) -> list:
+        colors = self.metadata.get('colors')
+        if colors is None or len(colors) > self.agents:
+            return None
+        # Si la grabación terminó antes de que aparecieran todos, los que
+        # faltan son filas NaN que no se dibujan
+        return [tuple(color) for color in colors] + [YELLOW] * (self.agents - len(colors))
+
+
+def timeline_rect(screen) -> pygame.Rect:
+    width, height = screen.get_size()
+    return pygame.Rect(0, height - TIMELINE_HEIGHT, width, TIMELINE_HEIGHT)
+
+
+def draw_replay(screen, player: TrajectoryPlayer, font, camera: Camera):
+    screen.fill(BLACK)
+    position, orientation = player.pose()
+    # Solo los personajes dentro de la cámara
+    visible = camera.visible_mask(position, SPRITE_RADIUS)
+    colors = player.colors()
+    if colors is not None:
+        colors = [colors[i] for i in np.flatnonzero(visible).tolist()]
+    pacman_sprites.draw_many(screen, camera.to_screen(position[visible]), orientation[visible],
+                             camera.sprite_radius(SPRITE_RADIUS), colors)
+
+    # Barra de tiempo con la posición del cursor
+    bar = timeline_rect(screen)
+    pygame.draw.rect(screen, (40, 40, 40), bar)
+    if player.ticks > 1:
+        done = bar.width * player.cursor / (player.ticks - 1)
+        pygame.draw.rect(screen, (90, 90, 160), (bar.x, bar.y, done, bar.height))
+    state = "pausa" if player.paused else f"x{player.speed:g}"
+    text = font.render(f"{player.metadata.get('title', player.path)}  "
+                       f"tick {int(player.cursor)}/{max(player.ticks - 1, 0)}  "
+                       f"{player.cursor * player.delta_time:.1f} s  {state}", True, WHITE)
+    screen.blit(text, (bar.x + 6, bar.y + (bar.height - text.get_height()) // 2))
+
+
+def run_replay(screen, clock, player: TrajectoryPlayer):
+    # Espacio: pausa; R: invertir; flechas arriba/abajo: velocidad x2 o /2;
+    # flechas izquierda/derecha: un tick (con Shift, 10 segundos); Inicio y
+    # Fin; clic o arrastre sobre la barra: saltar a ese momento. La cámara
+    # se maneja como en main.py (rueda, botón derecho y F).
+    font = pygame.font.SysFont(None, 22)
+    camera = Camera(*screen.get_size(), player.metadata.get('width', SCREEN_WIDTH),
+                    player.metadata.get('height', SCREEN_HEIGHT))
+    controls = CameraController(camera)
+    scrubbing = False
+    while True:
+        frame_time = clock.tick(60) / 1000.0
+        for event in pygame.event.get():
+            if controls.handle(event):
+                continue
+            elif event.type == pygame.QUIT:
+                return
+            elif event.type == pygame.KEYDOWN:
+                shift = event.mod & pygame.KMOD_SHIFT
+                jump = 10.0 / player.delta_time if shift else 1.0
+                if event.key == pygame.K_ESCAPE:
+                    return
+                elif event.key == pygame.K_SPACE:
+                    player.paused = not player.paused
+                elif event.key == pygame.K_r:
+                    player.reverse()
+                elif event.key == pygame.K_UP:
+                    player.scale_speed(2.0)
+                elif event.key == pygame.K_DOWN:
+                    player.scale_speed(0.5)
+                elif event.key == pygame.K_RIGHT:
+                    player.paused = True
+                    player.seek(math.floor(player.cursor) + jump)
+                elif event.key == pygame.K_LEFT:
+                    player.paused = True
+                    player.seek(math.ceil(player.cursor) - jump)
+                elif event.key == pygame.K_HOME:
+                    player.seek(0)
+                elif event.key == pygame.K_END:
+                    player.seek(player.ticks - 1)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                scrubbing = timeline_rect(screen).collidepoint(event.pos)
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                scrubbing = False
+
+        if scrubbing:
+            bar = timeline_rect(screen)
+            fraction = (pygame.mouse.get_pos()[0] - bar.x) / max(bar.width - 1, 1)
+            player.seek(fraction * (player.ticks - 1))
+        else:
+            player.advance(frame_time)
+
+        draw_replay(screen, player, font, camera)
+        pygame.display.flip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduce una grabación de trayectorias.")
+    parser.add_argument("path", help="Archivo .npy grabado con F5 o headless.py --record")
+    parser.add_argument("--start", type=float, default=0.0, help="Segundo en el que empezar")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Velocidad de reproducción (negativa hacia atrás)")
+    args = parser.parse_args()
+
+    player = TrajectoryPlayer(args.path)
+    player.seek(args.start / player.delta_time)
+    player.speed = args.speed if args.speed != 0 else 1.0
+
+    pygame.init()
+    screen = pygame.display.set_mode(view_size(player.metadata.get('width', SCREEN_WIDTH),
+                                               player.metadata.get('height', SCREEN_HEIGHT),
+                                               SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption(f"Repetición: {args.path}")
+    run_replay(screen, pygame.time.Clock(), player)
+    pygame.quit()
+    sys.exit()
+
+
+if __name__ == "__main__":
+    main()
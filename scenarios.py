@@ -0,0 +1,1203 @@
+# scenarios.py
+
+import pygame
+import math
+import os
+import random
+import numpy as np
+from characters import (DRAG_TIME_STEP, Kinematic, KinematicPopulation, Static, SteeringOutput,
+                        KinematicSteeringOutput, map_to_range)
+from algorithms import *
+from agents import Agent, AgentRegistry
+from obstacles import ObstacleSet, WallSet
+from drawing import Path, pacman_sprites
+from executor import SteeringExecutor
+from sharding import ShardedSimulation
+from spatial import SpatialHashGrid
+from utils import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK, WHITE, YELLOW
+
+# Cada escenario se divide en la configuración (__init__), un paso de
+# simulación puro (step) y el dibujo (draw). La posición del mouse llega en
+# self.pointer, así el mismo escenario corre en una ventana o sin pantalla.
+#
+# Todo se simula en coordenadas del mundo (de self.width por self.height).
+# Los métodos de dibujo reciben una cámara opcional (camera.py); sin cámara
+# el mundo se dibuja tal cual, con un píxel por unidad.
+
+# Radio de los personajes en unidades del mundo
+SPRITE_RADIUS = 20
+# Margen de la consulta a la rejilla al descartar personajes fuera de la
+# cámara: la rejilla se reconstruyó al principio del último paso y desde
+# entonces los personajes se movieron un poco
+CULL_MARGIN = 50.0
+
+
+class Scenario:
+    title: str = ""
+    description: str = ""
+
+    def __init__(self, count: int = 1):
+        self.count: int = count
+        # Tamaño del mundo
+        self.width: float = SCREEN_WIDTH
+        self.height: float = SCREEN_HEIGHT
+        # Centro de la cámara en coordenadas del mundo (None sin pantalla)
+        self.view_center = None
+        # Posición del mouse (o del jugador simulado cuando no hay pantalla)
+        self.pointer = pygame.math.Vector2(self.width / 2, self.height / 2)
+        # Estado del paso anterior, para interpolar el dibujo
+        self.previous_state = None
+        # Capa con lo que no cambia entre cuadros (ver draw_static)
+        self.background: pygame.Surface = None
+        self.background_key: tuple = None
+
+    def step(self, delta_time: float):
+        raise NotImplementedError
+
+    def draw(self, screen, alpha: float = 1.0, camera=None):
+        # Cuadro completo: capa estática, personajes y marcadores
+        self.draw_background(screen, camera)
+        self.draw_dynamic(screen, alpha, camera)
+
+    def draw_dynamic(self, screen, alpha: float = 1.0, camera=None) -> list:
+        # Lo que cambia en cada cuadro; devuelve los rectángulos que tocó
+        rects = self.draw_characters(screen, alpha, camera)
+        rects.extend(self.draw_markers(screen, camera))
+        return rects
+
+    def draw_markers(self, screen, camera=None) -> list:
+        # Marcadores sobre los personajes (objetivo, jugador); devuelve sus rectángulos
+        return []
+
+    def draw_marker(self, screen, position, camera=None) -> pygame.Rect:
+        # Círculo blanco en position (coordenadas del mundo)
+        if camera is not None:
+            position = camera.to_screen_point(position)
+        return pygame.draw.circle(screen, WHITE, (int(position[0]), int(position[1])), 5)
+
+    def draw_static(self, surface, camera=None):
+        # Dibuja lo que no cambia entre cuadros (fondo, obstáculos, caminos)
+        surface.fill(BLACK)
+
+    def background_layer(self, screen, camera=None) -> pygame.Surface:
+        # Capa estática del tamaño de screen; se vuelve a dibujar solo si
+        # cambia el tamaño o se mueve la cámara
+        key = (screen.get_size(), camera.key if camera is not None else None)
+        if self.background is None or self.background_key != key:
+            if self.background is None or self.background.get_size() != screen.get_size():
+                self.background = pygame.Surface(screen.get_size())
+                if pygame.display.get_surface() is not None:
+                    self.background = self.background.convert()
+            self.draw_static(self.background, camera)
+            self.background_key = key
+        return self.background
+
+    def draw_background(self, screen, camera=None):
+        screen.blit(self.background_layer(screen, camera), (0, 0))
+
+    def close(self):
+        # Libera lo que el escenario haya reservado fuera de Python (procesos,
+        # memoria compartida); se llama cuando el escenario termina
+        pass
+
+    def kinematics(self) -> list:
+        # Personajes que se dibujan, en orden
+        return self.characters
+
+    def colors(self) -> list:
+        # Color de cada personaje (None = amarillo para todos)
+        return None
+
+    def state(self):
+        # Posiciones (n, 2), orientaciones (n,) y velocidades (n, 2) de los personajes
+        characters = self.kinematics()
+        position = np.array([(c.position.x, c.position.y) for c in characters], dtype=float).reshape(-1, 2)
+        orientation = np.array([c.orientation for c in characters], dtype=float)
+        velocity = np.array([(c.velocity.x, c.velocity.y) for c in characters], dtype=float).reshape(-1, 2)
+        return position, orientation, velocity
+
+    def recording_metadata(self, delta_time: float) -> dict:
+        # Lo que una grabación de trayectorias necesita para reproducirse
+        colors = self.colors()
+        return {'scenario': type(self).__name__, 'title': self.title, 'dt': delta_time,
+                'width': self.width, 'height': self.height,
+                'colors': [list(color) for color in colors] if colors is not None else None}
+
+    def max_agents(self) -> int:
+        # Personajes que puede llegar a tener el escenario, si aparecen más
+        # durante la simulación (None: siempre los mismos)
+        return None
+
+    def snapshot(self):
+        # Se llama antes de cada paso de simulación
+        self.previous_state = self.state()
+
+    def spatial_index(self) -> SpatialHashGrid:
+        # Rejilla reconstruida en el último paso con todos los personajes, si
+        # el escenario tiene una; sirve para no revisar a todos al dibujar
+        return None
+
+    def candidates(self, rect: tuple) -> np.ndarray:
+        # Índices de los personajes que pueden estar dentro de rect (min_x,
+        # min_y, max_x, max_y), o None si hay que revisar a todos
+        grid = self.spatial_index()
+        return None if grid is None else grid.query_rect(*rect)
+
+    def interpolated(self, alpha: float, indices=None):
+        # Posiciones y orientaciones entre el paso anterior y el actual, de
+        # todos los personajes o solo de indices
+        position, orientation, _ = self.state()
+        previous = self.previous_state
+        if previous is not None and len(previous[1]) != len(orientation):
+            previous = None
+        if indices is not None:
+            position, orientation = position[indices], orientation[indices]
+        if previous is None or alpha >= 1.0:
+            return position, orientation
+        previous_position, previous_orientation, _ = previous
+        if indices is not None:
+            previous_position, previous_orientation = previous_position[indices], previous_orientation[indices]
+        return interpolate_poses(previous_position, previous_orientation, position, orientation, alpha,
+                                 (self.width, self.height))
+
+    def draw_characters(self, screen, alpha: float = 1.0, camera=None):
+        # Todos los sprites en una sola llamada a Surface.blits; devuelve
+        # los rectángulos que ocupan
+        if camera is None:
+            position, orientation = self.interpolated(alpha)
+            return pacman_sprites.draw_many(screen, position, orientation, colors=self.colors())
+
+        # Con cámara se dibujan solo los visibles. La rejilla (si hay) da los
+        # candidatos cerca de la vista y solo esos se interpolan y se filtran.
+        indices = self.candidates(camera.visible_rect(SPRITE_RADIUS + CULL_MARGIN))
+        position, orientation = self.interpolated(alpha, indices)
+        visible = camera.visible_mask(position, SPRITE_RADIUS)
+        colors = self.colors()
+        if colors is not None:
+            chosen = np.flatnonzero(visible) if indices is None else indices[visible]
+            colors = [colors[i] for i in chosen.tolist()]
+        return pacman_sprites.draw_many(screen, camera.to_screen(position[visible]), orientation[visible],
+                                        camera.sprite_radius(SPRITE_RADIUS), colors)
+
+
+def interpolate_poses(previous_position: np.ndarray, previous_orientation: np.ndarray,
+                      position: np.ndarray, orientation: np.ndarray, alpha: float,
+                      world_size: tuple = (SCREEN_WIDTH, SCREEN_HEIGHT)):
+    # Posiciones y orientaciones a una fracción alpha entre dos estados
+    delta = position - previous_position
+    # Si el personaje cruzó el borde del mundo toroidal no interpolamos
+    jumped = (np.abs(delta[:, 0]) > world_size[0] / 2) | (np.abs(delta[:, 1]) > world_size[1] / 2)
+    delta[jumped] = 0.0
+    position = np.where(jumped[:, None], position, previous_position + delta * alpha)
+    orientation = previous_orientation + map_to_range(orientation - previous_orientation) * alpha
+    return position, orientation
+
+
+def draw_obstacles(surface, obstacles: ObstacleSet, camera=None):
+    centers, radii = obstacles.centers, obstacles.radii
+    if camera is not None:
+        # Solo los que tocan la vista
+        visible = camera.visible_mask(centers, radii.max(initial=0.0))
+        centers, radii = camera.to_screen(centers[visible]), radii[visible] * camera.zoom
+    for center, radius in zip(centers.tolist(), radii.tolist()):
+        pygame.draw.circle(surface, (128, 128, 128), (int(center[0]), int(center[1])), radius)
+
+
+def draw_walls(surface, walls: WallSet, camera=None):
+    starts, ends = walls.starts, walls.ends
+    if camera is not None:
+        starts, ends = camera.to_screen(starts), camera.to_screen(ends)
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        pygame.draw.line(surface, WHITE, start, end, 2)
+
+
+def draw_path(surface, path: Path, camera=None):
+    points = path.points if camera is None else camera.to_screen(path.points).tolist()
+    pygame.draw.lines(surface, WHITE, path.closed, points, 2)
+
+
+def random_position(width: float = SCREEN_WIDTH, height: float = SCREEN_HEIGHT) -> pygame.math.Vector2:
+    return pygame.math.Vector2(random.uniform(0, width), random.uniform(0, height))
+
+
+def look_where_you_are_going(character: Kinematic) -> LookWhereYouAreGoing:
+    # Look Where You're Going con los parámetros que usan los escenarios
+    return LookWhereYouAreGoing(
+        character,
+        max_rotation=character.max_rotation,
+        max_angular_acceleration=character.max_acceleration,
+        target_radius=0.01,
+        slow_radius=math.pi / 4
+    )
+
+
+def numpy_rng() -> np.random.Generator:
+    # Generador de NumPy sembrado desde random, así random.seed hace
+    # reproducible todo el escenario
+    return np.random.default_rng(random.getrandbits(64))
+
+
+class KinematicArriveScenario(Scenario):
+    title = "Kinematic Arrive"
+    description = "Ejecutando Kinematic Arrive. El personaje se moverá hacia el mouse."
+
+    def __init__(self, count: int = 1):
+        super().__init__(count)
+        # Configurar personajes
+        self.characters: list[Kinematic] = []
+        for _ in range(count):
+            character = Kinematic()
+            character.position = random_position(self.width, self.height)
+            character.orientation = random.uniform(0, 2 * math.pi)
+            character.max_speed = 200.0
+            self.characters.append(character)
+
+        # Configurar target
+        # Actualizaremos target.position con la posición del mouse
+        self.target = Static()
+
+        # Comportamiento Kinematic Arrive de cada personaje
+        self.agents = AgentRegistry()
+        for character in self.characters:
+            self.agents.add(character)
+        self.agents.bind_all('arrive', lambda character: KinematicArrive(
+            character, self.target, character.max_speed, radius=50.0, time_to_target=0.25))
+
+    def step(self, delta_time: float):
+        # Actualizar posición del target a la posición del mouse
+        self.target.position = pygame.math.Vector2(self.pointer)
+
+        for agent in self.agents:
+            character = agent.character
+            # Aplicar comportamiento Kinematic Arrive
+            steering = agent.steer('arrive')
+            character.update_kinematic(steering, delta_time)
+
+            # Mantener al personaje dentro de los límites de la pantalla
+            character.position.x = max(0, min(character.position.x, self.width))
+            character.position.y = max(0, min(character.position.y, self.height))
+
+    def draw_markers(self, screen, camera=None) -> list:
+        return [self.draw_marker(screen, self.target.position, camera)]
+
+
+class KinematicFleeScenario(Scenario):
+    title = "Kinematic Flee"
+    description = "Ejecutando Kinematic Flee. El personaje se alejará del mouse hasta una distancia determinada."
+
+    def __init__(self, count: int = 1):
+        super().__init__(count)
+        # Configurar personajes
+        self.characters: list[Kinematic] = []
+        for _ in range(count):
+            character = Kinematic()
+            character.position = random_position(self.width, self.height)
+            character.orientation = random.uniform(0, 2 * math.pi)
+            character.max_speed = 200.0
+            self.characters.append(character)
+
+        # Configurar target
+        # Actualizaremos target.position con la posición del mouse
+        self.target = Static()
+
+        # Definir la distancia máxima de huida
+        self.max_flee_distance = 100.0  # El personaje huirá hasta estar a 100 unidades del target
+
+        # Comportamiento Kinematic Flee de cada personaje
+        self.agents = AgentRegistry()
+        for character in self.characters:
+            self.agents.add(character)
+        self.agents.bind_all('flee', lambda character: KinematicFlee(
+            character, self.target, character.max_speed))
+
+    def step(self, delta_time: float):
+        # Actualizar posición del target a la posición del mouse
+        self.target.position = pygame.math.Vector2(self.pointer)
+
+        for agent in self.agents:
+            character = agent.character
+            # Calcular distancia al target
+            distance = (character.position - self.target.position).length()
+
+            if distance < self.max_flee_distance:
+                # Aplicar comportamiento Kinematic Flee
+                steering = agent.steer('flee')
+                character.update_kinematic(steering, delta_time)
+            else:
+                # Sin steering, el personaje se detiene
+                steering = KinematicSteeringOutput()
+                character.update_kinematic(steering, delta_time)
+
+            # Mantener al personaje dentro de los límites de la pantalla
+            character.position.x = max(0, min(character.position.x, self.width))
+            character.position.y = max(0, min(character.position.y, self.height))
+
+    def draw_markers(self, screen, camera=None) -> list:
+        return [self.draw_marker(screen, self.target.position, camera)]
+
+
+class KinematicWanderScenario(Scenario):
+    title = "Kinematic Wander"
+    description = "Ejecutando Kinematic Wander. El personaje vagará aleatoriamente."
+
+    def __init__(self, count: int = 1):
+        super().__init__(count)
+        # Configurar personajes
+        self.characters: list[Kinematic] = []
+        for _ in range(count):
+            character = Kinematic()
+            character.position = pygame.math.Vector2(
+                self.width / 2, self.height / 2)
+            character.orientation = random.uniform(0, 2 * math.pi)
+            character.max_speed = 150.0
+            character.max_rotation = math.pi  # Rotación máxima por actualización
+            self.characters.append(character)
+
+        # Comportamiento Kinematic Wander de cada personaje (la rotación
+        # máxima por paso depende de delta_time y se ajusta en step)
+        self.agents = AgentRegistry()
+        for character in self.characters:
+            self.agents.add(character)
+        self.agents.bind_all('wander', lambda character: KinematicWander(
+            character, character.max_speed, 0.0))
+
+    def step(self, delta_time: float):
+        for agent in self.agents:
+            character = agent.character
+            # Aplicar comportamiento Kinematic Wander
+            behavior = agent.get('wander')
+            behavior.max_rotation = 2 * character.max_rotation * delta_time
+            steering = behavior.get_steering()
+            character.update_kinematic(steering, delta_time)
+
+            # Mantener al personaje dentro de los límites de la pantalla (toroidal)
+            character.position.x = character.position.x % self.width
+            character.position.y = character.position.y % self.height
+
+
+class DynamicSeekScenario(Scenario):
+    title = "Dynamic Seek"
+    description = "Ejecutando Dynamic Seek. El personaje buscará al mouse."
+
+    def __init__(self, count: int = 1):
+        super().__init__(count)
+        # Configurar personajes
+        self.characters: list[Kinematic] = []
+        for _ in range(count):
+            character = Kinematic()
+            character.position = random_position(self.width, self.height)
+            character.orientation = random.uniform(0, 2 * math.pi)
+            character.max_speed = 200.0
+            character.max_acceleration = 150.0
+            self.characters.append(character)
+
+        # Configurar target
+        # Actualizaremos target.position con la posición del mouse
+        self.target = Kinematic()
+
+        # Comportamientos Dynamic Seek y Look Where You're Going de cada personaje
+        self.agents = AgentRegistry()
+        for character in self.characters:
+            self.agents.add(character)
+        self.agents.bind_all('seek', lambda character: DynamicSeek(
+            character, self.target, character.max_acceleration))
+        self.agents.bind_all('look', look_where_you_are_going)
+
+    def step(self, delta_time: float):
+        # Actualizar posición del target a la posición del mouse
+        self.target.position = pygame.math.Vector2(self.pointer)
+
+        for agent in self.agents:
+            character = agent.character
+            # Aplicar comportamiento Dynamic Seek
+            steering = agent.steer('seek')
+            character.update(steering, delta_time)
+
+            # Aplicar Look Where You're Going al personaje para que mire hacia donde se dirige
+            steering_look = agent.steer('look')
+            character.update(steering_look, delta_time)
+
+            # Mantener al personaje dentro de los límites de la pantalla
+            character.position.x = max(0, min(character.position.x, self.width))
+            character.position.y = max(0, min(character.position.y, self.height))
+
+    def draw_markers(self, screen, camera=None) -> list:
+        return [self.draw_marker(screen, self.target.position, camera)]
+
+
+class DynamicFleeScenario(Scenario):
+    title = "Dynamic Flee"
+    description = "Ejecutando Dynamic Flee. El personaje se alejará del mouse hasta una distancia determinada."
+
+    def __init__(self, count: int = 1):
+        super().__init__(count)
+        # Configurar personajes
+        self.characters: list[Kinematic] = []
+        for _ in range(count):
+            character = Kinematic()
+            character.position = random_position(self.width, self.height)
+            character.orientation = random.uniform(0, 2 * math.pi)
+            character.max_speed = 200.0
+            character.max_acceleration = 200.0
+            self.characters.append(character)
+
+        # Configurar target
+        # Actualizaremos target.position con la posición del mouse
+        self.target = Kinematic()
+
+        # Definir la distancia máxima de huida
+        self.max_flee_distance = 200.0  # El personaje huirá hasta estar a 200 unidades del target
+
+        # Comportamientos Dynamic Flee y Look Where You're Going de cada personaje
+        self.agents = AgentRegistry()
+        for character in self.characters:
+            self.agents.add(character)
+        self.agents.bind_all('flee', lambda character: DynamicFlee(
+            character, self.target, character.max_acceleration))
+        self.agents.bind_all('look', look_where_you_are_going)
+
+    def step(self, delta_time: float):
+        # Actualizar posición del target a la posición del mouse
+        self.target.position = pygame.math.Vector2(self.pointer)
+
+        for agent in self.agents:
+            character = agent.character
+            # Calcular distancia al target
+            distance = (character.position - self.target.position).length()
+
+            if distance < self.max_flee_distance:
+                # Aplicar comportamiento Dynamic Flee
+                steering = agent.steer('flee')
+                character.update(steering, delta_time)
+            else:
+                # Sin steering, el personaje continúa con su velocidad actual
+                steering = SteeringOutput()
+                character.update(steering, delta_time)
+
+            # Aplicar Look Where You're Going al personaje para que mire hacia donde se dirige
+            steering_look = agent.steer('look')
+            character.update(steering_look, delta_time)
+
+            # Mantener al personaje dentro de los límites de la pantalla (toroidal)
+            character.position.x = character.position.x % self.width
+            character.position.y = character.position.y % self.height
+
+    def draw_markers(self, screen, camera=None) -> list:
+        return [self.draw_marker(screen, self.target.position, camera)]
+
+
+class DynamicArriveScenario(Scenario):
+    title = "Dynamic Arrive"
+    description = "Ejecutando Dynamic Arrive. El personaje llegará al mouse de manera suave."
+
+    def __init__(self, count: int = 1):
+        super().__init__(count)
+        # Configurar personajes
+        self.characters: list[Kinematic] = []
+        for _ in range(count):
+            character = Kinematic()
+            character.position = random_position(self.width, self.height)
+            character.orientation = random.uniform(0, 2 * math.pi)
+            character.max_speed = 200.0
+            character.max_acceleration = 100.0
+            character.drag = 1.0  # Sin fricción
+            self.characters.append(character)
+
+        # Configurar target
+        # Actualizaremos target.position con la posición del mouse
+        self.target = Kinematic()
+
+        # Comportamientos Dynamic Arrive y Look Where You're Going de cada personaje
+        self.agents = AgentRegistry()
+        for character in self.characters:
+            self.agents.add(character)
+        self.agents.bind_all('arrive', lambda character: DynamicArrive(
+            character, self.target, character.max_acceleration, character.max_speed,
+            target_radius=40.0, slow_radius=250.0, time_to_target=0.1))
+        self.agents.bind_all('look', look_where_you_are_going)
+
+    def step(self, delta_time: float):
+        # Actualizar posición del target a la posición del mouse
+        self.target.position = pygame.math.Vector2(self.pointer)
+
+        for agent in self.agents:
+            character = agent.character
+            # Aplicar comportamiento Dynamic Arrive
+            steering = agent.steer('arrive')
+            character.update(steering, delta_time)
+
+            # Aplicar Look Where You're Going al personaje para que mire hacia donde se dirige
+            steering_look = agent.steer('look')
+            character.update(steering_look, delta_time)
+
+            # Mantener al personaje dentro de los límites de la pantalla (toroidal)
+            character.position.x = character.position.x % self.width
+            character.position.y = character.position.y % self.height
+
+    def draw_markers(self, screen, camera=None) -> list:
+        return [self.draw_marker(screen, self.target.position, camera)]
+
+
+class AlignScenario(Scenario):
+    title = "Align"
+    description = "Ejecutando Align. El personaje rotará para mirar hacia el mouse."
+
+    def __init__(self, count: int = 1):
+        super().__init__(count)
+        # Configurar personajes (el primero en el centro de la pantalla)
+        self.characters: list[Kinematic] = []
+        for i in range(count):
+            character = Kinematic()
+            if i == 0:
+                character.position = pygame.math.Vector2(
+                    self.width / 2, self.height / 2)
+            else:
+                character.position = random_position(self.width, self.height)
+            character.orientation = random.uniform(0, 2 * math.pi)
+            character.rotation = 0.0
+            character.max_rotation = math.pi  # Velocidad máxima de rotación
+            character.max_angular_acceleration = math.pi  # Aceleración angular máxima
+            self.characters.append(character)
+
+        # Comportamiento Align de cada personaje, con su propio target
+        self.agents = AgentRegistry()
+        for character in self.characters:
+            self.agents.add(character)
+        self.agents.bind_all('align', lambda character: Align(
+            character, Kinematic(), max_rotation=character.max_rotation,
+            max_angular_acceleration=character.max_angular_acceleration, target_radius=0.01, slow_radius=math.pi / 3))
+
+    def step(self, delta_time: float):
+        for agent in self.agents:
+            character = agent.character
+            behavior = agent.get('align')
+            # Calcular orientación objetivo basada en la posición del mouse
+            direction = self.pointer - character.position
+            if direction.length() > 0:
+                behavior.target.orientation = math.atan2(-direction.y, direction.x)
+            else:
+                behavior.target.orientation = character.orientation
+
+            # Aplicar comportamiento Align
+            steering = behavior.get_steering()
+            character.update(steering, delta_time)
+
+    def draw_markers(self, screen, camera=None) -> list:
+        return [self.draw_marker(screen, self.pointer, camera)]
+
+
+class VelocityMatchingScenario(Scenario):
+    title = "Velocity Matching"
+    description = "Ejecutando Velocity Matching. El personaje igualará su velocidad a la de otro."
+
+    def __init__(self, count: int = 1):
+        super().__init__(count)
+        # Configurar personajes
+        self.characters: list[Kinematic] = []
+        for i in range(count):
+            character = Kinematic()
+            character.position = pygame.math.Vector2(
+                100, self.height / 2) if i == 0 else random_position(self.width, self.height)
+            character.orientation = 0.0
+            character.velocity = pygame.math.Vector2(0, 0)
+            character.max_speed = 200.0
+            character.max_acceleration = 100.0
+            self.characters.append(character)
+
+        # Configurar target moviéndose con velocidad constante
+        self.target = Kinematic()
+        self.target.position = pygame.math.Vector2(300, self.height / 2)
+        self.target.orientation = 0.0
+        self.target.velocity = pygame.math.Vector2(
+            100, 0)  # Moviéndose hacia la derecha
+        self.target.max_speed = 200.0
+
+        # Comportamiento Velocity Matching de cada personaje
+        self.agents = AgentRegistry()
+        for character in self.characters:
+            self.agents.add(character)
+        self.agents.bind_all('match', lambda character: VelocityMatching(
+            character, self.target, character.max_acceleration, time_to_target=0.1))
+
+    def step(self, delta_time: float):
+        # Actualizar posición del target
+        target = self.target
+        target.position += target.velocity * delta_time
+        target.position.x = target.position.x % self.width
+        target.position.y = target.position.y % self.height
+
+        for agent in self.agents:
+            character = agent.character
+            # Aplicar comportamiento Velocity Matching
+            steering = agent.steer('match')
+            character.update(steering, delta_time)
+
+            # Mantener al personaje dentro de los límites de la pantalla (toroidal)
+            character.position.x = character.position.x % self.width
+            character.position.y = character.position.y % self.height
+
+    def draw_markers(self, screen, camera=None) -> list:
+        # Dibujar target
+        return [self.draw_marker(screen, self.target.position, camera)]
+
+
+class FaceScenario(Scenario):
+    title = "Face"
+    description = "Ejecutando Face. 5 personajes mirarán al mouse desde distintos lugares."
+
+    def __init__(self, count: int = 5):
+        super().__init__(count)
+        # Configurar personajes
+        self.characters: list[Kinematic] = []
+        for _ in range(count):
+            character = Kinematic()
+            character.position = random_position(self.width, self.height)
+            character.orientation = random.uniform(0, 2 * math.pi)
+            character.rotation = 0.0
+            character.max_rotation = math.pi  # Velocidad máxima de rotación
+            character.max_angular_acceleration = math.pi  # Aceleración angular máxima
+            self.characters.append(character)
+
+        # Comportamiento Face de cada personaje
+        self.agents = AgentRegistry()
+        for character in self.characters:
+            self.agents.add(character)
+        self.agents.bind_all('face', lambda character: Face(
+            character,
+            pygame.math.Vector2(self.pointer),
+            max_rotation=character.max_rotation,
+            max_angular_acceleration=character.max_angular_acceleration,
+            target_radius=0.01,
+            slow_radius=math.pi / 4
+        ))
+
+    def step(self, delta_time: float):
+        # Calcular posición objetivo (posición del mouse)
+        self.agents.retarget_all('face', pygame.math.Vector2(self.pointer), 'target_position')
+
+        # Actualizar cada personaje
+        for agent in self.agents:
+            steering = agent.steer('face')
+            agent.character.update(steering, delta_time)
+
+
+class PursueAndEvadeScenario(Scenario):
+    title = "Pursue and Evade - Look Where You're Going"
+    description = "Ejecutando Pursue and Evade. Un personaje persigue al jugador mientras otro lo evade."
+
+    def __init__(self, count: int = 1):
+        # count es el número de perseguidores (y también de evasores)
+        super().__init__(count)
+        self.pursuers: list[Kinematic] = [self._new_character() for _ in range(count)]
+        self.evaders: list[Kinematic] = [self._new_character() for _ in range(count)]
+
+        # El jugador es controlado por la posición del mouse (la primera
+        # posición se toma en el primer paso)
+        self.player = Kinematic()
+        self.player.velocity = pygame.math.Vector2(0, 0)
+        self.player_placed = False
+
+        # Comportamientos de cada perseguidor y evasor
+        self.pursuer_agents = AgentRegistry()
+        for pursuer in self.pursuers:
+            self.pursuer_agents.add(pursuer)
+        self.pursuer_agents.bind_all('move', lambda pursuer: Pursue(
+            pursuer, self.player, pursuer.max_acceleration, max_prediction=2.0))
+
+        self.evader_agents = AgentRegistry()
+        for evader in self.evaders:
+            self.evader_agents.add(evader)
+        self.evader_agents.bind_all('move', lambda evader: Evade(
+            evader, self.player, evader.max_acceleration, max_prediction=2.0))
+
+        for agents in (self.pursuer_agents, self.evader_agents):
+            agents.bind_all('look', lambda character: LookWhereYouAreGoing(
+                character,
+                max_rotation=character.max_rotation,
+                max_angular_acceleration=character.max_angular_acceleration,
+                target_radius=0.01,
+                slow_radius=math.pi / 4
+            ))
+
+    def _new_character(self) -> Kinematic:
+        character = Kinematic()
+        character.position = random_position(self.width, self.height)
+        character.orientation = random.uniform(0, 2 * math.pi)
+        character.velocity = pygame.math.Vector2(0, 0)
+        character.max_speed = 200.0
+        character.max_acceleration = 100.0
+        character.max_rotation = math.pi
+        character.max_angular_acceleration = math.pi
+        character.drag = 0.98  # Aplicar fricción si es necesario
+        return character
+
+    def step(self, delta_time: float):
+        player = self.player
+
+        # Actualizar posición del jugador y calcular su velocidad
+        new_player_position = pygame.math.Vector2(self.pointer)
+        if not self.player_placed:
+            player.position = new_player_position
+            self.player_placed = True
+        player.velocity = (new_player_position - player.position) / delta_time
+        player.position = new_player_position
+
+        # Actualizar perseguidores y evasores
+        for agent in self.pursuer_agents:
+            self._update(agent, delta_time)
+        for agent in self.evader_agents:
+            self._update(agent, delta_time)
+
+    def _update(self, agent: Agent, delta_time: float):
+        character = agent.character
+        # Pursue o Evade, y Look Where You're Going
+        steering_move = agent.steer('move')
+        steering_look = agent.steer('look')
+
+        # Combinar los steering
+        steering = SteeringOutput()
+        steering.linear = steering_move.linear
+        steering.angular = steering_look.angular
+
+        character.update(steering, delta_time)
+
+        # Limitar la velocidad y rotación máxima
+        if character.velocity.length() > character.max_speed:
+            character.velocity = character.velocity.normalize() * character.max_speed
+        character.rotation = max(-character.max_rotation,
+                                 min(character.rotation, character.max_rotation))
+
+        # Mantener al personaje dentro de los límites de la pantalla
+        character.position.x = max(0, min(character.position.x, self.width))
+        character.position.y = min(character.position.y, self.height)
+
+    def kinematics(self) -> list:
+        return self.pursuers + self.evaders
+
+    def colors(self) -> list:
+        # Rojo para perseguidores y azul para evasores
+        return [(255, 0, 0)] * len(self.pursuers) + [(0, 0, 255)] * len(self.evaders)
+
+    def draw_markers(self, screen, camera=None) -> list:
+        # Dibujar jugador (posición del mouse)
+        return [self.draw_marker(screen, self.player.position, camera)]
+
+
+class DynamicWanderScenario(Scenario):
+    title = "Dynamic Wander"
+    description = "Ejecutando Dynamic Wander. 5 personajes vagarán aleatoriamente."
+
+    def __init__(self, count: int = 5):
+        super().__init__(count)
+        # Configurar personajes
+        self.population = KinematicPopulation(count)
+        self.population.spawn(
+            count,
+            position=np.column_stack((
+                [random.uniform(0, self.width) for _ in range(count)],
+                [random.uniform(0, self.height) for _ in range(count)])),
+            orientation=[random.uniform(0, 2 * math.pi) for _ in range(count)],
+            max_speed=200.0,
+            max_acceleration=100.0,
+            max_rotation=math.pi,
+            max_angular_acceleration=math.pi
+        )
+
+        # Comportamiento Dynamic Wander para todos los personajes a la vez
+        self.behavior = BatchDynamicWander(
+            self.population,
+            wander_offset=100.0,
+            wander_radius=80.0,
+            wander_rate=math.pi / 4,
+            target_radius=0.01,
+            slow_radius=math.pi / 4,
+            rng=numpy_rng()
+        )
+        # Con muchos personajes el steering se evalúa por bloques en varios hilos
+        self.executor = SteeringExecutor()
+
+    def state(self):
+        population = self.population
+        return population.position.copy(), population.orientation.copy(), population.velocity.copy()
+
+    def close(self):
+        self.executor.close()
+
+    def step(self, delta_time: float):
+        # Aplicar comportamiento Dynamic Wander
+        linear, angular = self.executor.get_steering(self.behavior)
+        self.population.update(linear, angular, delta_time)
+        # Mantener personajes dentro de los límites de la pantalla (toroidal)
+        self.population.wrap(self.width, self.height)
+
+
+class PathFollowingScenario(Scenario):
+    title = "Path Following"
+    description = "Ejecutando Path Following. El personaje seguirá una ruta definida."
+
+    def __init__(self, count: int = 1):
+        super().__init__(count)
+        # Crear una ruta circular
+        center = pygame.math.Vector2(self.width / 2, self.height / 2)
+        radius = 200
+        num_points = 36  # Número de puntos en el círculo
+        waypoints = []
+        for i in range(num_points):
+            angle = 2 * math.pi * i / num_points
+            x = center.x + radius * math.cos(angle)
+            y = center.y + radius * math.sin(angle)
+            waypoints.append(pygame.math.Vector2(x, y))
+        self.path = Path(waypoints)
+
+        # Configurar personajes
+        self.characters: list[Kinematic] = []
+        self.agents = AgentRegistry()
+        for _ in range(count):
+            character = Kinematic()
+            character.position = random_position(self.width, self.height)
+            # Asegurar que el personaje inicia fuera del círculo
+            while (character.position - center).length() < radius:
+                character.position = random_position(self.width, self.height)
+            character.orientation = random.uniform(0, 2 * math.pi)
+            character.velocity = pygame.math.Vector2(0, 0)
+            character.max_speed = 200.0
+            character.max_acceleration = 100.0
+            self.characters.append(character)
+
+            # Crear comportamiento PathFollowing
+            agent = self.agents.add(character)
+            agent.bind('follow', PathFollowing(
+                character, self.path, path_offset=10.0, max_acceleration=character.max_acceleration))
+
+    def step(self, delta_time: float):
+        for agent in self.agents:
+            character = agent.character
+            # Obtener steering
+            steering = agent.steer('follow')
+            character.update(steering, delta_time)
+
+            # Limitar la velocidad máxima
+            if character.velocity.length() > character.max_speed:
+                character.velocity = character.velocity.normalize() * character.max_speed
+
+            # Mantener al personaje dentro de los límites de la pantalla (toroidal)
+            character.position.x = character.position.x % self.width
+            character.position.y = character.position.y % self.height
+
+    def draw_static(self, surface, camera=None):
+        surface.fill(BLACK)
+        # Dibujar la ruta
+        draw_path(surface, self.path, camera)
+
+
+class SeparationScenario(Scenario):
+    title = "Separation"
+    description = "Ejecutando Separation. Los personajes aplican Velocity Matching hacia el jugador mientras se mantienen separados y evitan colisionar con el jugador."
+
+    def __init__(self, count: int = 10):
+        super().__init__(count)
+        # Crear los personajes
+        self.characters: list[Kinematic] = []
+        for _ in range(count):
+            character = Kinematic()
+            character.position = random_position(self.width, self.height)
+            character.orientation = random.uniform(0, 2 * math.pi)
+            character.velocity = pygame.math.Vector2(0, 0)
+            character.max_speed = 200.0
+            character.max_acceleration = 100.0
+            character.drag = 0.98  # Aplicar fricción
+            self.characters.append(character)
+
+        # Crear el jugador que aplica Dynamic Wander
+        player = Kinematic()
+        player.position = pygame.math.Vector2(self.width / 2, self.height / 2)
+        player.orientation = random.uniform(0, 2 * math.pi)
+        player.velocity = pygame.math.Vector2(0, 0)
+        player.max_speed = 150.0
+        player.max_acceleration = 50.0
+        player.max_rotation = math.pi
+        player.max_angular_acceleration = math.pi
+        player.drag = 0.98  # Aplicar fricción
+        self.player = player
+
+        # Comportamiento Dynamic Wander para el jugador
+        self.player_behavior = DynamicWander(
+            player,
+            wander_offset=100.0,
+            wander_radius=50.0,
+            wander_rate=math.pi / 4,
+            max_acceleration=player.max_acceleration,
+            max_rotation=player.max_rotation,
+            max_angular_acceleration=player.max_angular_acceleration,
+            target_radius=0.01,
+            slow_radius=math.pi / 4
+        )
+
+        # Agregar el jugador a la lista de targets para Separation
+        self.all_targets = self.characters + [player]
+
+        # Rejilla para que Separation solo revise a los vecinos cercanos
+        self.separation_threshold = 20.0
+        self.grid = SpatialHashGrid(self.separation_threshold, self.width, self.height)
+
+        # Comportamientos de cada personaje
+        self.agents = AgentRegistry()
+        for character in self.characters:
+            self.agents.add(character)
+        # Velocity Matching hacia el jugador combinado con Separation de otros
+        # personajes y del jugador
+        self.agents.bind_all('move', lambda character: BlendedSteering(character, [
+            (VelocityMatching(character, player, character.max_acceleration, time_to_target=0.1), 1.0),
+            (Separation(character, self.all_targets, threshold=self.separation_threshold,
+                        decay_coefficient=1000.0, max_acceleration=character.max_acceleration, grid=self.grid), 1.0),
+        ], max_acceleration=character.max_acceleration))
+        self.agents.bind_all('look', look_where_you_are_going)
+
+    def step(self, delta_time: float):
+        player = self.player
+
+        # Actualizar el jugador
+        steering_player = self.player_behavior.get_steering()
+        player.update(steering_player, delta_time)
+
+        # Limitar la velocidad máxima del jugador
+        if player.velocity.length() > player.max_speed:
+            player.velocity = player.velocity.normalize() * player.max_speed
+
+        # Aplicar fricción al jugador (proporcional al paso, como en update)
+        player.velocity *= player.drag ** (delta_time / DRAG_TIME_STEP)
+
+        # Mantener al jugador dentro de los límites de la pantalla (toroidal)
+        player.position.x = player.position.x % self.width
+        player.position.y = player.position.y % self.height
+
+        # Reconstruir la rejilla con las posiciones de este tick
+        self.grid.rebuild([(target.position.x, target.position.y)
+                          for target in self.all_targets])
+
+        for agent in self.agents:
+            character = agent.character
+            # Aplicar Velocity Matching y Separation combinados
+            steering = agent.steer('move')
+            character.update(steering, delta_time)
+
+            # Limitar la velocidad máxima
+            if character.velocity.length() > character.max_speed:
+                character.velocity = character.velocity.normalize() * character.max_speed
+
+            # Aplicar fricción (proporcional al paso, como en update)
+            character.velocity *= character.drag ** (delta_time / DRAG_TIME_STEP)
+
+            # Aplicar Look Where You're Going al personaje para que mire hacia donde se dirige
+            steering_look = agent.steer('look')
+            character.update(steering_look, delta_time)
+
+            # Mantener al personaje dentro de los límites de la pantalla (toroidal)
+            character.position.x = character.position.x % self.width
+            character.position.y = character.position.y % self.height
+
+    def kinematics(self) -> list:
+        return [self.player] + self.characters
+
+    def colors(self) -> list:
+        # Dibujar jugador en un color diferente (verde)
+        return [(0, 255, 0)] + [YELLOW] * len(self.characters)
+
+
+class CollisionAvoidanceScenario(Scenario):
+    title = "Collision Avoidance"
+    description = "Ejecutando Collision Avoidance. 10 personajes aplican Dynamic Wander mientras se evitan entre ellos."
+
+    def __init__(self, count: int = 10):
+        super().__init__(count)
+        # Crear los personajes
+        self.population = KinematicPopulation(count)
+        for _ in range(count):
+            orientation = random.uniform(0, 2 * math.pi)
+            # Inicializar con una velocidad aleatoria
+            speed = random.uniform(50, 100)
+            direction = pygame.math.Vector2(
+                math.cos(orientation), -math.sin(orientation))
+            self.population.spawn(
+                1,
+                position=random_position(self.width, self.height),
+                orientation=orientation,
+                velocity=direction * speed,
+                max_speed=200.0,
+                max_acceleration=100.0,
+                max_rotation=math.pi,
+                max_angular_acceleration=math.pi,
+                drag=0.98  # Aplicar fricción
+            )
+
+        # Comportamientos para todos los personajes a la vez
+        self.behavior_wander = BatchDynamicWander(
+            self.population,
+            wander_offset=50.0,
+            wander_radius=30.0,
+            wander_rate=math.pi / 4,
+            target_radius=0.01,
+            slow_radius=math.pi / 4,
+            rng=numpy_rng()
+        )
+        self.grid = SpatialHashGrid(100.0, self.width, self.height)
+        self.behavior_ca = BatchCollisionAvoidance(
+            self.population, self.grid, radius=50.0, time_horizon=2.0)
+        # Suma de ambos (el angular solo viene de wander)
+        self.behavior = BatchBlendedSteering(
+            self.population, [(self.behavior_wander, 1.0), (self.behavior_ca, 1.0)])
+        self.executor = SteeringExecutor()
+
+    def state(self):
+        population = self.population
+        return population.position.copy(), population.orientation.copy(), population.velocity.copy()
+
+    def step(self, delta_time: float):
+        population = self.population
+
+        # Aplicar Dynamic Wander y Collision Avoidance para evitar colisiones
+        self.grid.rebuild(population.position)
+        linear, angular = self.executor.get_steering(self.behavior)
+        population.update(linear, angular, delta_time)
+
+        # Aplicar fricción (proporcional al paso, como en update)
+        velocity = population.velocity
+        velocity *= (population.drag ** (delta_time / DRAG_TIME_STEP))[:, None]
+
+        # Mantener a los personajes dentro de los límites de la pantalla (toroidal)
+        population.wrap(self.width, self.height)
+
+    def spatial_index(self) -> SpatialHashGrid:
+        return self.grid
+
+    def close(self):
+        self.executor.close()
+
+
+class ObstacleAvoidanceScenario(Scenario):
+    title = "Obstacle and Wall Avoidance"
+    description = "Ejecutando Obstacle and Wall Avoidance. Un personaje se mueve evitando obstáculos y paredes."
+
+    def __init__(self, count: int = 1, num_obstacles: int = 5):
+        super().__init__(count)
+        # Definir obstáculos (círculos) con su índice espacial
+        centers = [(random.uniform(100, self.width - 100), random.uniform(100, self.height - 100))
+                   for _ in range(num_obstacles)]
+        self.obstacles = ObstacleSet(centers, 30, self.width, self.height)
+
+        # Paredes en el borde del área
+        margin = 10
+        self.walls = WallSet.from_points(
+            [(margin, margin), (self.width - margin, margin),
+             (self.width - margin, self.height - margin), (margin, self.height - margin)],
+            self.width, self.height)
+
+        # Configurar personajes
+        self.characters: list[Kinematic] = []
+        for _ in range(count):
+            character = Kinematic()
+            character.position = pygame.math.Vector2(random.uniform(
+                50, self.width - 50), random.uniform(50, self.height - 50))
+            character.orientation = random.uniform(0, 2 * math.pi)
+            character.velocity = pygame.math.Vector2(
+                100 * math.cos(character.orientation), -100 * math.sin(character.orientation))
+            character.max_speed = 200.0
+            character.max_acceleration = 100.0
+            self.characters.append(character)
+
+        # Wall Avoidance tiene prioridad sobre Obstacle Avoidance
+        self.agents = AgentRegistry()
+        for character in self.characters:
+            self.agents.add(character)
+        self.agents.bind_all('avoid', lambda character: PrioritySteering([
+            WallAvoidance(character, self.walls, avoid_distance=60.0,
+                          lookahead=100.0, max_acceleration=character.max_acceleration),
+            ObstacleAvoidance(character, self.obstacles, avoid_distance=50.0,
+                              lookahead=50.0, max_acceleration=character.max_acceleration),
+        ]))
+
+    def step(self, delta_time: float):
+        for agent in self.agents:
+            character = agent.character
+            # Aplicar Wall Avoidance y Obstacle Avoidance
+            steering = agent.steer('avoid')
+
+            # Si no hay steering, seguir adelante
+            if steering.linear.length() == 0:
+                steering.linear = character.velocity.normalize() * character.max_acceleration
+
+            character.update(steering, delta_time)
+
+            # Limitar la velocidad máxima
+            if character.velocity.length() > character.max_speed:
+                character.velocity = character.velocity.normalize() * character.max_speed
+
+            # Si aun así sale del área, reflejarlo (reflexión simple)
+            if character.position.x < 0 or character.position.x > self.width:
+                character.velocity.x = -character.velocity.x
+                character.position.x = max(
+                    0, min(character.position.x, self.width))
+            if character.position.y < 0 or character.position.y > self.height:
+                character.velocity.y = -character.velocity.y
+                character.position.y = max(
+                    0, min(character.position.y, self.height))
+
+    def draw_static(self, surface, camera=None):
+        surface.fill(BLACK)
+        # Dibujar obstáculos
+        draw_obstacles(surface, self.obstacles, camera)
+        # Dibujar paredes
+        draw_walls(surface, self.walls, camera)
+
+
+class ShardedCrowdScenario(Scenario):
+    title = "Multitud en varios procesos"
+    description = "Ejecutando una multitud con Dynamic Wander, Separation y Collision Avoidance repartida entre varios procesos."
+
+    # Personajes mínimos por proceso: con menos, repartir no compensa
+    AGENTS_PER_SHARD = 2000
+
+    def __init__(self, count: int = 2000, shards: int = None):
+        super().__init__(count)
+        if shards is None:
+            shards = max(1, min(os.cpu_count() or 1, count // self.AGENTS_PER_SHARD))
+        orientation = np.array([random.uniform(0, 2 * math.pi) for _ in range(count)])
+        speed = np.array([random.uniform(50, 100) for _ in range(count)])
+        self.simulation = ShardedSimulation(
+            count, self.width, self.height, shards=shards, seed=random.getrandbits(64),
+            position=np.column_stack((
+                [random.uniform(0, self.width) for _ in range(count)],
+                [random.uniform(0, self.height) for _ in range(count)])),
+            orientation=orientation,
+            velocity=np.column_stack((np.cos(orientation), -np.sin(orientation))) * speed[:, None])
+
+    def state(self):
+        simulation = self.simulation
+        return simulation.position.copy(), simulation.orientation.copy(), simulation.velocity.copy()
+
+    def step(self, delta_time: float):
+        self.simulation.step(delta_time)
+
+    def close(self):
+        self.simulation.close()
+
+
+# Escenarios en el orden del menú principal, por nombre corto
+SCENARIOS = {
+    'kinematic_arrive': KinematicArriveScenario,
+    'kinematic_flee': KinematicFleeScenario,
+    'kinematic_wander': KinematicWanderScenario,
+    'dynamic_seek': DynamicSeekScenario,
+    'dynamic_flee': DynamicFleeScenario,
+    'dynamic_arrive': DynamicArriveScenario,
+    'align': AlignScenario,
+    'velocity_matching': VelocityMatchingScenario,
+    'face': FaceScenario,
+    'pursue_and_evade': PursueAndEvadeScenario,
+    'dynamic_wander': DynamicWanderScenario,
+    'path_following': PathFollowingScenario,
+    'separation': SeparationScenario,
+    'collision_avoidance': CollisionAvoidanceScenario,
+    'obstacle_avoidance': ObstacleAvoidanceScenario,
+    'sharded_crowd': ShardedCrowdScenario,
+}
@@ -0,0 +1,423 @@
+# scenes.py
+
+import json
+import math
+import os
+import random
+import numpy as np
+from characters import KinematicPopulation
+from algorithms import (BatchBlendedSteering, BatchCollisionAvoidance, BatchDynamicArrive, BatchDynamicSeek,
+                        BatchDistanceFieldAvoidance, BatchDynamicWander, BatchKinematicWander,
+                        BatchLookWhereYouAreGoing, BatchObstacleAvoidance, BatchPathFollowing, BatchPrioritySteering, BatchSeparation,
+                        BatchWallAvoidance)
+from distance_field import DistanceField
+from drawing import Path
+from lod import SimulationLOD
+from scheduler import AIScheduler
+from obstacles import ObstacleSet, WallSet
+from scenarios import Scenario, draw_obstacles, draw_path, draw_walls, numpy_rng
+from spatial import SpatialHashGrid
+from utils import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK, YELLOW
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: solo JSON
+    tomllib = None
+
+# Escenas descritas en archivos JSON o TOML en lugar de código: arquetipos de
+# personajes (parámetros, color y comportamientos), oleadas de aparición,
+# obstáculos, paredes y caminos. Todos los personajes viven en una sola
+# KinematicPopulation y cada arquetipo evalúa sus comportamientos Batch* sobre
+# sus índices. Las oleadas agregan personajes de a bloques en varios ticks,
+# así una escena de cien mil personajes no congela el arranque.
+#
+# Ejemplo mínimo (JSON):
+#
+#   {"title": "Multitud",
+#    "archetypes": {"walker": {"color": [255, 255, 0], "max_speed": 120,
+#                              "behaviors": [{"type": "wander"},
+#                                            {"type": "separation", "threshold": 15}]}},
+#    "spawns": [{"archetype": "walker", "count": 100000, "per_tick": 5000}]}
+#
+# Con una sección "lod" los personajes lejos del mouse y del centro de la
+# cámara se simulan con menos detalle (ver lod.py):
+#
+#   "lod": {"near_radius": 600, "far_radius": 1500, "mid_interval": 4,
+#           "hysteresis": 50, "blend_time": 0.5, "far_rotation": 1.5}
+#
+# Cada comportamiento puede tener su propia frecuencia en Hz ("rate": 10;
+# entre evaluaciones se mantiene el último resultado) y "ai_budget_ms" fija
+# cuánto tiempo de IA se permite por tick (ver scheduler.py).
+#
+# "distance_field_avoidance" esquiva obstáculos, paredes y (sin wrap) los
+# bordes del mundo con una sola consulta a un campo de distancia
+# (distance_field.py) que se calcula una vez al cargar la escena; el lado de
+# sus celdas se fija con "distance_field_resolution" (4 píxeles por defecto).
+#
+# Ver scene_files/ para ejemplos completos.
+
+# Parámetros de KinematicPopulation.spawn que puede fijar un arquetipo
+ARCHETYPE_PARAMETERS = ('max_speed', 'max_rotation', 'max_acceleration', 'max_angular_acceleration', 'drag')
+
+# Valores por defecto de cada tipo de comportamiento (los nombres son los
+# argumentos de la clase Batch* correspondiente)
+BEHAVIOR_DEFAULTS = {
+    'seek': {'target': 'pointer'},
+    'arrive': {'target': 'pointer', 'target_radius': 5.0, 'slow_radius': 100.0, 'time_to_target': 0.1},
+    'wander': {'wander_offset': 50.0, 'wander_radius': 30.0, 'wander_rate': math.pi / 4,
+               'target_radius': 0.01, 'slow_radius': math.pi / 4},
+    'look_where_you_are_going': {'target_radius': 0.01, 'slow_radius': math.pi / 4},
+    'separation': {'threshold': 20.0, 'decay_coefficient': 1000.0},
+    'collision_avoidance': {'radius': 10.0, 'time_horizon': 0.5},
+    'obstacle_avoidance': {'avoid_distance': 50.0, 'lookahead': 50.0},
+    'wall_avoidance': {'avoid_distance': 60.0, 'lookahead': 100.0},
+    'distance_field_avoidance': {'avoid_distance': 30.0, 'lookahead': 50.0},
+    'path_following': {'path_offset': 30.0},
+}
+
+
+def load_scene_data(path: str) -> dict:
+    # Lee un archivo .json o .toml
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.toml':
+        if tomllib is None:
+            raise ValueError("Leer escenas TOML requiere Python 3.11 o posterior")
+        with open(path, 'rb') as file:
+            return tomllib.load(file)
+    if extension == '.json':
+        with open(path) as file:
+            return json.load(file)
+    raise ValueError(f"Formato de escena desconocido: {path} (se esperaba .json o .toml)")
+
+
+def is_scene_file(name: str) -> bool:
+    return os.path.splitext(name)[1].lower() in ('.json', '.toml')
+
+
+def circle_points(center, radius: float, segments: int = 32) -> list:
+    angles = np.linspace(0, 2 * math.pi, segments, endpoint=False)
+    return [(center[0] + radius * math.cos(angle), center[1] + radius * math.sin(angle)) for angle in angles]
+
+
+class Wave:
+    # Una entrada de "spawns": count personajes de un arquetipo que aparecen
+    # desde start segundos, per_tick por tick (todos juntos si no se indica)
+    def __init__(self, spec: dict, archetypes: dict, width: float, height: float, count_scale: float = 1.0):
+        self.archetype: str = spec['archetype']
+        if self.archetype not in archetypes:
+            raise ValueError(f"Arquetipo desconocido en spawns: {self.archetype}")
+        self.remaining: int = max(0, round(spec.get('count', 1) * count_scale))
+        self.start: float = spec.get('start', 0.0)
+        self.per_tick: int = spec.get('per_tick', self.remaining) or 1
+        # Zona de aparición: area [x0, y0, x1, y1] o position [x, y] con
+        # spread (por defecto todo el mundo)
+        if 'position' in spec:
+            x, y = spec['position']
+            spread = spec.get('spread', 0.0)
+            self.area: tuple = (x - spread, y - spread, x + spread, y + spread)
+        else:
+            self.area: tuple = tuple(spec.get('area', (0, 0, width, height)))
+        speed = spec.get('speed', 0.0)
+        self.speed: tuple = tuple(speed) if isinstance(speed, (list, tuple)) else (speed, speed)
+        # Orientación fija en radianes o "random"
+        self.orientation = spec.get('orientation', 'random')
+
+    def take(self, elapsed: float) -> int:
+        # Cuántos personajes aparecen en este tick
+        if self.remaining == 0 or elapsed < self.start:
+            return 0
+        count = min(self.per_tick, self.remaining)
+        self.remaining -= count
+        return count
+
+
+class DataScenario(Scenario):
+    def __init__(self, data: dict, count: int = None):
+        # count (opcional) reemplaza el total de personajes de la escena,
+        # repartido entre las oleadas en la misma proporción
+        total = sum(spec.get('count', 1) for spec in data.get('spawns', []))
+        super().__init__(count if count is not None else total)
+        self.title: str = data.get('title', "Escena")
+        self.description: str = data.get('description', f"Ejecutando la escena {self.title}.")
+        self.width: float = data.get('width', SCREEN_WIDTH)
+        self.height: float = data.get('height', SCREEN_HEIGHT)
+        # Mundo toroidal o con bordes (los personajes se quedan dentro)
+        self.wrap: bool = data.get('wrap', True)
+        if 'seed' in data:
+            random.seed(data['seed'])
+        self.rng: np.random.Generator = numpy_rng()
+        self.elapsed: float = 0.0
+        # Objetivo "pointer" de seek y arrive: sigue al mouse
+        self.target: np.ndarray = np.array([self.pointer.x, self.pointer.y])
+
+        self.obstacles: ObstacleSet = self._load_obstacles(data.get('obstacles', []))
+        self.walls: WallSet = self._load_walls(data.get('walls', {}))
+        self.paths: dict = {name: self._load_path(spec) for name, spec in data.get('paths', {}).items()}
+        # Se construye recién cuando algún arquetipo lo usa (ver _distance_field)
+        self.distance_field: DistanceField = None
+        self.distance_field_resolution: float = data.get('distance_field_resolution', 4.0)
+
+        self.population = KinematicPopulation(max(1, self.count))
+        self.grid = SpatialHashGrid(data.get('cell_size', 50.0), self.width, self.height)
+        self.uses_grid: bool = False
+        # Frecuencia de cada comportamiento y presupuesto de IA por tick
+        self.scheduler: AIScheduler = AIScheduler(self.population, data.get('ai_budget_ms'))
+
+        # Arquetipos: parámetros, color, comportamiento e índices de sus personajes
+        self.archetypes: dict = {}
+        for name, spec in data.get('archetypes', {}).items():
+            self.archetypes[name] = {
+                'parameters': {key: spec[key] for key in ARCHETYPE_PARAMETERS if key in spec},
+                'color': tuple(spec.get('color', YELLOW)),
+                'behavior': self._build_steering(name, spec),
+                'indices': np.zeros(0, dtype=np.intp),
+            }
+        scale = self.count / total if total > 0 else 0.0
+        self.waves: list[Wave] = [Wave(spec, self.archetypes, self.width, self.height, scale)
+                                 for spec in data.get('spawns', [])]
+        self._colors: list = []
+        # Número (en el orden de archetypes) del arquetipo de cada personaje
+        self.owner: np.ndarray = np.zeros(0, dtype=np.intp)
+        self.lod: SimulationLOD = self._load_lod(data.get('lod'))
+
+    @classmethod
+    def from_file(cls, path: str, count: int = None) -> "DataScenario":
+        return cls(load_scene_data(path), count)
+
+    def _load_lod(self, spec: dict) -> SimulationLOD:
+        if spec is None:
+            return None
+        spec = dict(spec)
+        far_behavior = BatchKinematicWander(self.population, spec.pop('far_rotation', math.pi / 2), rng=self.rng)
+        try:
+            return SimulationLOD(self.population, far_behavior,
+                                 world_size=(self.width, self.height) if self.wrap else None, **spec)
+        except TypeError as error:
+            raise ValueError(f"Parámetros inválidos para lod: {error}") from error
+
+    def _load_obstacles(self, specs) -> ObstacleSet:
+        # Lista de {"position": [x, y], "radius": r} y/o {"random": n, "radius": r o [min, max]}
+        centers, radii = [], []
+        for spec in specs:
+            radius = spec.get('radius', 30.0)
+            if 'random' in spec:
+                for _ in range(spec['random']):
+                    r = random.uniform(*radius) if isinstance(radius, (list, tuple)) else radius
+                    centers.append((random.uniform(r, self.width - r), random.uniform(r, self.height - r)))
+                    radii.append(r)
+            else:
+                centers.append(tuple(spec['position']))
+                radii.append(radius)
+        if not centers:
+            return None
+        return ObstacleSet(centers, radii, self.width, self.height)
+
+    def _load_walls(self, spec) -> WallSet:
+        # {"border": margen} y/o {"lines": [{"points": [...], "closed": false}, ...]}
+        starts, ends = [], []
+        if 'border' in spec:
+            margin = spec['border']
+            lines = [{'points': [(margin, margin), (self.width - margin, margin),
+                                 (self.width - margin, self.height - margin), (margin, self.height - margin)],
+                      'closed': True}]
+        else:
+            lines = []
+        for line in lines + list(spec.get('lines', [])):
+            walls = WallSet.from_points(line['points'], self.width, self.height, line.get('closed', False))
+            starts.extend(walls.starts.tolist())
+            ends.extend(walls.ends.tolist())
+        if not starts:
+            return None
+        return WallSet(starts, ends, self.width, self.height)
+
+    @staticmethod
+    def _load_path(spec: dict) -> Path:
+        # {"points": [...], "closed": true} o {"circle": {"center": [x, y], "radius": r, "segments": n}}
+        if 'circle' in spec:
+            circle = spec['circle']
+            return Path(circle_points(circle['center'], circle['radius'], circle.get('segments', 32)), closed=True)
+        return Path(spec['points'], closed=spec.get('closed', True))
+
+    def _build_behavior(self, archetype: str, spec: dict):
+        spec = dict(spec)
+        kind = spec.pop('type')
+        spec.pop('weight', None)
+        spec.pop('rate', None)
+        if kind not in BEHAVIOR_DEFAULTS:
+            raise ValueError(f"Comportamiento desconocido en el arquetipo {archetype}: {kind}")
+        parameters = {**BEHAVIOR_DEFAULTS[kind], **spec}
+        population = self.population
+        try:
+            if kind in ('seek', 'arrive'):
+                target = parameters.pop('target')
+                target = self.target if target == 'pointer' else np.asarray(target, dtype=float)
+                if kind == 'seek':
+                    return BatchDynamicSeek(population, target, **parameters)
+                return BatchDynamicArrive(population, target, **parameters)
+            if kind == 'wander':
+                return BatchDynamicWander(population, rng=self.rng, **parameters)
+            if kind == 'look_where_you_are_going':
+                return BatchLookWhereYouAreGoing(population, **parameters)
+            if kind in ('separation', 'collision_avoidance'):
+                self.uses_grid = True
+                if kind == 'separation':
+                    return BatchSeparation(population, self.grid, **parameters)
+                return BatchCollisionAvoidance(population, self.grid, **parameters)
+            if kind == 'obstacle_avoidance':
+                if self.obstacles is None:
+                    raise ValueError("obstacle_avoidance requiere obstáculos en la escena")
+                return BatchObstacleAvoidance(population, self.obstacles, **parameters)
+            if kind == 'wall_avoidance':
+                if self.walls is None:
+                    raise ValueError("wall_avoidance requiere paredes en la escena")
+                return BatchWallAvoidance(population, self.walls, **parameters)
+            if kind == 'distance_field_avoidance':
+                return BatchDistanceFieldAvoidance(population, self._distance_field(), **parameters)
+            path = parameters.pop('path')
+            if path not in self.paths:
+                raise ValueError(f"Camino desconocido: {path}")
+            return BatchPathFollowing(population, self.paths[path], **parameters)
+        except TypeError as error:
+            raise ValueError(f"Parámetros inválidos para {kind} en el arquetipo {archetype}: {error}") from error
+
+    def _distance_field(self) -> DistanceField:
+        # Un solo campo para todos los arquetipos que lo usan
+        if self.distance_field is None:
+            if self.obstacles is None and self.walls is None and self.wrap:
+                raise ValueError("distance_field_avoidance requiere obstáculos, paredes o un mundo sin wrap")
+            self.distance_field = DistanceField(self.width, self.height, self.distance_field_resolution,
+                                                self.obstacles, self.walls, solid_border=not self.wrap)
+        return self.distance_field
+
+    def _blend(self, archetype: str, specs: list) -> BatchBlendedSteering:
+        return BatchBlendedSteering(self.population, [
+            (self._schedule(self._build_behavior(archetype, spec), spec.get('rate')), spec.get('weight', 1.0))
+            for spec in specs])
+
+    def _schedule(self, behavior, rate: float):
+        # Sin frecuencia propia ni presupuesto no hace falta pasar por el planificador
+        if rate is None and self.scheduler.budget_ms is None:
+            return behavior
+        return self.scheduler.schedule(behavior, rate)
+
+    def _build_steering(self, archetype: str, spec: dict):
+        # "behaviors": una lista que se mezcla con pesos; "priority": lista
+        # de grupos (cada uno una lista mezclada) de mayor a menor prioridad
+        if 'priority' in spec:
+            return BatchPrioritySteering(self.population, [self._blend(archetype, group)
+                                                           for group in spec['priority']],
+                                         spec.get('epsilon', 0.01))
+        return self._blend(archetype, spec.get('behaviors', []))
+
+    def spawn_waves(self):
+        # Agrega los personajes de las oleadas que tocan en este tick
+        for wave in self.waves:
+            count = wave.take(self.elapsed)
+            if count == 0:
+                continue
+            archetype = self.archetypes[wave.archetype]
+            x0, y0, x1, y1 = wave.area
+            position = self.rng.uniform((x0, y0), (x1, y1), (count, 2))
+            if wave.orientation == 'random':
+                orientation = self.rng.uniform(-math.pi, math.pi, count)
+            else:
+                orientation = np.full(count, float(wave.orientation))
+            speed = self.rng.uniform(wave.speed[0], wave.speed[1], count)
+            velocity = np.column_stack((np.cos(orientation), -np.sin(orientation))) * speed[:, None]
+            new = self.population.spawn(count, position=position, orientation=orientation, velocity=velocity,
+                                        **archetype['parameters'])
+            archetype['indices'] = np.concatenate((archetype['indices'], np.arange(new.start, new.stop)))
+            number = list(self.archetypes).index(wave.archetype)
+            self.owner = np.concatenate((self.owner, np.full(count, number, dtype=np.intp)))
+            self._colors.extend([archetype['color']] * count)
+
+    def steer(self, indices: np.ndarray):
+        # Steering de los personajes indices con los comportamientos de su arquetipo
+        linear = np.zeros((len(indices), 2))
+        angular = np.zeros(len(indices))
+        owner = self.owner[indices]
+        for number, archetype in enumerate(self.archetypes.values()):
+            chosen = np.flatnonzero(owner == number)
+            if len(chosen):
+                linear[chosen], angular[chosen] = archetype['behavior'].get_steering(indices[chosen])
+        return linear, angular
+
+    def focus(self) -> list:
+        # Puntos que importan para el nivel de detalle: el mouse y el centro de la cámara
+        points = [self.target]
+        if self.view_center is not None:
+            points.append(self.view_center)
+        return points
+
+    def state(self):
+        population = self.population
+        return population.position.copy(), population.orientation.copy(), population.velocity.copy()
+
+    def colors(self) -> list:
+        return self._colors
+
+    def max_agents(self) -> int:
+        return len(self.population) + sum(wave.remaining for wave in self.waves)
+
+    def step(self, delta_time: float):
+        self.target[:] = (self.pointer.x, self.pointer.y)
+        self.spawn_waves()
+        self.elapsed += delta_time
+        population = self.population
+        if len(population) == 0:
+            return
+
+        self.scheduler.begin_tick(delta_time)
+        if self.lod is not None:
+            self.lod.classify(self.focus())
+            if self.uses_grid:
+                # Los lejanos no buscan vecinos, así que tampoco entran en la
+                # rejilla (los de nivel medio no ven a los lejanos de al lado)
+                self.grid.rebuild(population.position, self.lod.simulated)
+            self.lod.advance(self.steer, delta_time)
+        else:
+            if self.uses_grid:
+                self.grid.rebuild(population.position)
+            linear = np.zeros((len(population), 2))
+            angular = np.zeros(len(population))
+            for archetype in self.archetypes.values():
+                indices = archetype['indices']
+                if len(indices):
+                    linear[indices], angular[indices] = archetype['behavior'].get_steering(indices)
+            population.update(linear, angular, delta_time)
+
+        if self.wrap:
+            population.wrap(self.width, self.height)
+        else:
+            # Rebotar en los bordes, como en Obstacle Avoidance
+            position = population.position
+            velocity = population.velocity
+            for axis, limit in ((0, self.width), (1, self.height)):
+                outside = (position[:, axis] < 0) | (position[:, axis] > limit)
+                velocity[outside, axis] *= -1
+                np.clip(position[:, axis], 0, limit, out=position[:, axis])
+
+    def spatial_index(self) -> SpatialHashGrid:
+        # La rejilla solo está al día si algún comportamiento la usa
+        return self.grid if self.uses_grid else None
+
+    def candidates(self, rect: tuple) -> np.ndarray:
+        indices = super().candidates(rect)
+        if indices is None or self.lod is None:
+            return indices
+        # Con niveles de detalle los lejanos no están en la rejilla
+        far = self.lod.far
+        min_x, min_y, max_x, max_y = rect
+        position = self.population.position[far]
+        inside = ((position[:, 0] >= min_x) & (position[:, 0] <= max_x) &
+                  (position[:, 1] >= min_y) & (position[:, 1] <= max_y))
+        return np.concatenate((indices, far[inside]))
+
+    def draw_static(self, surface, camera=None):
+        surface.fill(BLACK)
+        if self.obstacles is not None:
+            draw_obstacles(surface, self.obstacles, camera)
+        if self.walls is not None:
+            draw_walls(surface, self.walls, camera)
+        for path in self.paths.values():
+            draw_path(surface, path, camera)
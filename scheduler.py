@@ -0,0 +1,196 @@
+# scheduler.py
+
+import math
+import time
+import numpy as np
+from characters import KinematicPopulation
+from algorithms import prepare_behaviors
+
+# Planificador de la IA por lotes. Cada comportamiento Batch* se envuelve
+# en un ScheduledSteering con su propia frecuencia: los caros (Collision
+# Avoidance, Obstacle Avoidance) pueden evaluarse a 10-20 Hz y entre medio
+# cada personaje mantiene su último resultado, mientras que los baratos
+# (Align, Look Where You're Going) corren en cada tick. Los personajes que
+# tocan se reparten entre ticks (no todos en el mismo) y se atienden
+# primero los que llevan más tiempo sin actualizarse, una especie de
+# round-robin.
+#
+# Además el planificador puede tener un presupuesto en milisegundos por
+# tick. Lo que queda se reparte en partes iguales entre los comportamientos
+# con frecuencia propia que todavía no corrieron en el tick, y cada uno
+# atiende a tantos personajes como entren en su parte (como mínimo
+# min_agents) según su modelo de costo; el resto espera al
+# tick siguiente. Así la IA se degrada (resultados más viejos) en lugar de
+# alargar el cuadro. Los comportamientos de cada tick no se recortan, pero
+# su tiempo cuenta y se les reserva lo que tardaron en el tick anterior.
+
+# Tick en el que un personaje nunca fue evaluado
+NEVER = np.iinfo(np.int64).min // 2
+
+
+class AIScheduler:
+    def __init__(self, population: KinematicPopulation, budget_ms: float = None, min_agents: int = 16):
+        # budget_ms: tiempo de IA por tick (None = sin límite)
+        # min_agents: personajes que cada comportamiento atiende aunque no
+        # quede presupuesto, para que ninguno se quede sin actualizar
+        self.population: KinematicPopulation = population
+        self.budget_ms: float = budget_ms
+        self.min_agents: int = min_agents
+        self.behaviors: list[ScheduledSteering] = []
+        self.tick: int = 0
+        self.delta_time: float = 1 / 60
+        self.deadline: int = None
+        # Tiempo de IA gastado en el tick actual (ns)
+        self.spent: int = 0
+
+    def schedule(self, behavior, rate: float = None) -> "ScheduledSteering":
+        # Envuelve un comportamiento Batch*; rate en Hz (None = cada tick)
+        scheduled = ScheduledSteering(self, behavior, rate)
+        self.behaviors.append(scheduled)
+        return scheduled
+
+    def begin_tick(self, delta_time: float):
+        # Se llama al principio de cada paso de simulación
+        self.tick += 1
+        self.delta_time = delta_time
+        self.spent = 0
+        if self.budget_ms is not None:
+            self.deadline = time.perf_counter_ns() + int(self.budget_ms * 1e6)
+
+    def remaining_ns(self) -> float:
+        # Tiempo que queda en el tick (infinito sin presupuesto)
+        if self.deadline is None:
+            return math.inf
+        return self.deadline - time.perf_counter_ns()
+
+    def share_ns(self, behavior: "ScheduledSteering") -> float:
+        # Parte del presupuesto que le toca a behavior en este tick. Se
+        # supone que corren los mismos comportamientos que en el tick anterior.
+        remaining = self.remaining_ns()
+        if math.isinf(remaining):
+            return remaining
+        waiting = 1
+        for other in self.behaviors:
+            if other is behavior or other.ran != self.tick - 1:
+                continue
+            if other.rate is None:
+                remaining -= other.elapsed
+            else:
+                waiting += 1
+        return remaining / waiting
+
+    def summary(self) -> list:
+        # Una fila por comportamiento: nombre, frecuencia, personajes
+        # evaluados en el último tick, atrasados y ticks con presupuesto agotado
+        return [(type(scheduled.behavior).__name__, scheduled.rate, scheduled.computed,
+                 scheduled.overdue, scheduled.starved) for scheduled in self.behaviors]
+
+
+class ScheduledSteering:
+    # Se usa como cualquier comportamiento Batch*: get_steering(indices)
+    def __init__(self, scheduler: AIScheduler, behavior, rate: float = None):
+        self.scheduler: AIScheduler = scheduler
+        self.behavior = behavior
+        self.rate: float = rate
+        # Último resultado de cada personaje y el tick en que se calculó
+        self.linear: np.ndarray = np.zeros((0, 2))
+        self.angular: np.ndarray = np.zeros(0)
+        self.updated: np.ndarray = np.zeros(0, dtype=np.int64)
+        # Medias móviles de (n, t, n², n·t) con n personajes evaluados en t ns,
+        # para estimar el costo como fijo + por personaje (ver cost)
+        self.moments: tuple = None
+        # Último tick en que se llamó y lo que tardó (ns)
+        self.ran: int = None
+        self.elapsed: int = 0
+        # Estadísticas del último tick
+        self.computed: int = 0
+        self.overdue: int = 0
+        self.starved: int = 0
+
+    def _sync_size(self):
+        # La población puede crecer después de crear el comportamiento
+        missing = len(self.scheduler.population) - len(self.updated)
+        if missing > 0:
+            self.linear = np.concatenate((self.linear, np.zeros((missing, 2))))
+            self.angular = np.concatenate((self.angular, np.zeros(missing)))
+            self.updated = np.concatenate((self.updated, np.full(missing, NEVER, dtype=np.int64)))
+
+    def prepare(self, count: int = None):
+        # Crece antes de repartir entre hilos y reenvía prepare al
+        # comportamiento envuelto (ver SteeringExecutor.get_steering)
+        if count is not None:
+            self._sync_size()
+        prepare_behaviors([self.behavior], count)
+
+    def period(self) -> int:
+        # Ticks entre dos evaluaciones de un mismo personaje
+        if self.rate is None:
+            return 1
+        return max(1, round(1.0 / (self.rate * self.scheduler.delta_time)))
+
+    def _evaluate(self, chosen: np.ndarray):
+        start = time.perf_counter_ns()
+        self.linear[chosen], self.angular[chosen] = self.behavior.get_steering(chosen)
+        elapsed = time.perf_counter_ns() - start
+        self.elapsed = elapsed
+        self.scheduler.spent += elapsed
+        if len(chosen):
+            count = len(chosen)
+            sample = (count, elapsed, count * count, count * elapsed)
+            if self.moments is None:
+                self.moments = sample
+            else:
+                self.moments = tuple(0.8 * old + 0.2 * new for old, new in zip(self.moments, sample))
+
+    def cost(self) -> tuple:
+        # (costo fijo, costo por personaje) en ns por mínimos cuadrados. Si
+        # casi siempre se evaluó la misma cantidad no hay con qué separar
+        # el costo fijo y todo se atribuye a los personajes.
+        n, t, nn, nt = self.moments
+        variance = nn - n * n
+        if variance > 0.01 * n * n:
+            per_agent = (nt - n * t) / variance
+            if per_agent > 0:
+                return max(0.0, t - per_agent * n), per_agent
+        return 0.0, t / max(n, 1.0)
+
+    def get_steering(self, indices=None):
+        self._sync_size()
+        scheduler = self.scheduler
+        self.ran = scheduler.tick
+        selected = np.arange(len(scheduler.population))[slice(None) if indices is None else indices]
+        if self.rate is None:
+            # Cada tick, sin recortes
+            self._evaluate(selected)
+            self.updated[selected] = scheduler.tick
+            self.computed, self.overdue = len(selected), 0
+            return self.linear[selected], self.angular[selected]
+
+        period = self.period()
+        age = scheduler.tick - self.updated[selected]
+        due = selected[age >= period]
+        allowed = len(due)
+        if self.moments is not None and allowed:
+            fixed, per_agent = self.cost()
+            share = scheduler.share_ns(self)
+            if share < fixed + allowed * per_agent:
+                allowed = max(scheduler.min_agents, int(max(share - fixed, 0) / per_agent))
+        if allowed < len(due):
+            # Primero los que llevan más tiempo sin actualizarse
+            oldest = np.argpartition(self.updated[due], allowed)[:allowed]
+            chosen = due[np.sort(oldest)]
+            self.starved += 1
+        else:
+            chosen = due
+
+        self.elapsed = 0
+        if len(chosen):
+            self._evaluate(chosen)
+            first = self.updated[chosen] == NEVER
+            self.updated[chosen] = scheduler.tick
+            # La primera vez se reparte a los personajes entre los ticks del
+            # período, así después no se evalúan todos juntos
+            self.updated[chosen[first]] -= chosen[first] % period
+        self.computed = len(chosen)
+        self.overdue = len(due) - len(chosen)
+        return self.linear[selected], self.angular[selected]
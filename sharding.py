@@ -0,0 +1,287 @@
+# sharding.py
+
+import math
+import multiprocessing
+import os
+import numpy as np
+from multiprocessing import shared_memory
+from characters import KinematicPopulation
+from algorithms import BatchBlendedSteering, BatchCollisionAvoidance, BatchDynamicWander, BatchSeparation
+from spatial import SpatialHashGrid
+
+# Simulación de una multitud repartida entre varios procesos. El mundo
+# (toroidal) se divide en franjas verticales y cada proceso se encarga de los
+# personajes de su franja. El estado vive en memoria compartida con doble
+# búfer: en cada tick todos leen el búfer actual y cada proceso escribe en el
+# otro solo a sus propios personajes. Para que Separation y Collision
+# Avoidance vean a los vecinos del otro lado del borde, cada proceso también
+# lee (sin modificarlos) a los personajes de un halo alrededor de su franja.
+
+# Campos de cada búfer de estado y parámetros fijos de cada personaje
+STATE_FIELDS = {'position': 2, 'velocity': 2, 'orientation': 1, 'rotation': 1}
+PARAMETER_FIELDS = ('max_speed', 'max_rotation', 'max_acceleration', 'max_angular_acceleration', 'drag')
+
+
+class SharedArrays:
+    # Varios arreglos float64 dentro de un solo bloque de memoria compartida.
+    # layout es un diccionario nombre -> forma. Con name=None se crea el
+    # bloque; si no, se abre el bloque existente con ese nombre.
+    def __init__(self, layout: dict, name: str = None):
+        sizes = {key: math.prod(shape) * 8 for key, shape in layout.items()}
+        total = max(1, sum(sizes.values()))
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=total)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.layout: dict = layout
+        self.arrays: dict = {}
+        offset = 0
+        for key, shape in layout.items():
+            self.arrays[key] = np.ndarray(shape, dtype=np.float64, buffer=self.memory.buf, offset=offset)
+            offset += sizes[key]
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.arrays[key]
+
+    def close(self):
+        # Hay que soltar los arreglos antes de cerrar el bloque
+        self.arrays = {}
+        self.memory.close()
+
+    def unlink(self):
+        self.memory.unlink()
+
+
+def shared_layout(count: int) -> dict:
+    # Dos búferes de estado, la orientación del wander y los parámetros
+    layout = {}
+    for buffer in (0, 1):
+        for field, width in STATE_FIELDS.items():
+            layout[f'{field}{buffer}'] = (count, width) if width > 1 else (count,)
+    layout['wander_orientation'] = (count,)
+    for field in PARAMETER_FIELDS:
+        layout[field] = (count,)
+    return layout
+
+
+def shard_of(x: np.ndarray, shards: int, width: float) -> np.ndarray:
+    # Franja a la que pertenece cada coordenada x (todas los procesos usan la
+    # misma fórmula, así cada personaje tiene exactamente un dueño)
+    return np.minimum((x * (shards / width)).astype(np.intp), shards - 1) % shards
+
+
+class ShardWorker:
+    # Lo que corre dentro de cada proceso: arma una población local con sus
+    # personajes y los del halo, calcula el steering solo de los suyos y
+    # escribe el resultado en el otro búfer. La población, las rejillas y los
+    # comportamientos se crean una vez y se vuelven a llenar en cada tick.
+    def __init__(self, shard: int, shards: int, memory_name: str, count: int, config: dict):
+        self.shard: int = shard
+        self.shards: int = shards
+        self.shared: SharedArrays = SharedArrays(shared_layout(count), memory_name)
+        self.config: dict = config
+        self.width: float = config['width']
+        self.height: float = config['height']
+        self.strip: float = self.width / shards
+        self.rng: np.random.Generator = np.random.default_rng(
+            None if config['seed'] is None else (config['seed'], shard))
+
+        self.population: KinematicPopulation = KinematicPopulation(count)
+        # Una rejilla por comportamiento. Las de Separation son del tamaño de
+        # su radio. Las de Collision Avoidance son de un cuarto del mayor
+        # alcance posible: el radio de búsqueda depende de las velocidades de
+        # cada tick y suele quedar bastante por debajo del máximo, y con
+        # celdas tan chicas como las de Separation se recorrerían cientos de
+        # celdas vecinas.
+        self.separation_grid: SpatialHashGrid = SpatialHashGrid(
+            config['separation_threshold'], self.width, self.height)
+        max_reach = config['max_speed'] * config['time_horizon'] + config['collision_radius']
+        self.avoidance_grid: SpatialHashGrid = SpatialHashGrid(
+            max(config['separation_threshold'], max_reach / 4), self.width, self.height)
+        self.wander: BatchDynamicWander = BatchDynamicWander(
+            self.population, config['wander_offset'], config['wander_radius'], config['wander_rate'],
+            0.01, math.pi / 4, rng=self.rng)
+        self.avoidance: BatchCollisionAvoidance = BatchCollisionAvoidance(
+            self.population, self.avoidance_grid, config['collision_radius'], config['time_horizon'])
+        self.behavior: BatchBlendedSteering = BatchBlendedSteering(self.population, [
+            (self.wander, 1.0),
+            (BatchSeparation(self.population, self.separation_grid, config['separation_threshold'],
+                             config['decay_coefficient']), 1.0),
+            (self.avoidance, 1.0),
+        ])
+
+    def halo(self, own: np.ndarray, velocity: np.ndarray) -> float:
+        # Distancia más allá de la franja a la que un personaje ajeno todavía
+        # puede ser vecino de uno propio: el radio de Separation o la suma del
+        # mayor alcance de Collision Avoidance entre los propios y entre todos
+        # (ver BatchCollisionAvoidance.reach), con las velocidades de este tick
+        speed_sq = np.einsum('ij,ij->i', velocity, velocity)
+        time_horizon = self.config['time_horizon']
+        own_speed = math.sqrt(speed_sq[own].max(initial=0.0))
+        max_speed = math.sqrt(speed_sq.max(initial=0.0))
+        reach = (own_speed + max_speed) * time_horizon + 2 * self.config['collision_radius']
+        return max(self.config['separation_threshold'], reach)
+
+    def local_indices(self, x: np.ndarray, velocity: np.ndarray):
+        # Índices globales de los personajes propios y de los del halo
+        own = np.flatnonzero(shard_of(x, self.shards, self.width) == self.shard)
+        halo = self.halo(own, velocity)
+        # Distancia (toroidal) en x desde el inicio de la franja
+        offset = np.mod(x - self.shard * self.strip, self.width)
+        near = (offset < self.strip + halo) | (offset > self.width - halo)
+        near[own] = False
+        return own, np.flatnonzero(near)
+
+    def step(self, delta_time: float, parity: int):
+        shared = self.shared
+        config = self.config
+        read = {field: shared[f'{field}{parity}'] for field in STATE_FIELDS}
+        write = {field: shared[f'{field}{1 - parity}'] for field in STATE_FIELDS}
+        own, ghost = self.local_indices(read['position'][:, 0], read['velocity'])
+        local = np.concatenate((own, ghost))
+        own_count = len(own)
+
+        # Población local: primero los propios y después los del halo
+        population = self.population
+        population.clear()
+        population.spawn(len(local), position=read['position'][local], orientation=read['orientation'][local],
+                         velocity=read['velocity'][local],
+                         **{field: shared[field][local] for field in PARAMETER_FIELDS})
+        population.rotation[:] = read['rotation'][local]
+        self.separation_grid.rebuild(population.position)
+        self.avoidance_grid.rebuild(population.position)
+        self.wander.wander_orientation = shared['wander_orientation'][local]
+
+        # Steering solo de los propios; los del halo no se mueven aquí
+        own_local = slice(0, own_count)
+        linear = np.zeros((len(local), 2))
+        angular = np.zeros(len(local))
+        linear[own_local], angular[own_local] = self.behavior.get_steering(own_local)
+        shared['wander_orientation'][own] = self.wander.wander_orientation[:own_count]
+
+        population.update(linear, angular, delta_time)
+        population.wrap(self.width, self.height)
+        for field in STATE_FIELDS:
+            write[field][own] = getattr(population, field)[:own_count]
+
+    def close(self):
+        self.shared.close()
+
+
+def worker_main(connection, shard: int, shards: int, memory_name: str, count: int, config: dict):
+    # Bucle de cada proceso: espera ('step', delta_time, parity) y responde
+    # cuando terminó; None indica que hay que salir
+    worker = ShardWorker(shard, shards, memory_name, count, config)
+    try:
+        while True:
+            message = connection.recv()
+            if message is None:
+                break
+            _, delta_time, parity = message
+            worker.step(delta_time, parity)
+            connection.send(True)
+    finally:
+        worker.close()
+        connection.close()
+
+
+class ShardedSimulation:
+    # Multitud con Dynamic Wander, Separation y Collision Avoidance repartida
+    # entre shards procesos
+    def __init__(self, count: int, width: float, height: float, shards: int = None, seed: int = None,
+                 position: np.ndarray = None, orientation: np.ndarray = None, velocity: np.ndarray = None,
+                 max_speed: float = 200.0, max_acceleration: float = 100.0, max_rotation: float = math.pi,
+                 max_angular_acceleration: float = math.pi, drag: float = 0.98,
+                 wander_offset: float = 50.0, wander_radius: float = 30.0, wander_rate: float = math.pi / 4,
+                 separation_threshold: float = 20.0, decay_coefficient: float = 1000.0,
+                 collision_radius: float = 10.0, time_horizon: float = 0.5):
+        self.count: int = count
+        self.width: float = width
+        self.height: float = height
+        self.shards: int = shards if shards is not None else os.cpu_count() or 1
+        # Cada proceso calcula su halo en cada tick (ver ShardWorker.halo)
+        self.config: dict = {
+            'width': width, 'height': height, 'seed': seed, 'max_speed': max_speed,
+            'wander_offset': wander_offset, 'wander_radius': wander_radius, 'wander_rate': wander_rate,
+            'separation_threshold': separation_threshold, 'decay_coefficient': decay_coefficient,
+            'collision_radius': collision_radius, 'time_horizon': time_horizon,
+        }
+
+        self.shared: SharedArrays = SharedArrays(shared_layout(count))
+        self.parity: int = 0
+        rng = np.random.default_rng(seed)
+        self.shared['position0'][:] = position if position is not None else \
+            rng.uniform(0, 1, (count, 2)) * (width, height)
+        self.shared['orientation0'][:] = orientation if orientation is not None else \
+            rng.uniform(-math.pi, math.pi, count)
+        self.shared['velocity0'][:] = velocity if velocity is not None else 0.0
+        self.shared['rotation0'][:] = 0.0
+        self.shared['wander_orientation'][:] = 0.0
+        parameters = {'max_speed': max_speed, 'max_rotation': max_rotation, 'max_acceleration': max_acceleration,
+                      'max_angular_acceleration': max_angular_acceleration, 'drag': drag}
+        for field, value in parameters.items():
+            self.shared[field][:] = value
+
+        self.connections: list = []
+        self.processes: list = []
+        for shard in range(self.shards):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=worker_main, args=(child, shard, self.shards, self.shared.name, count, self.config),
+                daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def _current(self, field: str) -> np.ndarray:
+        return self.shared[f'{field}{self.parity}']
+
+    @property
+    def position(self) -> np.ndarray:
+        return self._current('position')
+
+    @property
+    def velocity(self) -> np.ndarray:
+        return self._current('velocity')
+
+    @property
+    def orientation(self) -> np.ndarray:
+        return self._current('orientation')
+
+    def step(self, delta_time: float):
+        # Todos los procesos avanzan un tick y después cambiamos de búfer
+        for connection in self.connections:
+            connection.send(('step', delta_time, self.parity))
+        for connection in self.connections:
+            connection.recv()
+        self.parity = 1 - self.parity
+
+    def close(self):
+        if not self.processes:
+            return
+        for connection in self.connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for connection in self.connections:
+            connection.close()
+        self.connections = []
+        self.processes = []
+        self.shared.close()
+        self.shared.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,313 @@
+# spatial.py
+
+import math
+import numpy as np
+
+
+class SpatialHashGrid:
+    # Rejilla uniforme que agrupa a los personajes por celda para que las
+    # consultas de vecinos solo revisen las celdas cercanas. El mundo puede
+    # ser toroidal (como en los escenarios que usan % SCREEN_WIDTH).
+    def __init__(self, cell_size: float, width: float, height: float, wrap: bool = True):
+        self.width: float = width
+        self.height: float = height
+        self.wrap: bool = wrap
+
+        # Ajustamos el tamaño de celda para que divida exactamente el mundo
+        # (las celdas nunca son más pequeñas que cell_size)
+        self.cols: int = max(1, int(width // cell_size))
+        self.rows: int = max(1, int(height // cell_size))
+        self.cell_width: float = width / self.cols
+        self.cell_height: float = height / self.rows
+
+        self.positions: np.ndarray = np.zeros((0, 2))
+        # Índices de los personajes ordenados por celda, y dónde empieza y
+        # cuántos elementos tiene cada celda dentro de ese orden
+        self.order: np.ndarray = np.zeros(0, dtype=np.intp)
+        self.cell_start: np.ndarray = np.zeros(self.cols * self.rows, dtype=np.intp)
+        self.cell_count: np.ndarray = np.zeros(self.cols * self.rows, dtype=np.intp)
+
+    def _cells_of(self, positions: np.ndarray):
+        cell_x = np.floor(positions[:, 0] / self.cell_width).astype(np.intp)
+        cell_y = np.floor(positions[:, 1] / self.cell_height).astype(np.intp)
+        if self.wrap:
+            cell_x %= self.cols
+            cell_y %= self.rows
+        else:
+            np.clip(cell_x, 0, self.cols - 1, out=cell_x)
+            np.clip(cell_y, 0, self.rows - 1, out=cell_y)
+        return cell_x, cell_y
+
+    def rebuild(self, positions: np.ndarray, members: np.ndarray = None):
+        # Reconstruye la rejilla; se llama una vez por tick con las posiciones
+        # de todos los personajes (forma (n, 2)). Con members solo esos
+        # índices entran en la rejilla: los demás no son vecinos de nadie ni
+        # aparecen en query_rect, pero se pueden seguir consultando.
+        self.positions = np.array(positions, dtype=float).reshape(-1, 2)
+        if members is None:
+            cell_x, cell_y = self._cells_of(self.positions)
+        else:
+            members = np.asarray(members, dtype=np.intp)
+            cell_x, cell_y = self._cells_of(self.positions[members])
+        cells = cell_y * self.cols + cell_x
+
+        self.order = np.argsort(cells, kind='stable')
+        if members is not None:
+            self.order = members[self.order]
+        self.cell_count = np.bincount(cells, minlength=self.cols * self.rows)
+        self.cell_start = np.cumsum(self.cell_count) - self.cell_count
+
+    def _axis_offsets(self, reach: int, count: int) -> range:
+        # Si el vecindario cubre todo el eje en un mundo toroidal, recorremos
+        # cada celda una sola vez para no repetir candidatos
+        if self.wrap and 2 * reach + 1 >= count:
+            return range(count)
+        # Sin toroide no hay celdas más allá del borde de la rejilla
+        reach = min(reach, count - 1)
+        return range(-reach, reach + 1)
+
+    def _neighbor_offsets(self, radius: float):
+        reach_x = max(1, math.ceil(radius / self.cell_width))
+        reach_y = max(1, math.ceil(radius / self.cell_height))
+        return self._axis_offsets(reach_x, self.cols), self._axis_offsets(reach_y, self.rows)
+
+    def _cell_gap(self, dx: int, dy: int) -> float:
+        # Distancia mínima entre un punto de una celda y uno de la celda que
+        # está dx, dy celdas más allá
+        if self.wrap:
+            dx = min(dx % self.cols, -dx % self.cols)
+            dy = min(dy % self.rows, -dy % self.rows)
+        return math.hypot(max(abs(dx) - 1, 0) * self.cell_width, max(abs(dy) - 1, 0) * self.cell_height)
+
+    def _gather(self, cell_x: np.ndarray, cell_y: np.ndarray, radius: float):
+        # Para cada celda de consulta, devuelve (k, j): la posición k de la
+        # consulta y el índice j de cada personaje en las celdas vecinas
+        offsets_x, offsets_y = self._neighbor_offsets(radius)
+        queries = np.arange(len(cell_x))
+        all_k = []
+        all_j = []
+        for dx in offsets_x:
+            for dy in offsets_y:
+                # Las esquinas del vecindario quedan más lejos que radius
+                if self._cell_gap(dx, dy) >= radius:
+                    continue
+                neighbor_x = cell_x + dx
+                neighbor_y = cell_y + dy
+                if self.wrap:
+                    neighbor_x %= self.cols
+                    neighbor_y %= self.rows
+                    k = queries
+                else:
+                    valid = ((neighbor_x >= 0) & (neighbor_x < self.cols) &
+                             (neighbor_y >= 0) & (neighbor_y < self.rows))
+                    k = queries[valid]
+                    neighbor_x = neighbor_x[valid]
+                    neighbor_y = neighbor_y[valid]
+
+                cells = neighbor_y * self.cols + neighbor_x
+                count = self.cell_count[cells]
+                total = int(count.sum())
+                if total == 0:
+                    continue
+
+                # Expandimos cada celda en la lista de personajes que contiene
+                first = np.repeat(self.cell_start[cells], count)
+                within = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+                all_k.append(np.repeat(k, count))
+                all_j.append(self.order[first + within])
+
+        if not all_k:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        return np.concatenate(all_k), np.concatenate(all_j)
+
+    def query(self, position, radius: float) -> np.ndarray:
+        # Índices de los personajes en las celdas que pueden estar a menos de
+        # radius de position (es un superconjunto: falta filtrar por distancia).
+        # Para un solo punto recorrer las celdas en Python es más barato que
+        # las operaciones vectorizadas de _gather.
+        cell_x = math.floor(position[0] / self.cell_width)
+        cell_y = math.floor(position[1] / self.cell_height)
+        if self.wrap:
+            cell_x %= self.cols
+            cell_y %= self.rows
+        else:
+            cell_x = min(max(cell_x, 0), self.cols - 1)
+            cell_y = min(max(cell_y, 0), self.rows - 1)
+
+        offsets_x, offsets_y = self._neighbor_offsets(radius)
+        chunks = []
+        for dx in offsets_x:
+            neighbor_x = cell_x + dx
+            if self.wrap:
+                neighbor_x %= self.cols
+            elif not 0 <= neighbor_x < self.cols:
+                continue
+            for dy in offsets_y:
+                neighbor_y = cell_y + dy
+                if self.wrap:
+                    neighbor_y %= self.rows
+                elif not 0 <= neighbor_y < self.rows:
+                    continue
+                cell = neighbor_y * self.cols + neighbor_x
+                count = self.cell_count[cell]
+                if count:
+                    start = self.cell_start[cell]
+                    chunks.append(self.order[start:start + count])
+
+        if not chunks:
+            return np.zeros(0, dtype=np.intp)
+        return np.concatenate(chunks)
+
+    def query_rect(self, min_x: float, min_y: float, max_x: float, max_y: float) -> np.ndarray:
+        # Índices de los personajes en las celdas que tocan el rectángulo
+        # (superconjunto, como query). Las celdas de una fila están seguidas
+        # en order, así que cada fila del rectángulo es un solo tramo.
+        if max_x < min_x or max_y < min_y:
+            return np.zeros(0, dtype=np.intp)
+        first_x, last_x = (math.floor(value / self.cell_width) for value in (min_x, max_x))
+        first_y, last_y = (math.floor(value / self.cell_height) for value in (min_y, max_y))
+        if self.wrap and last_x - first_x + 1 >= self.cols:
+            first_x, last_x = 0, self.cols - 1
+        if self.wrap and last_y - first_y + 1 >= self.rows:
+            first_y, last_y = 0, self.rows - 1
+        if not self.wrap:
+            first_x, last_x = max(first_x, 0), min(last_x, self.cols - 1)
+            first_y, last_y = max(first_y, 0), min(last_y, self.rows - 1)
+
+        # En un mundo toroidal un rango que cruza el borde se parte en dos
+        spans_x = self._wrapped_spans(first_x, last_x, self.cols)
+        chunks = []
+        for start_y, end_y in self._wrapped_spans(first_y, last_y, self.rows):
+            for row in range(start_y, end_y + 1):
+                for start_x, end_x in spans_x:
+                    first = row * self.cols + start_x
+                    last = row * self.cols + end_x
+                    begin = self.cell_start[first]
+                    end = self.cell_start[last] + self.cell_count[last]
+                    if end > begin:
+                        chunks.append(self.order[begin:end])
+
+        if not chunks:
+            return np.zeros(0, dtype=np.intp)
+        return np.concatenate(chunks)
+
+    def _wrapped_spans(self, first: int, last: int, count: int) -> list:
+        # Rango de celdas [first, last] de un eje como tramos dentro de la rejilla
+        if first > last:
+            return []
+        if not self.wrap or (first >= 0 and last < count):
+            return [(first, last)]
+        first %= count
+        last %= count
+        if first <= last:
+            return [(first, last)]
+        return [(first, count - 1), (0, last)]
+
+    def _resolve(self, indices) -> np.ndarray:
+        # Acepta None (todos), un slice, una máscara o un arreglo de índices
+        all_indices = np.arange(len(self.positions))
+        return all_indices if indices is None else all_indices[indices]
+
+    def query_pairs(self, radius: float, indices=None):
+        # Pares candidatos (k, j) para los personajes indices (todos si es None):
+        # k es la posición dentro de indices y j el índice del vecino
+        indices = self._resolve(indices)
+        k, j = self._gather(*self._cells_of(self.positions[indices]), radius)
+        not_self = indices[k] != j
+        return k[not_self], j[not_self]
+
+    def displacement(self, origin: np.ndarray, target: np.ndarray) -> np.ndarray:
+        # Vector de origin a target; en un mundo toroidal tomamos el camino más corto
+        delta = target - origin
+        if self.wrap:
+            size = np.array([self.width, self.height])
+            delta -= size * np.round(delta / size)
+        return delta
+
+    def neighbor_pairs(self, radius: float, indices=None):
+        # Como query_pairs pero filtrando por distancia. Devuelve (k, j, delta,
+        # distance) donde delta va del personaje indices[k] a su vecino j
+        indices = self._resolve(indices)
+        k, j = self.query_pairs(radius, indices)
+        delta = self.displacement(self.positions[indices[k]], self.positions[j])
+        distance = np.hypot(delta[:, 0], delta[:, 1])
+        close = distance < radius
+        return k[close], j[close], delta[close], distance[close]
+
+
+class StaticGrid:
+    # Rejilla para elementos fijos con tamaño (obstáculos, paredes): cada
+    # elemento se guarda en todas las celdas que toca su caja envolvente. Se
+    # construye una sola vez; las consultas devuelven candidatos cuyas cajas
+    # comparten celda con la caja de la consulta. El mundo no es toroidal:
+    # lo que queda fuera de [0, width] x [0, height] cae en las celdas del borde.
+    def __init__(self, cell_size: float, width: float, height: float):
+        self.cols: int = max(1, int(width // cell_size))
+        self.rows: int = max(1, int(height // cell_size))
+        self.cell_width: float = width / self.cols
+        self.cell_height: float = height / self.rows
+
+        # Igual que en SpatialHashGrid: elementos ordenados por celda, y dónde
+        # empieza y cuántos elementos tiene cada celda
+        self.items: np.ndarray = np.zeros(0, dtype=np.intp)
+        self.cell_start: np.ndarray = np.zeros(self.cols * self.rows, dtype=np.intp)
+        self.cell_count: np.ndarray = np.zeros(self.cols * self.rows, dtype=np.intp)
+
+    def _cell_ranges(self, mins: np.ndarray, maxs: np.ndarray):
+        # Rango de celdas [x0, x1] x [y0, y1] que cubre cada caja
+        x0 = np.clip(np.floor(mins[:, 0] / self.cell_width), 0, self.cols - 1).astype(np.intp)
+        y0 = np.clip(np.floor(mins[:, 1] / self.cell_height), 0, self.rows - 1).astype(np.intp)
+        x1 = np.clip(np.floor(maxs[:, 0] / self.cell_width), 0, self.cols - 1).astype(np.intp)
+        y1 = np.clip(np.floor(maxs[:, 1] / self.cell_height), 0, self.rows - 1).astype(np.intp)
+        return x0, y0, x1, y1
+
+    def _cover(self, mins: np.ndarray, maxs: np.ndarray):
+        # Pares (k, celda) para todas las celdas que toca cada caja k
+        x0, y0, x1, y1 = self._cell_ranges(mins, maxs)
+        span_x = x1 - x0 + 1
+        span_y = y1 - y0 + 1
+        boxes = np.arange(len(mins))
+        all_k = []
+        all_cells = []
+        for dx in range(int(span_x.max(initial=0))):
+            for dy in range(int(span_y.max(initial=0))):
+                inside = (dx < span_x) & (dy < span_y)
+                all_k.append(boxes[inside])
+                all_cells.append((y0[inside] + dy) * self.cols + x0[inside] + dx)
+        if not all_k:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        return np.concatenate(all_k), np.concatenate(all_cells)
+
+    def build(self, mins: np.ndarray, maxs: np.ndarray):
+        # Inserta los elementos dados por sus cajas envolventes (formas (m, 2))
+        items, cells = self._cover(np.asarray(mins, dtype=float), np.asarray(maxs, dtype=float))
+        order = np.argsort(cells, kind='stable')
+        self.items = items[order]
+        self.cell_count = np.bincount(cells, minlength=self.cols * self.rows)
+        self.cell_start = np.cumsum(self.cell_count) - self.cell_count
+
+    def query_boxes(self, mins: np.ndarray, maxs: np.ndarray):
+        # Pares candidatos (k, item) para las cajas de consulta. Un mismo par
+        # puede repetirse si ambos comparten más de una celda.
+        k, cells = self._cover(mins, maxs)
+        count = self.cell_count[cells]
+        total = int(count.sum())
+        if total == 0:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        first = np.repeat(self.cell_start[cells], count)
+        within = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+        return np.repeat(k, count), self.items[first + within]
+
+    def query_box(self, min_x: float, min_y: float, max_x: float, max_y: float) -> list:
+        # Versión escalar de query_boxes para una sola caja: lista de elementos
+        # candidatos (puede tener repetidos)
+        x0 = min(max(math.floor(min_x / self.cell_width), 0), self.cols - 1)
+        y0 = min(max(math.floor(min_y / self.cell_height), 0), self.rows - 1)
+        x1 = min(max(math.floor(max_x / self.cell_width), 0), self.cols - 1)
+        y1 = min(max(math.floor(max_y / self.cell_height), 0), self.rows - 1)
+        candidates = []
+        for cell_y in range(y0, y1 + 1):
+            for cell in range(cell_y * self.cols + x0, cell_y * self.cols + x1 + 1):
+                start = self.cell_start[cell]
+                candidates.extend(self.items[start:start + self.cell_count[cell]].tolist())
+        return candidates
@@ -0,0 +1,60 @@
+# tests/test_executor.py
+
+import math
+import numpy as np
+from algorithms import (BatchBlendedSteering, BatchDynamicWander, BatchLookWhereYouAreGoing,
+                        BatchPrioritySteering, BatchSeparation)
+from characters import KinematicPopulation
+from executor import SteeringExecutor
+from spatial import SpatialHashGrid
+
+WIDTH, HEIGHT = 1000.0, 800.0
+
+
+class ReversedExecutor(SteeringExecutor):
+    # Evalúa los bloques del último al primero, como si los hilos
+    # terminaran en otro orden
+    def map(self, function, count: int) -> list:
+        if self.inline(count):
+            return [function(slice(0, count))]
+        return [function(chunk) for chunk in reversed(self.chunks(count))][::-1]
+
+
+def build_crowd(count: int = 3000, seed: int = 5):
+    rng = np.random.default_rng(seed)
+    population = KinematicPopulation(count)
+    orientation = rng.uniform(-math.pi, math.pi, count)
+    velocity = np.column_stack((np.cos(orientation), -np.sin(orientation))) * 50.0
+    population.spawn(count, position=rng.uniform((0, 0), (WIDTH, HEIGHT), (count, 2)),
+                     orientation=orientation, velocity=velocity)
+    grid = SpatialHashGrid(30.0, WIDTH, HEIGHT)
+    wander = BatchDynamicWander(population, 50.0, 30.0, math.pi / 4, 0.01, math.pi / 4,
+                                rng=np.random.default_rng(seed))
+    # Separation decide por los personajes con vecinos cerca; el resto deambula
+    behavior = BatchPrioritySteering(population, [
+        BatchBlendedSteering(population, [(BatchSeparation(population, grid, 15.0, 1000.0), 1.0)]),
+        BatchBlendedSteering(population, [(wander, 1.0),
+                                          (BatchLookWhereYouAreGoing(population, 0.01, math.pi / 4), 1.0)]),
+    ])
+    return population, grid, behavior
+
+
+def run(executor: SteeringExecutor, steps: int = 8):
+    population, grid, behavior = build_crowd()
+    with executor:
+        for _ in range(steps):
+            grid.rebuild(population.position)
+            linear, angular = executor.get_steering(behavior)
+            population.update(linear, angular, 1 / 60)
+            population.wrap(WIDTH, HEIGHT)
+    return population.position.copy(), population.orientation.copy()
+
+
+def test_composite_wander_same_inline_and_chunked():
+    inline = run(SteeringExecutor(workers=1))
+    chunked = run(ReversedExecutor(workers=4, chunk_size=256, inline_threshold=0))
+    threaded = run(SteeringExecutor(workers=4, chunk_size=256, inline_threshold=0))
+    for expected, actual in zip(inline, chunked):
+        np.testing.assert_array_equal(expected, actual)
+    for expected, actual in zip(inline, threaded):
+        np.testing.assert_array_equal(expected, actual)
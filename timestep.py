@@ -0,0 +1,32 @@
+# timestep.py
+
+# Reloj de simulación con paso fijo: el tiempo real de cada cuadro se acumula
+# y la simulación avanza en pasos de duración constante. Lo que sobra en el
+# acumulador (alpha) se usa para interpolar el dibujo entre el estado
+# anterior y el actual.
+
+
+class FixedTimestep:
+    def __init__(self, step: float = 1 / 60, max_steps: int = 5):
+        self.step: float = step
+        # Máximo de pasos por cuadro: si un cuadro tarda demasiado preferimos
+        # que la simulación vaya más lenta a que se quede atrás para siempre
+        self.max_steps: int = max_steps
+        self.accumulator: float = 0.0
+
+    def advance(self, frame_time: float) -> int:
+        # Agrega el tiempo del cuadro y devuelve cuántos pasos fijos simular
+        self.accumulator += frame_time
+        steps = int(self.accumulator // self.step)
+        if steps > self.max_steps:
+            # Descartamos el tiempo que no alcanzamos a simular
+            steps = self.max_steps
+            self.accumulator %= self.step
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        # Fracción del siguiente paso ya transcurrida, en [0, 1)
+        return self.accumulator / self.step